@@ -4,6 +4,7 @@ import serial
 from enum import Enum
 from INSTR.Common.RemoveDelims import removeDelims
 from INSTR.Common.Singleton import Singleton
+from INSTR.Common.WaitUntil import waitUntil
 from .Interface import Chopper_Interface, ChopperState
 
 class Chopper(Singleton, Chopper_Interface):
@@ -189,31 +190,19 @@ class Chopper(Singleton, Chopper_Interface):
         :param bool stopValue: do we want to stop on 1 or 0?
         :return bool: True if success, False if timeout
         """
-        done = False
-        iter = 300
-        while not done and iter > 0:
-            _, FC = self.__getClockBits()
-            if FC == stopValue:
-                done = True
-            else:
-                iter -= 1
-                time.sleep(0.010)
-        return iter > 0
+        # the motor keeps turning until we see the edge, so the interval is kept short.
+        # Limited to 300 polls rather than a time, since each also waits for a serial reply:
+        return waitUntil(lambda: self.__getClockBits()[1] == stopValue,
+                         minInterval = 0.002, maxInterval = 0.010, maxPolls = 300).success
 
     def __waitForStop(self) -> bool:
         """Wait for the chopper to stop motion
 
         :return bool: True if success, False if timeout
         """
-        done = False
-        iter = 300
-        while not done and iter > 0:
-            time.sleep(0.2)
-            if not self.__isMoving():
-                done = True
-            else:
-                iter -= 1
-        return iter > 0
+        # allow the move to start before the first poll:
+        return waitUntil(lambda: not self.__isMoving(), expected = 0.2,
+                         minInterval = 0.02, maxInterval = 0.2, maxPolls = 300).success
 
     def __hardStop(self):
         # the ESC character with no carriage return
@@ -1,6 +1,7 @@
 import time
 import nidaqmx
 from INSTR.Common.Singleton import Singleton
+from INSTR.Common.WaitUntil import waitUntil
 from .Interface import Chopper_Interface, ChopperState
 
 class Chopper(Chopper_Interface, Singleton):
@@ -77,11 +78,7 @@ class Chopper(Chopper_Interface, Singleton):
             time.sleep(1)
             return
 
-        endTime = time.time() + timeout
-        busy = True
-        while busy and time.time() <= endTime:
-            busy = self.taskBusy.read()
-            time.sleep(0.010)
+        waitUntil(lambda: not self.taskBusy.read(), timeout, minInterval = 0.002, maxInterval = 0.05)
 
     def connected(self) -> bool:
         if self.simulate:
@@ -2,6 +2,7 @@ from pyvisa.constants import BufferOperation
 import logging
 from INSTR.Common.RemoveDelims import removeDelims
 from INSTR.Common.VisaInstrument import VisaInstrument
+from INSTR.Common.AsyncVisaInstrument import AsyncVisaInstrument
 from .ColdLoadBase import ColdLoadBase, FillMode, FillState
 from Util.Singleton import Singleton
 from threading import Lock
@@ -26,6 +27,7 @@ class AMI1720(ColdLoadBase, Singleton):
             read_termination = '\n',
             write_termination = '\n'
         )
+        self.ainst = AsyncVisaInstrument(self.inst)
         ok = self.connected()        
         if ok and idQuery:
             ok = self.idQuery()
@@ -43,16 +45,8 @@ class AMI1720(ColdLoadBase, Singleton):
         # *TST? Returns a value incremented by 1 for each query to the requesting
         # interface if unit is functioning. Return value does not indicate any
         # operational status other than a functioning interface.
-        if not self.inst.connected:
-            return False
-        try:
-            with self.lock:            
-                response = self.inst.query("*TST?")
-                response = removeDelims(response)
-                if len(response):
-                    return True
-        except:
-            return False
+        with self.lock:
+            return self.inst.probe("*TST?")
 
     def idQuery(self) -> bool:
         """Perform an ID query and check compatibility
@@ -137,6 +131,13 @@ class AMI1720(ColdLoadBase, Singleton):
             return level
         else:
             return -1.0
+
+    async def getLevelAsync(self) -> float:
+        """Awaitable getLevel(), running on this instrument's I/O thread
+
+        :return float: Percent
+        """
+        return await self.ainst.run(self.getLevel)
     
     def setFillState(self, fillState: FillState) -> None:
         """Set the fill state in a device-dependent way
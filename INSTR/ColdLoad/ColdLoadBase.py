@@ -5,6 +5,7 @@ from abc import ABC, abstractmethod
 from pydantic import BaseModel
 from typing import Tuple
 from enum import Enum
+import asyncio
 
 class FillMode(Enum):
     # constants from AMI-1720 but should be sufficiently generic for other models
@@ -131,6 +132,13 @@ class ColdLoadBase(ABC):
         :return float: Percent
         """
         return 99.0
+
+    async def getLevelAsync(self) -> float:
+        """Awaitable getLevel(), running on a worker thread unless overridden
+
+        :return float: Percent
+        """
+        return await asyncio.to_thread(self.getLevel)
     
     @abstractmethod
     def setFillState(self, fillState: FillState) -> None:
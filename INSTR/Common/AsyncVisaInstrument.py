@@ -0,0 +1,68 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from typing import Any, Callable
+from .VisaInstrument import VisaInstrument
+
+class AsyncVisaInstrument():
+    """Awaitable counterpart of VisaInstrument
+
+    Blocking pyvisa I/O runs on a single worker thread per VISA resource,
+    so operations on one instrument stay in order while operations on different instruments overlap.
+    The worker is shut down by VisaResourcePool when the last session for the resource is released.
+    """
+    executors = {}
+    executorsLock = Lock()
+
+    def __init__(self, inst: VisaInstrument):
+        """Constructor
+
+        :param VisaInstrument inst: the instrument to wrap
+        """
+        self.inst = inst
+
+    @classmethod
+    def executor(cls, resource: str) -> ThreadPoolExecutor:
+        """Get the worker thread for a VISA resource, creating it if needed
+
+        :param str resource: VISA resource string
+        :return ThreadPoolExecutor: with a single worker
+        """
+        with cls.executorsLock:
+            executor = cls.executors.get(resource)
+            if not executor:
+                executor = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = f"VISA {resource}")
+                cls.executors[resource] = executor
+            return executor
+
+    @classmethod
+    def shutdown(cls, resource: str) -> None:
+        """Stop the worker thread for a VISA resource, if there is one
+
+        Work already submitted still runs.  A later run() on the resource starts a new worker.
+
+        :param str resource: VISA resource string
+        """
+        with cls.executorsLock:
+            executor = cls.executors.pop(resource, None)
+        if executor:
+            executor.shutdown(wait = False)
+
+    async def run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking function on this resource's worker thread
+
+        :param Callable func: typically a driver method which talks to this instrument
+        :return Any: the return value of func
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor(self.inst.resource), partial(func, *args, **kwargs))
+
+    async def write(self, message: str, termination: str | None = None, encoding: str | None = None) -> int:
+        return await self.run(self.inst.write, message, termination, encoding)
+
+    async def query(self, message: str, delay: float | None = None, return_on_error: str | None = None) -> str:
+        return await self.run(self.inst.query, message, delay, return_on_error)
+
+    async def read(self, termination: str | None = None, encoding: str | None = None, return_on_error: str | None = None) -> str:
+        return await self.run(self.inst.read, termination, encoding, return_on_error)
@@ -0,0 +1,48 @@
+import logging
+import numpy as np
+from time import time
+from typing import Callable, Optional, Tuple
+
+def readChunks(count: int,
+        maxChunk: int,
+        setCount: Callable[[int], None],
+        read: Callable[[], Optional[str]],
+        deadline: Optional[float] = None,
+        context: str = "readChunks") -> Tuple[np.ndarray, np.ndarray]:
+    """Read count ASCII readings as a series of queries, each returning up to maxChunk comma-separated values
+
+    For instruments which take a burst of readings per query, such as READ? with a trigger or sample count.
+    Timestamps are interpolated between the start and end of each query.
+
+    :param int count: number of readings
+    :param int maxChunk: most readings per query
+    :param Callable setCount: called with the number of readings for the next query, only when it changes
+    :param Callable read: sends the query and returns the response, None on error
+    :param float deadline: time() after which no more queries are started, None for no limit
+    :param str context: for error messages
+    :return (values, timestamps): numpy arrays.  timestamps are seconds since the epoch.  Shorter than count on error.
+    """
+    values = []
+    timestamps = []
+    lastCount = None
+    remaining = count
+    while remaining > 0 and (deadline is None or time() < deadline):
+        n = min(remaining, maxChunk)
+        if n != lastCount:
+            setCount(n)
+            lastCount = n
+        start = time()
+        response = read()
+        end = time()
+        try:
+            chunk = np.array(response.split(','), dtype = float)
+        except (AttributeError, ValueError):
+            logging.getLogger("ALMAFE-CTS-Control").error(f"{context}: bad response '{response}'")
+            break
+        values.append(chunk)
+        # readings are evenly spaced and the last is taken just before the response:
+        timestamps.append(np.linspace(start, end, len(chunk) + 1)[1:])
+        remaining -= len(chunk)
+    if not values:
+        return np.array([]), np.array([])
+    return np.concatenate(values)[:count], np.concatenate(timestamps)[:count]
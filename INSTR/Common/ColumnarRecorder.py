@@ -0,0 +1,216 @@
+import json
+import os
+import numpy as np
+from time import time
+from typing import Any, Dict, List, Optional
+
+class ColumnarDataset():
+    """Read access to a directory written by ColumnarRecorder
+
+    Each column is stored as a series of .npy segment files, opened as read-only memory maps,
+    so a slice within one segment is returned without copying anything into RAM.
+    """
+    MANIFEST = "manifest.json"
+    RECORDS = "records.jsonl"
+
+    def __init__(self, path: str):
+        """Constructor
+
+        :param str path: dataset directory
+        :raises FileNotFoundError if there is no manifest
+        """
+        self.path = path
+        with open(os.path.join(path, self.MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.segmentRows = self.manifest['segmentRows']
+        self.maps = {}
+
+    def __len__(self) -> int:
+        return sum(segment['rows'] for segment in self.manifest['segments'])
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.manifest['columns'].keys())
+
+    def segments(self, name: str) -> List[np.ndarray]:
+        """Memory-mapped segments of a column, each cut to the rows actually written
+
+        :param str name: column name
+        :return List[np.ndarray]
+        """
+        if name not in self.manifest['columns']:
+            raise KeyError(f"ColumnarDataset: no column '{name}'")
+        result = []
+        for index, segment in enumerate(self.manifest['segments']):
+            key = (name, index)
+            if key not in self.maps:
+                self.maps[key] = np.load(os.path.join(self.path, segment['files'][name]), mmap_mode = 'r')
+            result.append(self.maps[key][:segment['rows']])
+        return result
+
+    def read(self, name: str, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Read rows start..stop-1 of a column
+
+        :param str name: column name
+        :param int start: first row
+        :param int stop: one past the last row, defaults to the end
+        :return np.ndarray: a memory-mapped view if the rows are all in one segment, otherwise a copy
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        parts = []
+        offset = 0
+        for segment in self.segments(name):
+            end = offset + len(segment)
+            if start < end and stop > offset:
+                parts.append(segment[max(start - offset, 0):min(stop, end) - offset])
+            offset = end
+        if not parts:
+            column = self.manifest['columns'][name]
+            return np.empty((0, *column['shape']), dtype = column['dtype'])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """The per-record metadata: row, time and config for each call to ColumnarRecorder.append()
+        """
+        try:
+            with open(os.path.join(self.path, self.RECORDS)) as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+class ColumnarRecorder():
+    """Append-only recorder for traces and readings, stored column by column on disk
+
+    Each append() adds one row: a value for every column, such as a PNA trace, a spectrum or a temperature list.
+    Column names, dtypes and shapes are fixed by the first row, unless dtypes are given to the constructor.
+    Later rows must cast safely to the column dtypes, so that nothing is silently truncated.
+    Rows are written into memory-mapped .npy segments of segmentRows rows, so only the current segment is mapped for writing.
+    The config for each row is appended as a line of JSON to records.jsonl.
+    manifest.json is rewritten whenever a segment is added and on flush() and close().
+
+    Example:
+        with ColumnarRecorder("scan_001") as recorder:
+            amp, phase = pna.getTrace(asArray = True)
+            recorder.append({"amp": amp, "phase": phase, "y": y}, config = measConfig)
+        amp = ColumnarDataset("scan_001").read("amp", 100, 200)
+    """
+    DEFAULT_SEGMENT_ROWS = 1024
+
+    def __init__(self, path: str, segmentRows: int = DEFAULT_SEGMENT_ROWS, dtypes: Optional[Dict[str, Any]] = None):
+        """Constructor.  If the directory already holds a dataset, new rows are appended to it.
+
+        :param str path: dataset directory, created if needed
+        :param int segmentRows: rows per segment file, for new datasets
+        :param dict dtypes: column name: numpy dtype, for new datasets.  Other columns take the dtype of the first row.
+        """
+        self.path = path
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in (dtypes or {}).items()}
+        self.closed = False
+        os.makedirs(path, exist_ok = True)
+        manifestFile = os.path.join(path, ColumnarDataset.MANIFEST)
+        if os.path.exists(manifestFile):
+            with open(manifestFile) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {'segmentRows': segmentRows, 'columns': {}, 'segments': []}
+        self.segmentRows = self.manifest['segmentRows']
+        self.maps = {}
+        self.records = open(os.path.join(path, ColumnarDataset.RECORDS), 'a')
+        if self.manifest['segments'] and self.manifest['segments'][-1]['rows'] < self.segmentRows:
+            self.__openSegment(create = False)
+
+    def __enter__(self) -> "ColumnarRecorder":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(segment['rows'] for segment in self.manifest['segments'])
+
+    def append(self, values: Dict[str, Any], config: Any = None) -> int:
+        """Add one row
+
+        :param dict values: column name: number or array.  Every column must be given, with the same shape each time.
+        :param config: saved with the row: a pydantic model, dict or str such as MeasConfig.getText()
+        :return int: the row number
+        """
+        if self.closed:
+            raise ValueError("ColumnarRecorder: append after close")
+        values = {name: np.asarray(value) for name, value in values.items()}
+        if not self.manifest['columns']:
+            self.manifest['columns'] = {name: {'dtype': self.dtypes.get(name, value.dtype).str, 'shape': list(value.shape)}
+                                        for name, value in values.items()}
+        if set(values.keys()) != set(self.manifest['columns'].keys()):
+            raise ValueError(f"ColumnarRecorder: expected columns {self.columns}, got {list(values.keys())}")
+        for name, value in values.items():
+            column = self.manifest['columns'][name]
+            if list(value.shape) != column['shape']:
+                raise ValueError(f"ColumnarRecorder: column '{name}' shape {value.shape} differs from the first row")
+            if not np.can_cast(value.dtype, np.dtype(column['dtype']), 'safe'):
+                raise ValueError(f"ColumnarRecorder: column '{name}' dtype {value.dtype} would be truncated to {np.dtype(column['dtype'])}")
+
+        if not self.maps:
+            self.__openSegment()
+        segment = self.manifest['segments'][-1]
+        row = len(self)
+        for name, value in values.items():
+            self.maps[name][segment['rows']] = value
+        segment['rows'] += 1
+        self.records.write(json.dumps({'row': row, 'time': time(), 'config': self.__config(config)}) + "\n")
+        if segment['rows'] == self.segmentRows:
+            self.__closeSegment()
+        return row
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.manifest['columns'].keys())
+
+    def flush(self) -> None:
+        """Write everything so far to disk, so that a reader sees it
+        """
+        for array in self.maps.values():
+            array.flush()
+        self.records.flush()
+        self.__writeManifest()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.__closeSegment()
+        self.records.close()
+        self.closed = True
+
+    def __openSegment(self, create: bool = True) -> None:
+        if create:
+            index = len(self.manifest['segments'])
+            files = {name: f"{name}.{index:05d}.npy" for name in self.manifest['columns']}
+            for name, column in self.manifest['columns'].items():
+                self.maps[name] = np.lib.format.open_memmap(os.path.join(self.path, files[name]), mode = 'w+',
+                    dtype = np.dtype(column['dtype']), shape = (self.segmentRows, *column['shape']))
+            self.manifest['segments'].append({'files': files, 'rows': 0})
+            self.__writeManifest()
+        else:
+            files = self.manifest['segments'][-1]['files']
+            for name in self.manifest['columns']:
+                self.maps[name] = np.lib.format.open_memmap(os.path.join(self.path, files[name]), mode = 'r+')
+
+    def __closeSegment(self) -> None:
+        self.flush()
+        self.maps = {}
+
+    def __writeManifest(self) -> None:
+        # write then rename, so a reader never sees a partial manifest:
+        manifestFile = os.path.join(self.path, ColumnarDataset.MANIFEST)
+        with open(manifestFile + ".tmp", 'w') as f:
+            json.dump(self.manifest, f, indent = 1)
+        os.replace(manifestFile + ".tmp", manifestFile)
+
+    def __config(self, config: Any) -> Any:
+        if config is None or isinstance(config, (str, int, float, bool, dict, list)):
+            return config
+        if hasattr(config, 'model_dump'):
+            return config.model_dump(mode = 'json', warnings = False)
+        if hasattr(config, 'json'):
+            return json.loads(config.json())
+        return str(config)
@@ -0,0 +1,77 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, RLock
+from time import time
+from typing import Callable, Dict, Optional
+from .Singleton import Singleton
+
+class HealthMonitor(Singleton):
+    """Process-wide cache of instrument health checks, keyed by resource
+
+    Each physical resource is probed at most once per TTL however many drivers and dashboards ask.
+    Callers asking while a probe is in progress wait for its result instead of sending their own.
+    A probe may itself call check() for the same resource, as when a device's connected() uses VisaInstrument.probe().
+    """
+    DEFAULT_TTL = 5.0       # seconds to trust a probe result
+    MAX_WORKERS = 8         # concurrent probes in checkAll()
+
+    def init(self):
+        self.logger = logging.getLogger("ALMAFE-CTS-Control")
+        self.lock = Lock()
+        self.results = {}       # resource: (healthy, time probed)
+        self.probeLocks = {}    # resource: RLock held while probing
+        self.executor = ThreadPoolExecutor(max_workers = self.MAX_WORKERS, thread_name_prefix = "HealthMonitor")
+
+    def check(self, resource: str, probe: Callable[[], bool], ttl: float = DEFAULT_TTL) -> bool:
+        """Get the health of a resource, probing it if the cached result is older than ttl
+
+        :param str resource: VISA resource string or other unique key for the physical device
+        :param Callable probe: talks to the device and returns True if it is healthy
+        :param float ttl: seconds to trust a cached result
+        :return bool: True if healthy
+        """
+        cached = self.__fresh(resource, ttl)
+        if cached is not None:
+            return cached
+        with self.lock:
+            probeLock = self.probeLocks.setdefault(resource, RLock())
+        with probeLock:
+            # another caller may have probed while we waited:
+            cached = self.__fresh(resource, ttl)
+            if cached is not None:
+                return cached
+            try:
+                healthy = bool(probe())
+            except Exception as e:
+                self.logger.error(f"HealthMonitor {resource}: {e}")
+                healthy = False
+            with self.lock:
+                self.results[resource] = (healthy, time())
+            return healthy
+
+    def checkAll(self, probes: Dict[str, Callable[[], bool]], ttl: float = DEFAULT_TTL) -> Dict[str, bool]:
+        """Check several resources, running the probes which are due concurrently
+
+        :param probes: resource: probe function
+        :param float ttl: seconds to trust a cached result
+        :return dict of resource: True if healthy
+        """
+        futures = {resource: self.executor.submit(self.check, resource, probe, ttl) for resource, probe in probes.items()}
+        return {resource: future.result() for resource, future in futures.items()}
+
+    def invalidate(self, resource: Optional[str] = None) -> None:
+        """Forget cached results so the next check probes again
+
+        :param str resource: the one to forget, or None for all
+        """
+        with self.lock:
+            if resource is None:
+                self.results = {}
+            else:
+                self.results.pop(resource, None)
+
+    def __fresh(self, resource: str, ttl: float) -> Optional[bool]:
+        result = self.results.get(resource)
+        if result and time() - result[1] < ttl:
+            return result[0]
+        return None
@@ -0,0 +1,157 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class ShadowState():
+    """Shadow copy of the settings most recently written to a SCPI instrument.
+
+    Records the last value written for each command header so that writes which would
+    not change anything can be dropped before they reach the bus.
+
+    Headers are compared in short form with a default suffix of 1 removed,
+    so ':SENS1:FREQuency:CENTer' and ':SENS:FREQ:CENT' are the same setting.
+    The shadow assumes that nothing else is changing the instrument settings.
+    """
+    # commands which restore the instrument to a state we don't know:
+    RESET_HEADERS = ("*RST", "*RCL", "SYST:PRES")
+    OFF_VALUES = ("OFF", "0")
+
+    def __init__(self,
+            alwaysSend: Iterable[str] = (),
+            coupled: Optional[Dict[str, Iterable[str]]] = None):
+        """Constructor
+
+        :param alwaysSend: header prefixes for commands with side effects, which must never be dropped
+        :param coupled: map from a header to the header prefixes it invalidates when sent. '' invalidates everything.
+            Headers and prefixes are matched ignoring numeric suffixes, so 'CALC:PAR:DEF' applies to every channel.
+        """
+        self.alwaysSend = tuple(self.__generic(h) for h in alwaysSend)
+        self.coupled = {self.__generic(k): tuple(self.__generic(h) for h in v) for k, v in (coupled or {}).items()}
+        self.values = {}
+
+    def clear(self) -> None:
+        """Forget everything: the instrument state is unknown
+        """
+        self.values = {}
+
+    def filter(self, message: str) -> str:
+        """Remove the settings which would not change anything from a message to be written
+
+        :param str message: SCPI message
+        :return str: the message to send, possibly empty
+        """
+        keep = []
+        dropped = False
+        for _, fragment, key, value in self.__parse(message):
+            if self.__record(key, value):
+                keep.append(fragment)
+            else:
+                dropped = True
+        if not dropped:
+            return message
+        return ";".join(keep)
+
+    def observe(self, message: str) -> None:
+        """Record any settings sent as part of a query message
+
+        :param str message: SCPI message
+        """
+        for _, _, key, value in self.__parse(message):
+            self.__record(key, value, drop = False)
+
+    def checkResponse(self, message: str, response: str) -> None:
+        """Forget everything if the response to an error query reports an error
+
+        :param str message: SCPI query which was sent
+        :param str response: received
+        """
+        if not response or "SYST:ERR?" not in [key for _, _, key, _ in self.__parse(message)]:
+            return
+        try:
+            if int(re.split(r'[,\s]', response.strip())[0]) != 0:
+                self.clear()
+        except ValueError:
+            self.clear()
+
+    @classmethod
+    def normalize(cls, header: str) -> str:
+        """Reduce a command header to short form, upper case, with default suffix 1 removed
+
+        :param str header: like ':SENSe1:FREQuency:CENTer'
+        :return str: like 'SENS:FREQ:CENT'
+        """
+        nodes = []
+        for node in header.strip().lstrip(':').split(':'):
+            match = re.match(r"^([A-Za-z_*]+)(\d*)(\??)$", node)
+            if not match:
+                nodes.append(node.upper())
+                continue
+            mnemonic = match.group(1).upper()
+            if len(mnemonic) > 4 and mnemonic[0] != '*':
+                mnemonic = mnemonic[:3] if mnemonic[3] in 'AEIOU' else mnemonic[:4]
+            suffix = '' if match.group(2) == '1' else match.group(2)
+            nodes.append(mnemonic + suffix + match.group(3))
+        return ":".join(nodes)
+
+    def __record(self, key: str, value: str, drop: bool = True) -> bool:
+        """Update the shadow for one command
+
+        :return bool: True if the command must be sent
+        """
+        if key.endswith('?'):
+            return True
+        if key.startswith(self.RESET_HEADERS):
+            self.clear()
+            return True
+        if drop and value and not self.__generic(key).startswith(self.alwaysSend) and self.values.get(key) == value:
+            return False
+        self.__invalidate(key, value)
+        if value and not key.startswith('*'):
+            self.values[key] = value
+        return True
+
+    def __invalidate(self, key: str, value: str) -> None:
+        """Forget the settings which may be changed as a side effect of sending key
+        """
+        if key.endswith(':AUTO'):
+            # turning AUTO on changes the value it controls:
+            if value.upper() not in self.OFF_VALUES:
+                self.values.pop(key[:-len(':AUTO')], None)
+        elif self.values.get(key + ':AUTO', 'OFF').upper() not in self.OFF_VALUES:
+            # setting a value manually turns AUTO off:
+            self.values.pop(key + ':AUTO')
+        prefixes = self.coupled.get(self.__generic(key), ())
+        if prefixes:
+            self.values = {k: v for k, v in self.values.items() if not self.__generic(k).startswith(prefixes)}
+
+    def __generic(self, header: str) -> str:
+        """Normalize a header and remove all numeric suffixes, for matching prefixes
+        """
+        return re.sub(r'(?<=[A-Z])\d+', '', self.normalize(header))
+
+    def __parse(self, message: str) -> List[Tuple[str, str, str, str]]:
+        """Split a message into commands, resolving headers which are relative to the previous command
+
+        :return list of (absolute header, absolute command text, normalized header, value)
+        """
+        result = []
+        path = []
+        for fragment in self.__split(message):
+            parts = fragment.split(None, 1)
+            header = parts[0]
+            value = parts[1].strip() if len(parts) > 1 else ''
+            if header.startswith('*'):
+                result.append((header, fragment, self.normalize(header), value))
+                continue
+            nodes = header.lstrip(':').split(':')
+            if not header.startswith(':') and path:
+                nodes = path + nodes
+            path = nodes[:-1]
+            absolute = ':' + ':'.join(nodes)
+            result.append((absolute, f"{absolute} {value}" if value else absolute, self.normalize(absolute), value))
+        return result
+
+    def __split(self, message: str) -> List[str]:
+        """Split on semicolons which are not inside quoted strings
+        """
+        fragments = re.findall(r'(?:"[^"]*"|\'[^\']*\'|[^;"\'])+', message)
+        return [f.strip() for f in fragments if f.strip()]
@@ -0,0 +1,102 @@
+from math import sqrt, inf
+
+class StreamingStats():
+    """Mean, standard deviation and standard error of a stream of samples, updated in constant time per sample
+
+    Uses Welford's algorithm.  If window is nonzero, the statistics are of the most recent window samples,
+    kept in a ring buffer: the oldest sample is removed from the running sums as each new one is added.
+    """
+    def __init__(self, window: int = 0):
+        """Constructor
+
+        :param int window: number of most recent samples to include, or 0 for all samples
+        """
+        self.window = window
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget all samples
+        """
+        self.total = 0
+        self.count = 0
+        self.mean = 0.0
+        self.M2 = 0.0
+        self.ring = [0.0] * self.window
+        self.head = 0
+
+    def add(self, x: float) -> None:
+        """Add a sample, dropping the oldest if the window is full
+
+        :param float x: the sample
+        """
+        self.total += 1
+        if self.window:
+            if self.count == self.window:
+                self.__remove(self.ring[self.head])
+            self.ring[self.head] = x
+            self.head = (self.head + 1) % self.window
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.M2 += delta * (x - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the window, 0 if fewer than 2 samples
+        """
+        if self.count < 2:
+            return 0.0
+        # removing samples can leave a tiny negative rounding error:
+        return max(self.M2, 0.0) / (self.count - 1)
+
+    @property
+    def stdev(self) -> float:
+        return sqrt(self.variance)
+
+    @property
+    def stdErr(self) -> float:
+        """Standard error of the mean of the window, 0 if fewer than 2 samples
+        """
+        if self.count < 2:
+            return 0.0
+        return self.stdev / sqrt(self.count)
+
+    def samplesToTarget(self, stdErr: float) -> float:
+        """Predict how many more samples are needed to reach a target standard error
+
+        Assumes the standard deviation stays as it is now.
+        :param float stdErr: target standard error
+        :return float: 0 if already reached, inf if it cannot be reached within the window or can't be predicted yet
+        """
+        if self.count < 2:
+            return inf
+        if self.stdErr <= stdErr:
+            return 0
+        if stdErr <= 0:
+            return inf
+        needed = (self.stdev / stdErr) ** 2
+        if self.window and needed > self.window:
+            return inf
+        return needed - self.count
+
+    def timeToTarget(self, stdErr: float, elapsed: float) -> float:
+        """Predict how many more seconds are needed to reach a target standard error
+
+        :param float stdErr: target standard error
+        :param float elapsed: seconds taken so far to read all the samples added
+        :return float: seconds, 0 if already reached, inf if it cannot be predicted or reached
+        """
+        samples = self.samplesToTarget(stdErr)
+        if samples in (0, inf):
+            return samples
+        return samples * elapsed / self.total
+
+    def __remove(self, x: float) -> None:
+        self.count -= 1
+        if self.count == 0:
+            self.mean = 0.0
+            self.M2 = 0.0
+            return
+        delta = x - self.mean
+        self.mean -= delta / self.count
+        self.M2 -= delta * (x - self.mean)
@@ -0,0 +1,154 @@
+import logging
+import numpy as np
+from threading import Event, Lock, Thread
+from time import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from .Singleton import Singleton
+
+class TelemetryChannel():
+    """One polled reading with a fixed-size ring buffer of timestamped history
+
+    The poller thread is the only writer.  Readers never take a lock and never touch the instrument.
+    """
+    def __init__(self, name: str, read: Callable[[], Any], interval: float, size: int):
+        """Constructor
+
+        :param str name: key for the poller
+        :param Callable read: returns a number or a sequence of numbers, the same length every time
+        :param float interval: seconds between reads
+        :param int size: number of readings of history to keep
+        """
+        self.name = name
+        self.read = read
+        self.interval = interval
+        self.size = size
+        self.buffer = None      # rows of [timestamp, values...], allocated on the first reading
+        self.head = 0
+        self.last = None        # (timestamp, value), replaced as a whole so readers see a consistent pair
+        self.stopEvent = Event()
+        self.thread = None
+
+    def record(self, timestamp: float, value: Any) -> None:
+        """Store a reading
+
+        :param float timestamp: seconds since the epoch
+        :param value: number or sequence of numbers
+        """
+        row = np.concatenate(([timestamp], np.atleast_1d(np.asarray(value, dtype = float))))
+        if self.buffer is None:
+            self.buffer = np.full((self.size, len(row)), np.nan)
+        self.buffer[self.head] = row
+        self.head = (self.head + 1) % self.size
+        self.last = (timestamp, value)
+
+    def latest(self) -> Optional[Tuple[float, Any]]:
+        """The most recent reading
+
+        :return (timestamp, value) or None if nothing read yet
+        """
+        return self.last
+
+    def history(self, seconds: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Readings in the buffer, oldest first
+
+        :param float seconds: if given, only readings from the last this many seconds
+        :return (timestamps, values): values has one column per element of the reading
+        """
+        buffer = self.buffer
+        if buffer is None:
+            return np.array([]), np.empty((0, 0))
+        rows = buffer.copy()
+        # sorting by timestamp makes the copy consistent even if the writer moved on while it was taken:
+        rows = rows[~np.isnan(rows[:, 0])]
+        rows = rows[np.argsort(rows[:, 0], kind = 'stable')]
+        if seconds is not None:
+            rows = rows[rows[:, 0] >= time() - seconds]
+        return rows[:, 0], rows[:, 1:]
+
+class TelemetryPoller(Singleton):
+    """Process-wide background poller for slowly-changing instrument readings
+
+    Each channel is read on its own thread at its own interval, so a slow instrument does not delay the others.
+    GUI and measurement code call latest() or history() instead of querying the instrument.
+
+    Example:
+        poller = TelemetryPoller()
+        poller.add("temperatures", lambda: tempMonitor.readAll()[0], interval = 5)
+        poller.add("LN2 level", coldLoad.getLevel, interval = 60)
+        poller.add("pol torque", motorController.getPolTorque, interval = 1)
+        timestamp, temps = poller.latest("temperatures")
+    """
+    DEFAULT_SIZE = 3600     # readings of history per channel
+
+    def init(self):
+        self.logger = logging.getLogger("ALMAFE-CTS-Control")
+        self.lock = Lock()
+        self.channels: Dict[str, TelemetryChannel] = {}
+
+    def add(self, name: str, read: Callable[[], Any], interval: float, size: int = DEFAULT_SIZE) -> TelemetryChannel:
+        """Start polling a reading.  Replaces any channel with the same name.
+
+        :param str name: key for latest() and history()
+        :param Callable read: returns a number or a sequence of numbers, the same length every time
+        :param float interval: seconds between reads
+        :param int size: number of readings of history to keep
+        :return TelemetryChannel
+        """
+        self.remove(name)
+        channel = TelemetryChannel(name, read, interval, size)
+        with self.lock:
+            self.channels[name] = channel
+        channel.thread = Thread(target = self.__worker, args = (channel, ), name = f"Telemetry {name}", daemon = True)
+        channel.thread.start()
+        return channel
+
+    def remove(self, name: str) -> None:
+        """Stop polling a reading and discard its history
+
+        :param str name: as given to add()
+        """
+        with self.lock:
+            channel = self.channels.pop(name, None)
+        if channel:
+            channel.stopEvent.set()
+
+    def removeAll(self) -> None:
+        """Stop polling everything
+        """
+        for name in list(self.channels.keys()):
+            self.remove(name)
+
+    def latest(self, name: str) -> Optional[Tuple[float, Any]]:
+        """The most recent reading, without touching the instrument
+
+        :param str name: as given to add()
+        :return (timestamp, value) or None if unknown or nothing read yet
+        """
+        channel = self.channels.get(name)
+        return channel.latest() if channel else None
+
+    def history(self, name: str, seconds: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Readings in the ring buffer, oldest first
+
+        :param str name: as given to add()
+        :param float seconds: if given, only readings from the last this many seconds
+        :return (timestamps, values): empty arrays if unknown
+        """
+        channel = self.channels.get(name)
+        if not channel:
+            return np.array([]), np.empty((0, 0))
+        return channel.history(seconds)
+
+    def __worker(self, channel: TelemetryChannel) -> None:
+        failing = False
+        while not channel.stopEvent.is_set():
+            start = time()
+            try:
+                channel.record(start, channel.read())
+                failing = False
+            except Exception as e:
+                # log once per outage rather than on every poll:
+                if not failing:
+                    self.logger.error(f"TelemetryPoller {channel.name}: {e}")
+                failing = True
+            channel.stopEvent.wait(max(0, channel.interval - (time() - start)))
@@ -1,56 +1,276 @@
 import pyvisa
-from typing import Any
+from typing import Any, Iterator
+from contextlib import contextmanager
 import logging
+from threading import RLock
+from .ShadowState import ShadowState
+from .VisaResourcePool import VisaResourcePool
+from .HealthMonitor import HealthMonitor
+from .RemoveDelims import removeDelims
 
 class VisaInstrument():
+
+    DEFAULT_MAX_MESSAGE_LENGTH = 1024   # bytes, for coalesced writes in batch()
+    DROPPED = -1                        # returned by write() when the shadow state shows it would change nothing
+
     def __init__(self,
             resource: str,
-            max_errors: int = 5,            
+            max_errors: int = 5,
+            max_message_length: int = DEFAULT_MAX_MESSAGE_LENGTH,
+            shadow: ShadowState | None = None,
             **kwargs: Any):
+        """Constructor
+
+        :param str resource: VISA resource string
+        :param int max_errors: stop communicating after this many errors
+        :param int max_message_length: for coalesced writes in batch()
+        :param ShadowState shadow: if provided, writes which would not change any setting are dropped
+        :param kwargs: passed to pyvisa open_resource()
+
+        Instances with the same resource string share one session, its lock and its shadow state.
+        The first shadow provided for a session applies to every instance, including those created before it.
+        """
         self.logger = logging.getLogger("ALMAFE-CTS-Control")
-        rm = pyvisa.ResourceManager()
         self.resource = resource
         try:
-            self.inst = rm.open_resource(resource, **kwargs)
+            self.session = VisaResourcePool().acquire(resource, **kwargs)
+            self.inst = self.session.inst
             self.connected = True
         except Exception as e:
             print(e)
             self.logger.error(e)
+            self.session = None
             self.inst = None
             self.connected = False
+        if self.session and shadow and not self.session.shadow:
+            self.session.shadow = shadow
+        self.lock = self.session.lock if self.session else RLock()
         self.max_errors = max_errors
         self.errors_countdown = max_errors
+        self.max_message_length = max_message_length
+        self.batch_depth = 0
+        self.batch_scpi = True
+        self.pending = []
+
+    @property
+    def shadow(self) -> ShadowState | None:
+        """The session's shadow state, looked up on each use so that every instance on the resource shares it
+        """
+        return self.session.shadow if self.session else None
 
     def close(self):
-        self.inst.close()
+        """Release the session, closing it if no other instance is using it
+        """
+        if self.session:
+            VisaResourcePool().release(self.session)
+            self.session = None
+        self.connected = False
+
+    @contextmanager
+    def batch(self, scpi: bool = True) -> Iterator["VisaInstrument"]:
+        """Collect writes made inside the block and send them as few semicolon-joined messages when it exits.
+
+        A query or read inside the block sends the collected writes first, so ordering is preserved.
+        Messages are split so that none is longer than max_message_length.
+
+        The session lock is held for the whole block, so writes from other threads wait rather than join the batch.
+
+        :param bool scpi: if True, prefix each fragment with ':' so it is parsed from the root of the command tree.
+        """
+        with self.lock:
+            self.batch_depth += 1
+            if self.batch_depth == 1:
+                self.batch_scpi = scpi
+            try:
+                yield self
+            finally:
+                self.batch_depth -= 1
+                if self.batch_depth == 0:
+                    self.flush_batch()
+
+    def invalidate_shadow(self) -> None:
+        """Forget the recorded settings, for when the instrument state may have changed behind our back
+        """
+        if self.shadow:
+            self.shadow.clear()
+
+    def flush_batch(self) -> bool:
+        """Send any writes collected by batch()
+
+        :return bool: True if every message was sent
+        """
+        if not self.pending:
+            return True
+        fragments = self.pending
+        self.pending = []
+        message = ""
+        ok = True
+        with self.lock:
+            for fragment in fragments:
+                if message and len(message) + len(fragment) + 1 > self.max_message_length:
+                    ok = self.__write(message) > 0 and ok
+                    message = ""
+                message = f"{message};{fragment}" if message else fragment
+            if message:
+                ok = self.__write(message) > 0 and ok
+        return ok
 
     def write(self, message: str, termination: str | None = None, encoding: str | None = None) -> int:
+        """Write a message, or queue it inside batch()
+
+        :return int: bytes written, or queued inside batch().  0 on error.
+            DROPPED if the shadow state shows that the whole message would change nothing.
+        """
         if not self.connected:
             return 0
-        try:
-            self.inst.write(message, termination, encoding)
-        except:
-            return self.__count_error()
-            return 0
+        with self.lock:
+            shadow = self.shadow
+            if shadow:
+                message = shadow.filter(message)
+                if not message:
+                    return self.DROPPED
+            if self.batch_depth and termination is None and encoding is None:
+                fragment = self.__fragment(message)
+                if fragment:
+                    self.pending.append(fragment)
+                return len(fragment)
+            self.flush_batch()
+            return self.__write(message, termination, encoding)
 
     def query(self, message: str, delay: float | None = None, return_on_error: str | None = None) -> str:
         if not self.connected:
             return return_on_error
-        try:
-            return self.inst.query(message, delay)
-        except:
-            return self.__count_error()
-                
+        with self.lock:
+            self.flush_batch()
+            if self.shadow:
+                self.shadow.observe(message)
+            try:
+                response = self.inst.query(message, delay)
+            except:
+                return self.__count_error()
+            if self.shadow:
+                self.shadow.checkResponse(message, response)
+            return response
+
+    def query_binary_values(self,
+            message: str,
+            datatype: str = 'f',
+            is_big_endian: bool = False,
+            container: Any = list,
+            return_on_error: Any = None) -> Any:
+        """Query for an IEEE 488.2 definite-length binary block
+
+        :param str message: the query
+        :param str datatype: struct format character for each value: 'f' for REAL,32, 'd' for REAL,64
+        :param bool is_big_endian: byte order of the received values
+        :param container: type for the result, such as list or numpy.array
+        :param return_on_error: returned if not connected or the query fails
+        """
+        if not self.connected:
+            return return_on_error
+        with self.lock:
+            self.flush_batch()
+            if self.shadow:
+                self.shadow.observe(message)
+            try:
+                return self.inst.query_binary_values(message, datatype = datatype, is_big_endian = is_big_endian, container = container)
+            except:
+                self.__count_error()
+                return return_on_error
+
     def read(self, termination: str | None = None, encoding: str | None = None, return_on_error: str | None = None) -> str:
         if not self.connected:
             return return_on_error
+        with self.lock:
+            self.flush_batch()
+            try:
+                return self.inst.read(termination, encoding)
+            except:
+                self.__count_error()
+                return return_on_error
+
+    def probe(self, message: str = "*ESR?", ttl: float = HealthMonitor.DEFAULT_TTL) -> bool:
+        """Check that the instrument responds, at most once per ttl for this resource
+
+        :param str message: query which any response to means the instrument is alive
+        :param float ttl: seconds to trust the previous result
+        :return bool: True if connected and responding
+        """
+        if not self.connected:
+            return False
+        return HealthMonitor().check(self.resource, lambda: len(removeDelims(self.query(message) or "")) > 0, ttl)
+
+    @property
+    def supports_srq(self) -> bool:
+        """True if the session can wait for VISA service requests (GPIB)
+        """
+        return self.connected and hasattr(self.inst, 'wait_for_srq')
+
+    @contextmanager
+    def service_requests(self) -> Iterator[bool]:
+        """Queue service request events while inside the block, for wait_for_srq()
+
+        Enable the queue before checking the instrument state, so that a request raised
+        between the check and the wait is not lost.
+        :yields bool: True if service requests are supported
+        """
+        if not self.supports_srq:
+            yield False
+            return
         try:
-            return self.inst.read(termination, encoding)
+            self.inst.enable_event(pyvisa.constants.EventType.service_request, pyvisa.constants.EventMechanism.queue)
         except:
-            self.__count_error()            
-            return return_on_error
+            self.__count_error()
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            try:
+                self.inst.disable_event(pyvisa.constants.EventType.service_request, pyvisa.constants.EventMechanism.queue)
+                self.inst.discard_events(pyvisa.constants.EventType.service_request, pyvisa.constants.EventMechanism.queue)
+            except:
+                pass
+
+    def wait_for_srq(self, timeout: int) -> bool:
+        """Wait for a service request queued inside service_requests() then serial poll to clear it
+
+        :param int timeout: milliseconds
+        :return bool: True if a service request was received, False on timeout or error
+        """
+        if not self.supports_srq:
+            return False
+        try:
+            response = self.inst.wait_on_event(pyvisa.constants.EventType.service_request, max(0, int(timeout)), capture_timeout = True)
+            if response.timed_out:
+                return False
+            with self.lock:
+                self.inst.read_stb()
+            return True
+        except:
+            self.__count_error()
+            return False
+
+    def __write(self, message: str, termination: str | None = None, encoding: str | None = None) -> int:
+        try:
+            return self.inst.write(message, termination, encoding)
+        except:
+            self.__count_error()
+            return 0
+
+    def __fragment(self, message: str) -> str:
+        """Prepare a message to be joined with others: strip whitespace and trailing semicolons
+
+        Only the start of the message is made absolute; the rest keeps its position relative to it.
+        """
+        message = message.strip().rstrip(';').strip()
+        if message and self.batch_scpi and message[0] not in ':*':
+            message = ':' + message
+        return message
 
     def __count_error(self):
+        self.invalidate_shadow()
+        HealthMonitor().invalidate(self.resource)
         self.errors_countdown -= 1
         if self.errors_countdown == 0:
             self.logger.error(f"VisaInstrument {self.resource} stopping: too many errors ({self.max_errors}).")
@@ -0,0 +1,74 @@
+import pyvisa
+import logging
+from threading import Lock, RLock
+from typing import Any, Optional
+from .Singleton import Singleton
+from .ShadowState import ShadowState
+
+class VisaSession():
+    """One open VISA session, shared by every VisaInstrument using the same resource string
+    """
+    def __init__(self, resource: str, inst: pyvisa.resources.Resource):
+        self.resource = resource
+        self.inst = inst
+        self.lock = RLock()
+        self.refCount = 1
+        self.shadow: Optional[ShadowState] = None
+
+class VisaResourcePool(Singleton):
+    """Process-wide pyvisa ResourceManager and pool of open sessions keyed by resource string
+
+    Drivers which talk to the same physical instrument share one session and its lock.
+    The session is closed when the last user releases it.
+    The open_resource() arguments given by the first user apply to all.
+    """
+    def init(self):
+        self.logger = logging.getLogger("ALMAFE-CTS-Control")
+        self.lock = Lock()
+        self.rm = None
+        self.sessions = {}
+
+    def resourceManager(self) -> pyvisa.ResourceManager:
+        """Get the shared ResourceManager, creating it on first use
+        """
+        with self.lock:
+            if not self.rm:
+                self.rm = pyvisa.ResourceManager()
+            return self.rm
+
+    def acquire(self, resource: str, **kwargs: Any) -> VisaSession:
+        """Get the session for a resource, opening it if needed
+
+        :param str resource: VISA resource string
+        :param kwargs: passed to open_resource() if the session is not already open
+        :return VisaSession
+        :raises pyvisa.Error and others from open_resource()
+        """
+        rm = self.resourceManager()
+        with self.lock:
+            session = self.sessions.get(resource)
+            if session:
+                session.refCount += 1
+                return session
+            session = VisaSession(resource, rm.open_resource(resource, **kwargs))
+            self.sessions[resource] = session
+            return session
+
+    def release(self, session: VisaSession) -> None:
+        """Release a session from acquire(), closing it and its AsyncVisaInstrument worker if this was the last user
+
+        :param VisaSession session
+        """
+        with self.lock:
+            session.refCount -= 1
+            if session.refCount > 0:
+                return
+            if self.sessions.get(session.resource) is session:
+                del self.sessions[session.resource]
+        try:
+            session.inst.close()
+        except Exception as e:
+            self.logger.error(f"VisaResourcePool closing {session.resource}: {e}")
+        # imported here because AsyncVisaInstrument imports this module via VisaInstrument:
+        from .AsyncVisaInstrument import AsyncVisaInstrument
+        AsyncVisaInstrument.shutdown(session.resource)
@@ -0,0 +1,81 @@
+import time
+from pydantic import BaseModel
+from typing import Any, Callable, Optional
+
+class WaitResult(BaseModel):
+    success: bool = False       # the condition became true
+    timedOut: bool = False
+    cancelled: bool = False
+    polls: int = 0              # number of times the condition was evaluated
+    elapsed: float = 0          # seconds
+    value: Any = None           # the last value returned by the condition
+
+    def getText(self) -> str:
+        if self.success:
+            status = "success"
+        elif self.cancelled:
+            status = "cancelled"
+        else:
+            status = "timed out"
+        return f"{status} after {self.polls} polls in {self.elapsed:.3f} s"
+
+def waitUntil(condition: Callable[[], Any],
+        timeout: Optional[float] = None,
+        expected: float = 0,
+        minInterval: float = 0.001,
+        maxInterval: float = 0.5,
+        backoff: float = 2.0,
+        cancel: Optional[Callable[[], bool]] = None,
+        maxPolls: Optional[int] = None) -> WaitResult:
+    """Poll a condition until it returns a truthy value, with exponential backoff
+
+    Sleeps for the expected duration before the first poll, so nothing is spent polling an operation
+    which cannot have finished.  Then polls starting at minInterval, multiplying the interval by backoff
+    up to maxInterval, so a short operation is seen quickly and a long one costs few bus transactions.
+    The condition is always evaluated at least once and once more at the deadline.
+    Exceptions raised by the condition are passed to the caller.
+
+    :param Callable condition: returns truthy when done.  The value is kept in the result.
+    :param float timeout: seconds, None to wait indefinitely
+    :param float expected: seconds the operation is expected to take, if known
+    :param float minInterval: seconds between the first polls
+    :param float maxInterval: longest interval between polls
+    :param float backoff: factor to increase the interval by after each poll
+    :param Callable cancel: returns True to give up, for example threading.Event.is_set
+    :param int maxPolls: give up after this many polls, as timedOut.  For a limit which scales with the time each poll takes.
+    :return WaitResult
+    """
+    start = time.time()
+    deadline = start + timeout if timeout is not None else None
+    result = WaitResult()
+
+    def pause(seconds: float) -> None:
+        # in pieces no longer than maxInterval, so that cancel is noticed:
+        end = time.time() + seconds
+        if deadline is not None:
+            end = min(end, deadline)
+        while not (cancel and cancel()):
+            remaining = end - time.time()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, maxInterval))
+
+    if expected > 0:
+        pause(expected)
+    interval = minInterval
+    while True:
+        if cancel and cancel():
+            result.cancelled = True
+            break
+        result.value = condition()
+        result.polls += 1
+        if result.value:
+            result.success = True
+            break
+        if (deadline is not None and time.time() >= deadline) or (maxPolls is not None and result.polls >= maxPolls):
+            result.timedOut = True
+            break
+        pause(interval)
+        interval = min(interval * backoff, maxInterval)
+    result.elapsed = time.time() - start
+    return result
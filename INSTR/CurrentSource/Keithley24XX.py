@@ -1,5 +1,4 @@
 from enum import Enum
-from INSTR.Common.RemoveDelims import removeDelims
 from INSTR.Common.VisaInstrument import VisaInstrument
 import re
 
@@ -45,14 +44,7 @@ class CurrentSource():
         self.inst.close()
 
     def connected(self) -> bool:
-        if not self.inst.connected:
-            return False
-        try:
-            result = self.inst.query("*ESR?")
-            result = removeDelims(result)
-            return len(result) > 0
-        except:
-            return False
+        return self.inst.probe("*ESR?")
         
     def idQuery(self) -> bool:
         """Perform an ID query and check compatibility
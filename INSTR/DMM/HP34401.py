@@ -1,10 +1,14 @@
 import re
 import pyvisa
 import logging
+import numpy as np
+from time import time
 from enum import Enum
 from typing import List, Tuple, Optional
-from INSTR.Common.RemoveDelims import removeDelims
 from INSTR.Common.VisaInstrument import VisaInstrument
+from INSTR.Common.AsyncVisaInstrument import AsyncVisaInstrument
+from INSTR.Common.WaitUntil import waitUntil
+from INSTR.Common.ChunkedRead import readChunks
 
 class Function(Enum):
     DC_VOLTAGE = "VOLT:DC"
@@ -49,6 +53,8 @@ class HP34401():
     CURRENT_RANGES = (1e-4, 1e-3, 1e-2, 1e-1, 1e+0, 3e+0)
     CAPACITANCE_RANGES = (1e-9, 1e-8, 1e-7, 1e-6, 1e-5)
     RESOLUTION_DIGITS = (4.5e+0, 5.5e+0, 6.5e+0)
+    READING_MEMORY = {"34401": 512, "34410": 50000, "34411": 1000000}
+    MAX_SAMPLE_COUNT = {"34410": 50000, "34411": 1000000}     # SAMP:COUN and TRIG:COUN limits
 
     def __init__(self, resource="GPIB0::22::INSTR", idQuery=True, reset=True):
         """Constructor
@@ -58,7 +64,8 @@ class HP34401():
         :param bool reset: If true, reset the instrument and set default configuration, defaults to True
         """
         self.logger = logging.getLogger("ALMAFE-CTS-Control")
-        self.inst = VisaInstrument(resource, timeout = self.DEFAULT_TIMEOUT)        
+        self.inst = VisaInstrument(resource, timeout = self.DEFAULT_TIMEOUT)
+        self.ainst = AsyncVisaInstrument(self.inst)
         if self.inst.connected and self.inst.inst.interface_type == pyvisa.constants.InterfaceType.asrl:
             self.inst.inst.end_input = pyvisa.constants.termination_char
             self.inst.inst.end_output = pyvisa.constants.termination_char
@@ -82,15 +89,7 @@ class HP34401():
         self.inst.close()
 
     def connected(self) -> bool:
-        if not self.inst.connected:
-            return False
-        try:
-            response = self.inst.query("*ESR?")
-            response = removeDelims(response)
-            if len(response):
-                return True
-        except:
-            return False
+        return self.inst.probe("*ESR?")
 
     def idQuery(self) -> bool:
         """Perform an ID query and check compatibility
@@ -160,16 +159,109 @@ class HP34401():
         if not self.multipointConfigured:
             self.configureMultipoint(triggerCount = 1, sampleCount = 1)
         self.initiateMeasurement()
-        result = None
-        success = True
-        
-        while success and not result: 
+
+        def fetched() -> Optional[Tuple[bool, List[float]]]:
             success, result = self.fetchMeasurement()
-        if success:
-            return result[0]
+            return (success, result) if result or not success else None
+
+        wait = waitUntil(fetched, self.DEFAULT_TIMEOUT / 1000, minInterval = 0.001, maxInterval = 0.1)
+        if wait.success and wait.value[0]:
+            return wait.value[1][0]
         else:
             return None
 
+    async def readSinglePointAsync(self) -> Optional[float]:
+        """Awaitable readSinglePoint(), running on this instrument's I/O thread
+        """
+        return await self.ainst.run(self.readSinglePoint)
+
+    def acquire(self, count: int, sampleInterval: float, timeout: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Take count readings at sampleInterval, using the current function, range and integration time
+
+        34410/34411: paced by the sample timer and transferred as REAL,64 binary blocks.
+        The reading memory is read and erased with R? while measuring, so count may exceed its size.
+        Counts above MAX_SAMPLE_COUNT are split into several triggers of equal sample counts.
+        The sample timer restarts at each trigger so the timestamps across a trigger boundary are nominal.
+        34401: paced by the trigger delay and read with READ? in ASCII, up to 512 readings at a time.
+        Set configureAveraging() so that the integration time fits within sampleInterval.
+
+        :param int count: number of readings
+        :param float sampleInterval: seconds between readings
+        :param float timeout: seconds, defaults to the acquisition time plus DEFAULT_TIMEOUT
+        :return (values, timestamps): numpy arrays.  timestamps are seconds since the epoch.  Shorter than count on error or timeout.
+        """
+        if count <= 0:
+            return np.array([]), np.array([])
+        if timeout is None:
+            timeout = count * sampleInterval + self.DEFAULT_TIMEOUT / 1000
+        try:
+            if self.model in ("34410", "34411"):
+                return self.__acquireTimer(count, sampleInterval, timeout)
+            else:
+                return self.__acquireDelay(count, sampleInterval, timeout)
+        finally:
+            # readSinglePoint() must set the trigger and counts back up:
+            self.triggerConfigured = False
+            self.multipointConfigured = False
+
+    def __acquireTimer(self, count: int, sampleInterval: float, timeout: float) -> Tuple[np.ndarray, np.ndarray]:
+        maxSamples = self.MAX_SAMPLE_COUNT[self.model]
+        triggerCount = -(-count // maxSamples)
+        if triggerCount > maxSamples:
+            self.logger.error(f"HP34401.acquire: count {count} is more than {maxSamples * maxSamples}")
+            return np.array([]), np.array([])
+        # the fewest readings over count which divide evenly between the triggers:
+        sampleCount = -(-count // triggerCount)
+        self.configureTrigger(TriggerSource.IMMEDIATE, autoDelay = False, manualDelay = 0)
+        self.configureMultipoint(triggerCount = triggerCount, sampleCount = sampleCount, sampleInterval = sampleInterval,
+                                 sampleSource = SampleSource.SAMPLE_INTERVAL)
+        # little-endian byte order to match the host:
+        self.inst.write(":FORM:DATA REAL,64;:FORM:BORD SWAP;")
+        self.inst.write("INIT;")
+        start = time()
+        chunks = []
+        received = 0
+        error = False
+
+        def drain() -> bool:
+            nonlocal received, error
+            block = self.inst.query_binary_values("R?", datatype = 'd', is_big_endian = False, container = np.array)
+            if block is None:
+                error = True
+            elif len(block):
+                chunks.append(block)
+                received += len(block)
+            return error or received >= count
+
+        memory = self.READING_MEMORY[self.model]
+        if count <= memory:
+            # one transfer at the end, unless it takes longer than expected:
+            wait = waitUntil(drain, timeout, expected = count * sampleInterval, minInterval = 0.001, maxInterval = 0.1)
+        else:
+            # keep the reading memory well short of full:
+            wait = waitUntil(drain, timeout, minInterval = 0.01, maxInterval = min(1.0, memory * sampleInterval / 4))
+        if error or not wait.success:
+            self.logger.error(f"HP34401.acquire: {received} of {count} readings, {wait.getText()}")
+            self.inst.write("ABOR;")
+        elif triggerCount * sampleCount > count:
+            # don't leave it measuring the readings over count:
+            self.inst.write("ABOR;")
+        self.inst.write(":FORM:DATA ASCII;")
+        if not chunks:
+            return np.array([]), np.array([])
+        values = np.concatenate(chunks)[:count]
+        return values, start + sampleInterval * np.arange(len(values))
+
+    def __acquireDelay(self, count: int, sampleInterval: float, timeout: float) -> Tuple[np.ndarray, np.ndarray]:
+        self.configureTrigger(TriggerSource.IMMEDIATE, autoDelay = False, manualDelay = sampleInterval)
+        # each READ? must also complete within the VISA timeout:
+        maxReadings = min(self.READING_MEMORY["34401"], max(1, int(self.DEFAULT_TIMEOUT / 2000 / max(sampleInterval, 0.001))))
+        return readChunks(count, maxReadings,
+            lambda n: self.configureMultipoint(triggerCount = 1, sampleCount = n),
+            lambda: self.inst.query("READ?"),
+            deadline = time() + timeout,
+            context = "HP34401.acquire")
+
     def configureTrigger(self,
             triggerSource: TriggerSource,
             internalLevel: float = 0.0,
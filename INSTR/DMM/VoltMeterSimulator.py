@@ -1,4 +1,6 @@
 import logging
+import numpy as np
+from time import time
 from enum import Enum
 from typing import List, Tuple, Optional
 from .HP34401 import Function, TriggerSource, TriggerSlope, AutoZero, SampleSource
@@ -50,6 +52,13 @@ class VoltMeterSimulator():
     def readSinglePoint(self) -> Optional[float]:
         return randrange(0, 100) / 100
 
+    async def readSinglePointAsync(self) -> Optional[float]:
+        return self.readSinglePoint()
+
+    def acquire(self, count: int, sampleInterval: float, timeout: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        start = time()
+        return np.random.randint(0, 100, max(count, 0)) / 100, start + sampleInterval * np.arange(max(count, 0))
+
     def configureTrigger(self,
             triggerSource: TriggerSource,
             internalLevel: float = 0.0,
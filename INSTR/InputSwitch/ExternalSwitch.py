@@ -4,12 +4,16 @@ from INSTR.SwitchController.Agilent11713 import AttenuatorSwitchController
 
 class ExternalSwitch(InputSwitch_Interface):
 
-    def __init__(self, resource="GPIB0::29::INSTR", simulate: bool = False):
+    SETTLE_TIME = 0.02      # seconds for the coaxial switches to settle after switching
+
+    def __init__(self, resource="GPIB0::29::INSTR", simulate: bool = False, settleTime: float = SETTLE_TIME):
         """Constructor
 
         :param str resource: VISA resource string,
+        :param float settleTime: seconds for the switches to settle after switching
         """
         self.simulate = simulate
+        self.settleTime = settleTime
         self.resource = "simulated" if simulate else resource
         if simulate:
             self.switchController = None
@@ -12,12 +12,16 @@ class InputSwitch(InputSwitch_Interface):
         'Spare input 6': 32
     }
 
-    def __init__(self, resource="GPIB0::9::INSTR", simulate: bool = False):
+    SETTLE_TIME = 0.02      # seconds for the relays to settle after switching
+
+    def __init__(self, resource="GPIB0::9::INSTR", simulate: bool = False, settleTime: float = SETTLE_TIME):
         """Constructor
 
         :param str resource: VISA resource string, defaults to "GPIB0::9::INSTR"
+        :param float settleTime: seconds for the relays to settle after switching
         """
         self.simulate = simulate
+        self.settleTime = settleTime
         self.resource = "simulated" if simulate else resource
         if simulate:
             self.switchController = None
@@ -54,7 +58,8 @@ class InputSwitch(InputSwitch_Interface):
     def selected(self, inputSelect: InputSelect):
         # send the compliment of the byte having the selected bit:
         self.position = inputSelect
-        self.switchController.staticWrite(255 - self.controlBits[inputSelect])
+        if not self.simulate:
+            self.switchController.staticWrite(255 - self.controlBits[inputSelect])
     
     def select_pol_sideband(self, pol: int = 0, sideband: int | str = 'USB') -> None:
         if pol not in (0, 1):
@@ -7,24 +7,35 @@ It uses a TCP/IP socket to communicate directly with the hardware.
 from .schemas import MotorStatus, MoveStatus, Position
 from .MCInterface import MCInterface, MCError
 from INSTR.Common.RemoveDelims import removeDelims
+from INSTR.Common.WaitUntil import waitUntil
 import socket
 import time
 from math import sqrt, copysign
-from typing import Union
+from typing import Union, Tuple, List, Optional
 import logging
 import queue
 import threading
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 class QueueItem(BaseModel):
     request: bytes
     response: bytes = b''
     replySize: int = 1
+    handshakes: int = 0
     complete: bool = False
+    _done: threading.Event = PrivateAttr(default_factory = threading.Event)
+
+    def setComplete(self):
+        self.complete = True
+        self._done.set()
+
+    def wait(self, timeout: float) -> bool:
+        return self._done.wait(timeout)
 
 class MotorController(MCInterface):
     SOCKET_TIMEOUT = 2    # sec
-    RECV_BYTE_TIMEOUT = 0.005
+    RECV_CHUNK_SIZE = 4096  # bytes
+    HANDSHAKES = b':?'      # controller replies end with ':' on success or '?' on error
     STEPS_PER_DEGREE = 225
     STEPS_PER_MM = 5000
     X_MIN = 0
@@ -35,6 +46,8 @@ class MotorController(MCInterface):
     POL_MAX = 180
     DEFAULT_HOST = "10.1.1.20"
     DEFAULT_PORT = 2055
+    MOVE_POLL_MIN = 0.02    # seconds between status polls at the start of a move
+    MOVE_POLL_MAX = 0.5     # and at most, for long moves
     DELIMS = b'[:,\s\r\n]'
     # constants from DMC-2103 Firmware Command Reference:
     MIN_XYSPEED_STEPS = 2           
@@ -46,15 +59,25 @@ class MotorController(MCInterface):
     MIN_POL_TORQUE = -9.9982        # volts analog output signal
     MAX_POL_TORQUE = 9.9982         # "
 
-    def __init__(self, host = DEFAULT_HOST, port = DEFAULT_PORT):
+    def __init__(self, host = DEFAULT_HOST, port = DEFAULT_PORT, reset = True):
+        '''
+        host, port: the controller's address
+        reset: if True, connect and reset the controller.  If False the socket is not opened until reset()
+        '''
         self.logger = logging.getLogger("ALMAFE-CTS-Control")
         self.logger.setLevel(logging.DEBUG)        
         self.host = host
         self.port = port
         self.socket = None
+        self.rxBuffer = bytearray()
+        self.rxChunk = bytearray(self.RECV_CHUNK_SIZE)
+        self.nextPos = Position(x=0, y=0, pol=0)
+        self.position = Position(x=0, y=0, pol=0)
+        self.motorStatus = MotorStatus()
         self.queue = queue.SimpleQueue()
         threading.Thread(target = self.queueWorker, daemon=True).start()
-        self.reset()
+        if reset:
+            self.reset()
 
     def __del__(self):
         try:
@@ -109,18 +132,24 @@ class MotorController(MCInterface):
         self.startMove()
 
     def flush(self):
-        flushed = b''
-        prevTimeout = self.socket.gettimeout()
-        self.socket.settimeout(self.RECV_BYTE_TIMEOUT)
-        while True:
+        """Discard any received data not yet consumed, without waiting for more
+        """
+        flushed = bytes(self.rxBuffer)
+        self.rxBuffer.clear()
+        try:
+            self.socket.setblocking(False)
             try:
-                data = self.socket.recv(1)
-                flushed += data
-            except:
-                self.socket.settimeout(prevTimeout)
-                if flushed:
-                    self.logger.debug(f"MotorController.flush:{flushed}")
-                return
+                while True:
+                    count = self.socket.recv_into(self.rxChunk)
+                    if not count:
+                        break
+                    flushed += self.rxChunk[:count]
+            finally:
+                self.socket.settimeout(self.SOCKET_TIMEOUT)
+        except:
+            pass
+        if flushed:
+            self.logger.debug(f"MotorController.flush:{flushed}")
 
     def sendall(self, request: bytes) -> bool:
 
@@ -135,49 +164,72 @@ class MotorController(MCInterface):
             self.logger.error(f"MotorController.sendall exception:{e}")
         return False
 
-    def recv(self, replySize: int = 0) -> bytes:
-        prevTimeout = self.socket.gettimeout()
-        self.socket.settimeout(self.RECV_BYTE_TIMEOUT)
-        data = newData = b''
-        endTime = time.time() + self.SOCKET_TIMEOUT if replySize else self.RECV_BYTE_TIMEOUT
-        done = False
-        while not done:
-            if replySize and len(data) >= replySize:
-                done = True
-            else:        
-                try:
-                    newData = self.socket.recv(1)
-                    data += newData
-                except:
-                    pass
-                if not newData and time.time() > endTime:
-                    break
+    def recv(self, replySize: int = 0, handshakes: int = 0) -> bytes:
+        """Receive a reply, reading in chunks into a reusable buffer
+
+        :param int replySize: expected reply length in bytes, including handshakes.
+            If 0, read until the reply ends with a handshake.
+        :param int handshakes: if nonzero, read until this many handshakes are received, instead of replySize.
+            Use for requests containing several commands: each command is answered by one handshake,
+            ':' on success or '?' on error.
+        :return bytes: the reply, or what was received before SOCKET_TIMEOUT
+        """
+        endTime = time.time() + self.SOCKET_TIMEOUT
+        if handshakes:
+            replySize = 0
+        while not self.__replyComplete(replySize, handshakes):
+            remaining = endTime - time.time()
+            if remaining <= 0:
+                break
+            try:
+                self.socket.settimeout(remaining)
+                count = self.socket.recv_into(self.rxChunk)
+            except socket.timeout:
+                break
+            except Exception as e:
+                self.logger.error(f"MotorController.recv exception:{e}")
+                break
+            if not count:
+                # connection closed
+                break
+            self.rxBuffer += self.rxChunk[:count]
+        if replySize and len(self.rxBuffer) > replySize:
+            data = bytes(self.rxBuffer[:replySize])
+            del self.rxBuffer[:replySize]
+        else:
+            data = bytes(self.rxBuffer)
+            self.rxBuffer.clear()
         # self.logger.debug(f"MotorController.recv:{data}")
-        self.socket.settimeout(prevTimeout)
         return data
 
-    def query(self, request: Union[bytes, str], replySize: int = 1) -> bytes:
+    def __replyComplete(self, replySize: int, handshakes: int = 0) -> bool:
+        """Is the buffered reply complete?
+        """
+        if handshakes:
+            # a failed command is answered with '?' and the rest still follow:
+            return sum(self.rxBuffer.count(h) for h in (b':', b'?')) >= handshakes
+        if replySize:
+            return len(self.rxBuffer) >= replySize
+        return len(self.rxBuffer) > 0 and self.rxBuffer[-1] in self.HANDSHAKES
+
+    def query(self, request: Union[bytes, str], replySize: int = 1, handshakes: int = 0) -> bytes:
         if isinstance(request, str):
             request = request.encode()
         
-        qItem = QueueItem(request = request, replySize = replySize)
+        qItem = QueueItem(request = request, replySize = replySize, handshakes = handshakes)
         self.queue.put(qItem)
-                      
-        timeout = time.time() + 2 * self.SOCKET_TIMEOUT
-        while not qItem.complete:
-            time.sleep(0.05)
-            if time.time() > timeout:
-                break
-
+        qItem.wait(2 * self.SOCKET_TIMEOUT)
         return qItem.response
 
     def queueWorker(self):
         while True:
             item = self.queue.get()
             self.flush()
-            if self.sendall(item.request):
-                item.response = self.recv(item.replySize)
-            item.complete = True
+            try:
+                if self.sendall(item.request):
+                    item.response = self.recv(item.replySize, item.handshakes)
+            finally:
+                item.setComplete()
 
     def connected(self) -> bool:
         try:
@@ -322,10 +374,12 @@ class MotorController(MCInterface):
         '''
         data = self.query(b'TTC;', replySize = 10)
         data = removeDelims(data, self.DELIMS)
+        return self.__torquePercent(data)
+
+    def __torquePercent(self, data: list) -> float:
         torque = float(data[0]) if data else 0
         # assert(self.MIN_POL_TORQUE <= torque <= self.MAX_POL_TORQUE)
-        torque = round(copysign(abs(torque) / self.MAX_POL_TORQUE, torque) * 100, 1)
-        return torque
+        return round(copysign(abs(torque) / self.MAX_POL_TORQUE, torque) * 100, 1)
 
     def homeAxis(self, axis:str = 'xy', timeout:float = None):
         if self.getMotorStatus().inMotion():
@@ -392,25 +446,70 @@ class MotorController(MCInterface):
         return data.decode('utf-8')
 
     def getMotorStatus(self) -> MotorStatus:
-        replySize = 22
-        data = self.query(b'TS;', replySize)
-        if not data or len(data) < replySize:
-            return self.motorStatus
-        data = removeDelims(data, self.DELIMS)
-        if len(data) < 3:
-            return self.motorStatus
+        # TS and TTC in one request; each is answered with a handshake:
+        data = self.__splitReply(self.query(b'TS; TTC;', handshakes = 2), 2)
+        if data and data[0] is not None and data[1] is not None:
+            self.__parseMotorStatus(data[0], data[1])
+        return self.motorStatus
+
+    def getStatus(self, retry: int = 2) -> Tuple[MotorStatus, Position]:
+        """Read the motor status, pol torque and position in one request
+
+        :param int retry: number of attempts
+        :return Tuple[MotorStatus, Position]: on error, the most recent values
+        """
+        while retry > 0:
+            retry -= 1
+            if self.__getStatus():
+                break
+        return self.motorStatus, self.position
+
+    def __getStatus(self) -> bool:
+        # LZ and PF set the position format, as in __getPosition:
+        data = self.__splitReply(self.query(b'\nLZ 0; PF 10,0; TS; TTC; RPX; RPY; TPZ;', handshakes = 7), 7)
+        if not data:
+            return False
+        status = None
+        position = None
+        if data[2] is not None and data[3] is not None:
+            status = self.__parseMotorStatus(data[2], data[3])
+        if all(fields is not None for fields in data[4:7]):
+            position = self.__parsePosition(data[4] + data[5] + data[6])
+        return status is not None and position is not None
+
+    def __splitReply(self, data: bytes, handshakes: int) -> Optional[List[Optional[List[bytes]]]]:
+        """Split the reply to a multi-command request into the fields of each command
+
+        :return list of fields for each command, None in place of a command which failed with '?'.
+            None if fewer than handshakes replies were received.
+        """
+        if not data:
+            return None
+        replies = []
+        start = 0
+        for index, byte in enumerate(data):
+            if byte in self.HANDSHAKES:
+                replies.append(removeDelims(data[start:index], self.DELIMS) if byte == ord(':') else None)
+                start = index + 1
+                if len(replies) == handshakes:
+                    return replies
+        return None
+
+    def __parseMotorStatus(self, status: list, torque: list) -> Optional[MotorStatus]:
+        if len(status) < 3:
+            return None
         try:
             self.motorStatus = MotorStatus(
-                xPower = bool(1 - (int(data[0]) >> 5) & 1),   # !bit 5
-                yPower = bool(1 - (int(data[1]) >> 5) & 1),
-                polPower = bool(1 - (int(data[2]) >> 5) & 1),
-                xMotion = bool((int(data[0]) >> 7) & 1),      # bit 7
-                yMotion = bool((int(data[1]) >> 7) & 1),
-                polMotion = bool((int(data[2]) >> 7) & 1),
-                polTorque = self.getPolTorque()
+                xPower = bool(1 - (int(status[0]) >> 5) & 1),   # !bit 5
+                yPower = bool(1 - (int(status[1]) >> 5) & 1),
+                polPower = bool(1 - (int(status[2]) >> 5) & 1),
+                xMotion = bool((int(status[0]) >> 7) & 1),      # bit 7
+                yMotion = bool((int(status[1]) >> 7) & 1),
+                polMotion = bool((int(status[2]) >> 7) & 1),
+                polTorque = self.__torquePercent(torque)
             )
         except:
-            pass
+            return None
         return self.motorStatus
     
     def getPosition(self, cached: bool = True, retry: int = 2) -> Position:
@@ -430,7 +529,9 @@ class MotorController(MCInterface):
         data = self.query(b'\nLZ 0; PF 10,0; RPX; RPY; TPZ;', replySize)
         if not data or len(data) < replySize:
             return None
-        data = removeDelims(data, self.DELIMS)
+        return self.__parsePosition(removeDelims(data, self.DELIMS))
+
+    def __parsePosition(self, data: list) -> Optional[Position]:
         if len(data) < 3:
             return None
         # negate because motors are opposite what we want to call (0,0)
@@ -524,8 +625,7 @@ class MotorController(MCInterface):
             stopSignal = self.stop,
             timedOut = ((time.time() - self.startTime) > self.timeout) if self.timeout else False
         )
-        status = self.getMotorStatus()
-        pos = self.getPosition(cached = False)
+        status, pos = self.getStatus()
         if (not status.inMotion() and pos == self.nextPos):
             result.success = True
         elif status.powerFail():
@@ -533,19 +633,17 @@ class MotorController(MCInterface):
         return result
 
     def waitForMove(self, timeout: float = None) -> MoveStatus:
-        startTime = time.time()
-        elapsed = 0.0
-        moveStatus = self.getMoveStatus()
-        while not self.stop and not moveStatus.shouldStop():
-            elapsed = time.time() - startTime
-            if timeout and elapsed > timeout:
-                break
-            time.sleep(0.5)
+        def moveDone() -> MoveStatus:
             moveStatus = self.getMoveStatus()
-            torque = self.getPolTorque()
+            # read along with the position by getMoveStatus:
+            torque = self.motorStatus.polTorque
             if abs(torque) > 20:
                 self.logger.warning(f"waitForMove: pol torque:{torque} %")
-        
+            return moveStatus if moveStatus.shouldStop() else None
+
+        wait = waitUntil(moveDone, timeout or None, minInterval = self.MOVE_POLL_MIN, maxInterval = self.MOVE_POLL_MAX,
+                         cancel = lambda: self.stop)
+        moveStatus = wait.value if wait.success else self.getMoveStatus()
         if moveStatus.isError():
             self.logger.error(moveStatus.getText())
         return moveStatus
@@ -3,6 +3,7 @@ Data models and interface for three-axis motor controller
 '''
 from .schemas import MotorStatus, Position, MoveStatus
 from abc import ABC, abstractmethod
+from typing import Tuple
 
 class MCError(Exception):
     def __init__(self, *args):
@@ -87,6 +88,13 @@ class MCInterface(ABC):
     def getPosition(self, cached: bool = True, retry: int = 2) -> Position:
         pass
 
+    def getStatus(self) -> Tuple[MotorStatus, Position]:
+        '''
+        motor status and current position together.  
+        Override where the controller can read both in one request.
+        '''
+        return self.getMotorStatus(), self.getPosition(cached = False)
+
     @abstractmethod
     def positionInBounds(self, pos: Position) -> bool:
         pass
@@ -5,6 +5,7 @@ import time
 from math import sqrt
 from copy import deepcopy
 import logging
+from INSTR.Common.WaitUntil import waitUntil
 
 class MCSimulator(MCInterface):
     X_MIN = 0
@@ -221,15 +222,13 @@ class MCSimulator(MCInterface):
     def waitForMove(self, timeout: float = None) -> MoveStatus:
         if timeout:
             self.timeout = timeout
-        moveStatus = self.getMoveStatus()
-        while not self.stop and not moveStatus.shouldStop():
-            elapsed = time.time() - self.startTime
-            if self.timeout and elapsed > self.timeout:
-                break
-            time.sleep(0.25)
+        def moveDone() -> MoveStatus:
             moveStatus = self.getMoveStatus()
             torque = self.getPolTorque()
             if abs(torque) > 20:
                 self.logger.warning(f"waitForMove: pol torque:{torque} %")
+            return moveStatus if moveStatus.shouldStop() else None
 
-        return moveStatus
\ No newline at end of file
+        remaining = max(0, self.timeout - (time.time() - self.startTime)) if self.timeout else None
+        wait = waitUntil(moveDone, remaining, minInterval = 0.02, maxInterval = 0.25, cancel = lambda: self.stop)
+        return wait.value if wait.success else self.getMoveStatus()
\ No newline at end of file
@@ -0,0 +1,166 @@
+'''
+On-the-fly raster scan with the beam scanner motor controller and the PNA.
+Each row is a single triggered move along X: the motor controller sends a trigger to the PNA
+every triggerInterval mm and the PNA measures one point per trigger.
+While one row's trace is being read from the PNA the scanner is already moving to the start of the next row.
+'''
+from .schemas import MoveStatus, Position, RasterScanConfig, RasterRow, RasterRowData, RasterScanResult
+from .MCInterface import MCInterface
+from .MCSimulator import MCSimulator
+from INSTR.PNA.schemas import MeasConfig, TriggerSource
+from INSTR.PNA.PNAInterface import PNAInterface
+from INSTR.PNA.PNASimulator import PNASimulator
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import deepcopy
+from typing import List, Optional, Tuple
+import numpy as np
+import logging
+import time
+
+class RasterScanner():
+
+    def __init__(self,
+            mc: Optional[MCInterface] = None,
+            pna: Optional[PNAInterface] = None,
+            simulate: bool = False):
+        '''
+        mc: motor controller
+        pna: network analyzer
+        simulate: if True, ignore mc and pna and use MCSimulator and PNASimulator
+        '''
+        self.logger = logging.getLogger("ALMAFE-CTS-Control")
+        self.simulate = simulate
+        if simulate:
+            self.mc = MCSimulator()
+            self.pna = PNASimulator()
+        else:
+            self.mc = mc
+            self.pna = pna
+        self.stopNow = False
+        # PNA readout runs here, overlapping the move to the next row:
+        self.executor = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "RasterScan PNA")
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        '''
+        Stop the PNA readout thread.  Call when done with the scanner.
+        '''
+        self.executor.shutdown(wait = False)
+
+    def stop(self):
+        '''
+        Stop the scan in progress after the current move
+        '''
+        self.stopNow = True
+        self.mc.stopMove()
+
+    def planRows(self, config: RasterScanConfig) -> List[RasterRow]:
+        '''
+        Make the list of rows to scan, reversing every other row if config.serpentine
+        '''
+        rows = []
+        yStep = abs(config.yStep) if config.yStop >= config.yStart else -abs(config.yStep)
+        for index in range(config.yPoints()):
+            reverse = config.serpentine and index % 2 == 1
+            rows.append(RasterRow(
+                index = index,
+                y = round(config.yStart + index * yStep, 3),
+                xStart = config.xStop if reverse else config.xStart,
+                xStop = config.xStart if reverse else config.xStop,
+                pol = config.pol
+            ))
+        return rows
+
+    def armPNA(self, config: RasterScanConfig, measConfig: MeasConfig) -> MeasConfig:
+        '''
+        Configure the PNA to take one point per external trigger, for a full row
+        returns the MeasConfig as sent
+        '''
+        measConfig = deepcopy(measConfig)
+        measConfig.sweepPoints = config.xPoints()
+        measConfig.triggerSource = TriggerSource.EXTERNAL
+        self.pna.setMeasConfig(measConfig)
+        return measConfig
+
+    def scan(self, config: RasterScanConfig, measConfig: MeasConfig) -> RasterScanResult:
+        '''
+        Run a raster scan
+        config: the scan area and trigger interval
+        measConfig: PNA settings.  sweepPoints and triggerSource are replaced.
+        '''
+        self.stopNow = False
+        result = RasterScanResult()
+        rows = self.planRows(config)
+        for row in rows:
+            if not self.mc.positionInBounds(row.startPos()) or not self.mc.positionInBounds(row.endPos()):
+                result.message = f"RasterScanner: out of bounds: {row.getText()}"
+                self.logger.error(result.message)
+                return result
+
+        self.logger.info(f"RasterScanner: {config.getText()}")
+        self.armPNA(config, measConfig)
+        startTime = time.time()
+        pending = None
+        try:
+            for row in rows:
+                if self.stopNow:
+                    result.message = "RasterScanner: stopped"
+                    break
+                moveStatus = self.__moveTo(row.startPos(), config.moveTimeout)
+                # the previous row's trace must be read before the PNA sees the next row's triggers:
+                if pending and not self.__collect(pending, config, result):
+                    pending = None
+                    break
+                pending = None
+                if not moveStatus.success:
+                    result.message = f"RasterScanner: move to start of {row.getText()} failed: {moveStatus.getText()}"
+                    break
+                self.mc.setTriggerInterval(config.triggerInterval)
+                self.mc.setNextPos(row.endPos())
+                self.mc.startMove(True, config.moveTimeout)
+                moveStatus = self.mc.waitForMove(config.moveTimeout)
+                if not moveStatus.success:
+                    result.message = f"RasterScanner: triggered move {row.getText()} failed: {moveStatus.getText()}"
+                    break
+                pending = (row, self.executor.submit(self.pna.getTrace, y = row.y, reverseX = row.isReversed()))
+            if pending:
+                self.__collect(pending, config, result)
+        except Exception as e:
+            result.message = f"RasterScanner: {e}"
+
+        result.elapsed = time.time() - startTime
+        result.success = result.message is None
+        if result.success:
+            self.logger.info(f"RasterScanner: {len(result.rows)} rows in {result.elapsed:.1f} sec")
+        else:
+            self.logger.error(result.message)
+        return result
+
+    def __moveTo(self, pos: Position, timeout: float) -> MoveStatus:
+        '''
+        Untriggered move to pos, skipped if already there
+        '''
+        if self.mc.getPosition(cached = False) == pos:
+            return MoveStatus(success = True)
+        self.mc.setNextPos(pos)
+        self.mc.startMove(False, timeout)
+        return self.mc.waitForMove(timeout)
+
+    def __collect(self, pending: Tuple[RasterRow, Future], config: RasterScanConfig, result: RasterScanResult) -> bool:
+        '''
+        Wait for a row's trace and append it to result in order of increasing X
+        '''
+        row, future = pending
+        amp, phase = future.result()
+        if amp is None or phase is None:
+            result.message = f"RasterScanner: no trace for {row.getText()}"
+            return False
+        x = np.linspace(row.xStart, row.xStop, len(amp))
+        amp = np.asarray(amp)
+        phase = np.asarray(phase)
+        if row.isReversed():
+            x, amp, phase = x[::-1], amp[::-1], phase[::-1]
+        result.rows.append(RasterRowData(row = row, x = x.tolist(), amp = amp.tolist(), phase = phase.tolist()))
+        return True
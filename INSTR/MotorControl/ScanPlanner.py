@@ -0,0 +1,153 @@
+'''
+Order the points of a beam scan to minimize the total move time.
+Points are grouped by pol angle because the pol axis is the slowest.
+Within each group the points are visited in serpentine rows, along X or along Y,
+starting from whichever corner is quickest to reach.
+'''
+from .schemas import Position, ScanPlan
+from .MCInterface import MCInterface
+from typing import Dict, Iterable, List, Optional
+from math import sqrt
+
+class ScanPlanner():
+    XY_ACCEL = 50       # mm/sec^2, also decel.  The controller default.
+    POL_ACCEL = 50      # deg/sec^2, also decel
+    SETTLE_TIME = 0.25  # sec, added to every move for start and completion polling
+
+    def __init__(self,
+            mc: MCInterface,
+            xyAccel: float = XY_ACCEL,
+            polAccel: float = POL_ACCEL,
+            settleTime: float = SETTLE_TIME,
+            dwellTime: float = 0):
+        '''
+        mc: motor controller supplying the axis speeds and limits
+        xyAccel: mm/sec^2
+        polAccel: deg/sec^2
+        settleTime: seconds of overhead for each move
+        dwellTime: seconds spent measuring at each point
+        '''
+        self.mc = mc
+        self.xySpeed = mc.getXYSpeed()
+        self.polSpeed = mc.getPolSpeed()
+        self.xyAccel = xyAccel
+        self.polAccel = polAccel
+        self.settleTime = settleTime
+        self.dwellTime = dwellTime
+
+    def moveTime(self, fromPos: Position, toPos: Position) -> float:
+        '''
+        Predict how many seconds it will take to move fromPos toPos.
+        Unlike MCInterface.estimateMoveTime this is a best estimate, not a timeout.
+        The axes move independently, each with a trapezoidal velocity profile.
+        '''
+        if fromPos == toPos:
+            return 0
+        vector = fromPos.calcMove(toPos)
+        return max(
+            self.__axisTime(abs(vector.x), self.xySpeed, self.xyAccel),
+            self.__axisTime(abs(vector.y), self.xySpeed, self.xyAccel),
+            self.__axisTime(abs(vector.pol), self.polSpeed, self.polAccel)
+        ) + self.settleTime
+
+    def planGrid(self,
+            xs: Iterable[float],
+            ys: Iterable[float],
+            pols: Iterable[float],
+            startPos: Optional[Position] = None,
+            serpentine: bool = True) -> ScanPlan:
+        '''
+        Plan a scan over every combination of xs, ys and pols
+        '''
+        points = [Position(x = x, y = y, pol = pol) for pol in pols for y in ys for x in xs]
+        return self.planPoints(points, startPos, serpentine)
+
+    def planPoints(self,
+            points: List[Position],
+            startPos: Optional[Position] = None,
+            serpentine: bool = True) -> ScanPlan:
+        '''
+        Order a list of points to minimize the total move time
+        startPos: where the scanner is now.  If None, read it from the motor controller
+        serpentine: if False, every row is scanned in the same direction
+        raises ValueError if any point is out of bounds
+        '''
+        outOfBounds = [p for p in points if not self.mc.positionInBounds(p)]
+        if outOfBounds:
+            raise ValueError(f"ScanPlanner: {len(outOfBounds)} points out of bounds, first: {outOfBounds[0].getText()}")
+        if startPos is None:
+            startPos = self.mc.getPosition()
+
+        groups: Dict[float, List[Position]] = {}
+        for p in points:
+            groups.setdefault(round(p.pol, 3), []).append(p)
+        # sweep the pol angles once, in the direction which starts nearest:
+        pols = sorted(groups.keys())
+        if pols and abs(pols[-1] - startPos.pol) < abs(pols[0] - startPos.pol):
+            pols.reverse()
+
+        ordered = []
+        pos = startPos
+        for pol in pols:
+            group = self.__orderGroup(groups[pol], pos, serpentine)
+            ordered += group
+            pos = group[-1]
+        return self.evaluate(ordered, startPos)
+
+    def evaluate(self, points: List[Position], startPos: Position) -> ScanPlan:
+        '''
+        Predict the move times for visiting points in the order given
+        '''
+        plan = ScanPlan(points = points)
+        pos = startPos
+        for p in points:
+            plan.moveTimes.append(self.moveTime(pos, p))
+            pos = p
+        plan.totalTime = sum(plan.moveTimes) + self.dwellTime * len(points)
+        return plan
+
+    def __orderGroup(self, points: List[Position], startPos: Position, serpentine: bool) -> List[Position]:
+        '''
+        Try rows along X and along Y, from each corner, and return the quickest
+        '''
+        best = None
+        bestTime = None
+        for byRows in (True, False):
+            for reverseOuter in (False, True):
+                for reverseFirst in (False, True):
+                    candidate = self.__rows(points, byRows, reverseOuter, reverseFirst, serpentine)
+                    time = self.evaluate(candidate, startPos).totalTime
+                    if bestTime is None or time < bestTime:
+                        best = candidate
+                        bestTime = time
+        return best
+
+    def __rows(self,
+            points: List[Position],
+            byRows: bool,
+            reverseOuter: bool,
+            reverseFirst: bool,
+            serpentine: bool) -> List[Position]:
+        '''
+        Order points in rows of constant Y (byRows) or columns of constant X
+        '''
+        outer, inner = (lambda p: p.y, lambda p: p.x) if byRows else (lambda p: p.x, lambda p: p.y)
+        lines: Dict[float, List[Position]] = {}
+        for p in points:
+            lines.setdefault(round(outer(p), 3), []).append(p)
+        result = []
+        reverse = reverseFirst
+        for key in sorted(lines.keys(), reverse = reverseOuter):
+            result += sorted(lines[key], key = inner, reverse = reverse)
+            if serpentine:
+                reverse = not reverse
+        return result
+
+    def __axisTime(self, distance: float, speed: float, accel: float) -> float:
+        if not distance:
+            return 0
+        if distance >= speed ** 2 / accel:
+            # accelerate to full speed, cruise, decelerate:
+            return distance / speed + speed / accel
+        # triangular profile, never reaching full speed:
+        return 2 * sqrt(distance / accel)
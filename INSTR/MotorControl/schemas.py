@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class MotorStatus(BaseModel):
     xPower: bool = False
@@ -61,4 +62,80 @@ class ControllerQuery(BaseModel):
     request: str
     replySize: int
     def getText(self):
-        return f"'{self.request}' with replySize {self.replySize}"
\ No newline at end of file
+        return f"'{self.request}' with replySize {self.replySize}"
+
+class RasterScanConfig(BaseModel):
+    """
+    An on-the-fly raster scan: rows along X, stepping in Y, at a fixed pol angle.
+    The motor controller triggers the PNA every triggerInterval mm along each row,
+    including at the start and end of the row.
+    """
+    xStart: float = 0
+    xStop: float = 100
+    yStart: float = 0
+    yStop: float = 100
+    yStep: float = 10
+    pol: float = 0
+    triggerInterval: float = Field(1, gt = 0)     # mm
+    serpentine: bool = True         # reverse the X direction on every other row
+    moveTimeout: float = 60         # seconds, for each move
+
+    def xPoints(self) -> int:
+        return int(round(abs(self.xStop - self.xStart) / self.triggerInterval)) + 1
+
+    def yPoints(self) -> int:
+        if not self.yStep:
+            return 1
+        return int(round(abs(self.yStop - self.yStart) / abs(self.yStep))) + 1
+
+    def getText(self) -> str:
+        return f"x {self.xStart}..{self.xStop} y {self.yStart}..{self.yStop} step {self.yStep} pol {self.pol}: " + \
+               f"{self.yPoints()} rows of {self.xPoints()} points"
+
+class RasterRow(BaseModel):
+    """
+    One row of a raster scan: a single triggered move along X
+    """
+    index: int = 0
+    y: float = 0
+    xStart: float = 0
+    xStop: float = 0
+    pol: float = 0
+
+    def isReversed(self) -> bool:
+        return self.xStart > self.xStop
+
+    def startPos(self) -> Position:
+        return Position(x = self.xStart, y = self.y, pol = self.pol)
+
+    def endPos(self) -> Position:
+        return Position(x = self.xStop, y = self.y, pol = self.pol)
+
+    def getText(self) -> str:
+        return f"row {self.index}: y={self.y} x {self.xStart}..{self.xStop}"
+
+class RasterRowData(BaseModel):
+    """
+    Trace data for one row, in order of increasing X
+    """
+    row: RasterRow
+    x: List[float] = []
+    amp: List[float] = []
+    phase: List[float] = []
+
+class RasterScanResult(BaseModel):
+    rows: List[RasterRowData] = []
+    success: bool = False
+    message: Optional[str] = None
+    elapsed: float = 0      # seconds
+
+class ScanPlan(BaseModel):
+    """
+    An ordered list of positions to visit, with the predicted time for the move to each
+    """
+    points: List[Position] = []
+    moveTimes: List[float] = []     # seconds, moveTimes[i] is the move to points[i]
+    totalTime: float = 0            # seconds, including dwell time at each point
+
+    def getText(self) -> str:
+        return f"{len(self.points)} points in {self.totalTime:.1f} sec"
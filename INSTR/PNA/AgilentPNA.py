@@ -1,7 +1,8 @@
 from .PNAInterface import *
 from .BaseAgilentPNA import *
 import time
-from typing import Tuple
+from typing import Tuple, Optional
+import numpy as np
 from statistics import mean
 from math import log10, pi, sqrt, atan2
 import logging
@@ -74,31 +75,32 @@ class AgilentPNA(BaseAgilentPNA):
         :param MeasConfig config
         """
         self.measConfig = config
-        # delete then re-create the measurement:
-        measNames = self.listMeasurementParameters(config.channel)
-        if measNames:
-            self.configureMeasurementParameter(config.channel, Mode.DELETE, measName = measNames[0])
-        self.configureMeasurementParameter(config.channel, Mode.CREATE, config.measType, config.measName)
-        # display the trace:
-        self.configureDisplayTrace(Mode.CREATE, measName = config.measName)
-        # configure sweep generator, type, points
-        self.configureSweep(config.channel,
-                            config.sweepType,
-                            config.sweepGenType,
-                            config.timeout_sec,
-                            config.sweepPoints,
-                            config.sweepTimeAuto)
-        # configure bandwidth, frequency, trigger
-        self.configureBandwidth(config.channel, config.bandWidthHz)
-        self.configureFreqCenterSpan(config.channel, config.centerFreq_Hz, config.spanFreq_Hz)
-        # 0.5ms delay on triggering so multiple points aren't measured from one trigger pulse:
-        self.setTriggerSweepSignal(config.triggerSource, 
-                                   TriggerScope.CURRENT_CHANNEL if config.triggerSource == TriggerSource.EXTERNAL else TriggerScope.ALL_CHANNELS,
-                                   TriggerLevel.HIGH,
-                                   0.0005)
-        self.configureTriggerChannel(config.channel, triggerPoint = True, mode = TriggerMode.CONTINUOUS)
-        # Use BNC1 for external trigger:
-        self.inst.write(":CONT:SIGN BNC1,TILHIGH;")
+        with self.inst.batch():
+            # delete then re-create the measurement:
+            measNames = self.listMeasurementParameters(config.channel)
+            if measNames:
+                self.configureMeasurementParameter(config.channel, Mode.DELETE, measName = measNames[0])
+            self.configureMeasurementParameter(config.channel, Mode.CREATE, config.measType, config.measName)
+            # display the trace:
+            self.configureDisplayTrace(Mode.CREATE, measName = config.measName)
+            # configure sweep generator, type, points
+            self.configureSweep(config.channel,
+                                config.sweepType,
+                                config.sweepGenType,
+                                config.timeout_sec,
+                                config.sweepPoints,
+                                config.sweepTimeAuto)
+            # configure bandwidth, frequency, trigger
+            self.configureBandwidth(config.channel, config.bandWidthHz)
+            self.configureFreqCenterSpan(config.channel, config.centerFreq_Hz, config.spanFreq_Hz)
+            # 0.5ms delay on triggering so multiple points aren't measured from one trigger pulse:
+            self.setTriggerSweepSignal(config.triggerSource, 
+                                       TriggerScope.CURRENT_CHANNEL if config.triggerSource == TriggerSource.EXTERNAL else TriggerScope.ALL_CHANNELS,
+                                       TriggerLevel.HIGH,
+                                       0.0005)
+            self.configureTriggerChannel(config.channel, triggerPoint = True, mode = TriggerMode.CONTINUOUS)
+            # Use BNC1 for external trigger:
+            self.inst.write(":CONT:SIGN BNC1,TILHIGH;")
         time.sleep(1)
 
     def setPowerConfig(self, config:PowerConfig):
@@ -106,40 +108,51 @@ class AgilentPNA(BaseAgilentPNA):
         :param PowerConfig config
         """
         self.powerConfig = config
-        self.configurePowerAttenuation(config.channel, config.attenuation_dB)
-        self.configurePowerLevel(config.channel, config.powerLevel_dBm)
-        self.configurePowerState(True)
+        with self.inst.batch():
+            self.configurePowerAttenuation(config.channel, config.attenuation_dB)
+            self.configurePowerLevel(config.channel, config.powerLevel_dBm)
+            self.configurePowerState(True)
 
     def getTrace(self, *args, **kwargs) -> Tuple[List[float], List[float]]:
         """Get trace data as a list of float
+        :param bool asArray: keyword argument. If True return numpy arrays instead of lists
         :return Tuple[List[float], List[float]]
         """
+        trace = self.getTraceComplex()
+        if trace is None:
+            return None, None
+        trace = trace.astype(np.complex128)
+        with np.errstate(divide = 'ignore'):
+            # not taking sqrt because the value we want is power, not voltage:
+            amp = 10 * np.log10(trace.real ** 2 + trace.imag ** 2)
+        phase = np.degrees(np.angle(trace))
+        if kwargs.get('asArray', False):
+            return amp, phase
+        return amp.tolist(), phase.tolist()
+
+    def getTraceComplex(self) -> Optional[np.ndarray]:
+        """Get trace data as raw complex values
+        :return np.ndarray of complex64 or None on error
+        """
         if self.measConfig.triggerSource == TriggerSource.MANUAL:
             for _ in range(self.measConfig.sweepPoints):
                 self.generateTriggerSignal(self.measConfig.channel, True)
                 time.sleep(0.1)
         
-        sweepComplete = False
-        startTime = time.time()
-        elapsed = 0
-        while not sweepComplete and elapsed < self.measConfig.timeout_sec:
-            sweepComplete = self.checkSweepComplete(waitForComplete = False)
-            elapsed = time.time() - startTime
-        
-        if sweepComplete:
-            data = self.readData(self.measConfig.channel, self.measConfig.format, self.measConfig.sweepPoints, self.measConfig.measName)
-            if data:
-                real_a = data[::2]
-                imag_a = data[1::2]
-                # not taking sqrt because the value we want is power, not voltage:
-                amp = [10 * log10(real ** 2 + imag ** 2) for real, imag in zip(real_a, imag_a)]
-                phase = [atan2(imag, real) * 180 / pi for real, imag in zip(real_a, imag_a)]
-                return amp, phase
-            else:
-                self.logger.error("getTrace no data")
-        else:
+        if not self.checkSweepComplete(waitForComplete = True, timeoutSec = self.measConfig.timeout_sec):
             self.logger.error("getTrace timeout")
-        return None, None
+            return None
+        trace = self.readComplex(self.measConfig.channel, self.measConfig.format, self.measConfig.sweepPoints, self.measConfig.measName)
+        if trace is None or not len(trace):
+            self.logger.error("getTrace no data")
+            return None
+        return trace
+
+    async def getTraceAsync(self, *args, **kwargs) -> Tuple[List[float], List[float]]:
+        """Awaitable getTrace(), running on this instrument's I/O thread
+        :return Tuple[List[float], List[float]]
+        """
+        return await self.ainst.run(self.getTrace, *args, **kwargs)
             
     def getAmpPhase(self) -> Tuple[float]:
         """Get instantaneous amplitude and phase
@@ -3,18 +3,39 @@ from .schemas import *
 from typing import Tuple, List, Optional
 from INSTR.Common.RemoveDelims import removeDelims
 from INSTR.Common.VisaInstrument import VisaInstrument
+from INSTR.Common.AsyncVisaInstrument import AsyncVisaInstrument
+from INSTR.Common.ShadowState import ShadowState
+from INSTR.Common.WaitUntil import waitUntil
 import re
 import time
+import numpy as np
 import logging
 
 class BaseAgilentPNA(PNAInterface):
 
     DELIMS_KEEP_COMMA = r'["\s\r\n]'
     DEFAULT_TIMEOUT = 10000
+    POLL_MIN_INTERVAL = 0.002   # seconds, when waiting for sweep complete without service requests
+    POLL_MAX_INTERVAL = 0.05
+    # commands with side effects, and states the analyzer changes by itself, for the shadow state:
+    # the sweep mode goes to HOLD after a single sweep and the RF power trips off on a receiver overload
+    SHADOW_ALWAYS_SEND = ("CALC:PAR:DEF", "CALC:PAR:DEL", "DISP:WIND:TRAC:FEED", "SENS:SWE:MODE", "OUTP")
+    SHADOW_COUPLED = {
+        "CALC:PAR:DEF": ("CALC:PAR:SEL", ),
+        "CALC:PAR:DEL": ("CALC:PAR:SEL", ),
+        "DISP:WIND": ("DISP:WIND:TITL", ),
+        "SENS:SWE:TYPE": ("SENS:FREQ", "SENS:SWE"),
+        "SENS:FREQ:STAR": ("SENS:FREQ:CENT", "SENS:FREQ:SPAN"),
+        "SENS:FREQ:STOP": ("SENS:FREQ:CENT", "SENS:FREQ:SPAN"),
+        "SENS:FREQ:CENT": ("SENS:FREQ:STAR", "SENS:FREQ:STOP"),
+        "SENS:FREQ:SPAN": ("SENS:FREQ:STAR", "SENS:FREQ:STOP")
+    }
 
     def __init__(self, resource="GPIB0::16::INSTR", idQuery=True, reset=True):
         self.logger = logging.getLogger()
-        self.inst = VisaInstrument(resource, timeout = self.DEFAULT_TIMEOUT)        
+        self.inst = VisaInstrument(resource, timeout = self.DEFAULT_TIMEOUT,
+            shadow = ShadowState(alwaysSend = self.SHADOW_ALWAYS_SEND, coupled = self.SHADOW_COUPLED))
+        self.ainst = AsyncVisaInstrument(self.inst)
         ok = self.connected()
         if ok and idQuery:
             ok = self.idQuery()
@@ -30,14 +51,7 @@ class BaseAgilentPNA(PNAInterface):
         
     def connected(self) -> bool:
         # *TST? Returns the result of a query of the analyzer hardward status. An 0 indicates no failures found.
-        if not self.inst.connected:
-            return False
-        try:
-            result = self.inst.query("*TST?")
-            result = removeDelims(result)
-            return len(result) > 0
-        except:
-            return False
+        return self.inst.probe("*TST?")
 
     def idQuery(self) -> Optional[str]:
         """Perform an ID query and check compatibility
@@ -71,6 +85,9 @@ class BaseAgilentPNA(PNAInterface):
         """
         if self.inst.query("SYST:PRES;*WAI;*OPC?"):
             self.inst.write(":STAT:OPER:DEV:ENAB 16;\n:STAT:OPER:DEV:PTR 16;\n*CLS")
+            if self.inst.supports_srq:
+                # route the operation summary to the status byte so that sweep complete raises a service request:
+                self.inst.write(":STAT:OPER:ENAB 65535;*SRE 128")
             return True
         else:
             return False
@@ -200,18 +217,42 @@ class BaseAgilentPNA(PNAInterface):
             self.inst.write(":ABOR;")
 
     def checkSweepComplete(self, waitForComplete:bool = True, timeoutSec:float = 20.0) -> bool:
-        complete = False
-        startTime = time.time()
-        while not complete:
-            time.sleep(.020)
-            result = removeDelims(self.inst.query(":STAT:OPER:DEV?"))
-            if int(result[0]):
-                complete = True
-            elif not waitForComplete:
-                break
-            elif time.time() - startTime > timeoutSec:
-                break
-        return complete
+        """Check for, or wait for, the sweep complete event latched in :STAT:OPER:DEV
+
+        Waits on VISA service requests if the interface supports them.
+        Otherwise polls with waitUntil(), starting at POLL_MIN_INTERVAL and doubling up to POLL_MAX_INTERVAL.
+
+        :param bool waitForComplete: if False, check once and return
+        :param float timeoutSec: how long to wait
+        :return bool: True if a sweep completed
+        """
+        if not waitForComplete:
+            return self.__sweepCompleteEvent()
+        deadline = time.time() + timeoutSec
+        with self.inst.service_requests() as srq:
+            while srq:
+                if self.__sweepCompleteEvent():
+                    return True
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                if not self.inst.wait_for_srq(remaining * 1000) and time.time() < deadline:
+                    # error rather than timeout; fall back to polling:
+                    srq = False
+            return waitUntil(self.__sweepCompleteEvent, max(0, deadline - time.time()),
+                minInterval = self.POLL_MIN_INTERVAL, maxInterval = self.POLL_MAX_INTERVAL).success
+
+    def __sweepCompleteEvent(self) -> bool:
+        """Read and clear the sweep complete event
+
+        Also reads :STAT:OPER? to clear the summary event so the next sweep raises a new service request.
+        :return bool: True if a sweep completed since the last read
+        """
+        result = removeDelims(self.inst.query(":STAT:OPER:DEV?;:STAT:OPER?"), r'[;,"\s\r\n]')
+        try:
+            return int(result[0]) != 0
+        except:
+            return False
 
     def setDataFormat(self, format:DataFormat = DataFormat.REAL32, order:DataOrder = DataOrder.NORMAL):
         self.inst.write(f":FORM:DATA {format.value};BORD {order.value};")
@@ -230,13 +271,36 @@ class BaseAgilentPNA(PNAInterface):
     def readData(self, channel:int = 1, 
                        format:Format = Format.FDATA, 
                        sampleCount:int = 401, 
-                       measName:str = "MY_MEAS"):
+                       measName:str = "MY_MEAS",
+                       asArray:bool = False):
+        """Read trace data as REAL,32
+
+        :param bool asArray: if True return a float32 numpy array instead of a list
+        :return list or np.ndarray or None on error. Complex formats are interleaved real, imag.
+        """
         self.configureMeasurementParameter(channel, Mode.SELECT, measName = measName)
         self.setDataFormat(DataFormat.REAL32)
-        trace = None
-        try:
-            trace = self.inst.inst.query_binary_values(f"CALC{channel}:DATA? {format.value};", datatype='f', is_big_endian = True)
-        except:
-            pass
+        trace = self.inst.query_binary_values(
+            f"CALC{channel}:DATA? {format.value};",
+            datatype = 'f',
+            is_big_endian = True,
+            container = np.array if asArray else list
+        )
+        if asArray and trace is not None:
+            # native byte order so it can be viewed as complex:
+            trace = np.ascontiguousarray(trace, dtype = np.float32)
         return trace
 
+    def readComplex(self, channel:int = 1,
+                          format:Format = Format.SDATA,
+                          sampleCount:int = 401,
+                          measName:str = "MY_MEAS") -> Optional[np.ndarray]:
+        """Read complex trace data
+
+        :return np.ndarray of complex64 or None on error
+        """
+        trace = self.readData(channel, format, sampleCount, measName, asArray = True)
+        if trace is None or len(trace) < 2:
+            return None
+        return trace[:len(trace) // 2 * 2].view(np.complex64)
+
@@ -3,6 +3,8 @@ Data models and interface for three-axis motor controller
 '''
 from .schemas import *
 from abc import ABC, abstractmethod
+import asyncio
+import numpy as np
 from typing import Tuple, List, Optional
 
 class PNAInterface(ABC):
@@ -53,6 +55,19 @@ class PNAInterface(ABC):
         :return Tuple[List[float], List[float]]
         """
         pass
+
+    @abstractmethod
+    def getTraceComplex(self) -> Optional[np.ndarray]:
+        """Get trace data as raw complex values
+        :return np.ndarray of complex64 or None on error
+        """
+        pass
+
+    async def getTraceAsync(self, *args, **kwargs) -> Tuple[List[float], List[float]]:
+        """Awaitable getTrace(), running on a worker thread unless overridden
+        :return Tuple[List[float], List[float]]
+        """
+        return await asyncio.to_thread(self.getTrace, *args, **kwargs)
     
     @abstractmethod
     def getAmpPhase(self) -> Tuple[float]:
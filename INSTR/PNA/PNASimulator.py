@@ -3,6 +3,7 @@ from .PNAInterface import *
 from typing import Tuple, List, Optional
 from random import gauss, random
 from math import log10, pi, sqrt, atan2, exp, sin
+import numpy as np
 
 class PNASimulator(PNAInterface):
 
@@ -68,7 +69,16 @@ class PNASimulator(PNAInterface):
         if reverseX:
             amp = list(reversed(amp))
             phase = list(reversed(phase))
+        if kwargs.get('asArray', False):
+            return np.array(amp), np.array(phase)
         return amp, phase
+
+    def getTraceComplex(self, *args, **kwargs) -> Optional[np.ndarray]:
+        """Get trace data as raw complex values
+        :return np.ndarray of complex64
+        """
+        amp, phase = self.getTrace(*args, asArray = True, **kwargs)
+        return (np.sqrt(10 ** (amp / 10)) * np.exp(1j * np.radians(phase))).astype(np.complex64)
         
     def getAmpPhase(self) -> Tuple[float]:
         """Get instantaneous amplitude and phase
@@ -1,10 +1,16 @@
 from INSTR.Common.RemoveDelims import removeDelims
 from INSTR.Common.VisaInstrument import VisaInstrument
+from INSTR.Common.AsyncVisaInstrument import AsyncVisaInstrument
+from INSTR.Common.ShadowState import ShadowState
+from INSTR.Common.ChunkedRead import readChunks
 from ALMAFE.basic.Units import Units
 from .schemas import Channel, Trigger
 import re
 import pyvisa
 import logging
+import numpy as np
+from time import time
+from typing import Optional, Tuple
 
 class BaseE441X():
     """Base class for Agilent/Keysight Power Meters E441xA, E441xB, N191xA
@@ -12,6 +18,13 @@ class BaseE441X():
     """
 
     DEFAULT_TIMEOUT = 15000
+    MAX_TRIGGER_COUNT = 50  # readings buffered per trigger cycle, for burstRead()
+    # commands with side effects and settings which change others, for the shadow state:
+    SHADOW_ALWAYS_SEND = ("CONF", "CAL")
+    SHADOW_COUPLED = {
+        "CONF": ("",),
+        "SENS:SPE": ("SENS:AVER", )
+    }
     
     def __init__(self, resource="GPIB0::13::INSTR", idQuery=True, reset=True):
         """Constructor
@@ -22,7 +35,9 @@ class BaseE441X():
         """
         self.logger = logging.getLogger("ALMAFE-CTS-Control")
         self.twoChannel = False
-        self.inst = VisaInstrument(resource, timeout = self.DEFAULT_TIMEOUT)
+        self.inst = VisaInstrument(resource, timeout = self.DEFAULT_TIMEOUT,
+            shadow = ShadowState(alwaysSend = self.SHADOW_ALWAYS_SEND, coupled = self.SHADOW_COUPLED))
+        self.ainst = AsyncVisaInstrument(self.inst)
         if self.inst.connected and self.inst.inst.interface_type == pyvisa.constants.InterfaceType.asrl:
             self.inst.inst.end_input = pyvisa.constants.termination_char
             self.inst.inst.end_output = pyvisa.constants.termination_char
@@ -40,14 +55,7 @@ class BaseE441X():
         self.inst.close()
 
     def connected(self) -> bool:
-        if not self.inst.connected:
-            return False
-        try:
-            result = self.inst.query("*ESR?")
-            result = removeDelims(result)
-            return len(result) > 0
-        except:
-            return False
+        return self.inst.probe("*ESR?")
 
     def idQuery(self):
         """Perform an ID query and check compatibility
@@ -187,3 +195,69 @@ class BaseE441X():
         for i in range(averaging):
             sum += float(self.inst.query(f"FETC{channel.value}:POW:AC?"))
         return sum / averaging
+
+    async def readAsync(self, channel = Channel.A, averaging = 1):
+        """Awaitable read(), running on this instrument's I/O thread
+
+        :param Channel channel: which channel to measure, defaults to Channel.A
+        :return float: measured power level
+        """
+        return await self.ainst.run(self.read, channel, averaging)
+
+    def readDual(self) -> Optional[Tuple[float, float]]:
+        """Read both channels with one query, when running in continuous mode
+
+        :return (float, float): measured power levels of channels A and B, or None on error or if the meter has only one channel
+        """
+        if not self.twoChannel:
+            return None
+        response = self.inst.query("FETC1:POW:AC?;:FETC2:POW:AC?")
+        try:
+            a, b = (float(value) for value in re.split(r'[;,]', response.strip()))
+            return a, b
+        except (AttributeError, ValueError):
+            self.logger.error(f"BaseE441X.readDual: bad response '{response}'")
+            return None
+
+    def acquireDual(self, count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Read count samples of both channels, one query per pair
+
+        :param int count: number of samples to read
+        :return (a, b, timestamps): numpy arrays.  timestamps are seconds since the epoch, at each query.  Shorter than count on error.
+        """
+        samples = np.empty((count, 3))
+        n = 0
+        while n < count:
+            sample = self.readDual()
+            if sample is None:
+                break
+            samples[n] = (sample[0], sample[1], time())
+            n += 1
+        return samples[:n, 0], samples[:n, 1], samples[:n, 2]
+
+    def burstRead(self, count: int, channel = Channel.A) -> Tuple[np.ndarray, np.ndarray]:
+        """Read count samples, up to MAX_TRIGGER_COUNT per bus transaction, using the meter's reading buffer
+
+        Each trigger cycle takes TRIG:COUN readings back-to-back at the configured speed.
+        Use setFastMode() first for 200 readings/second.
+        Timestamps are interpolated between the start and end of each cycle.
+        Afterwards the channel is returned to its previous trigger source and to continuous triggering for read().
+
+        :param int count: number of samples to read
+        :param Channel channel: which channel to measure, defaults to Channel.A
+        :return (values, timestamps): numpy arrays.  timestamps are seconds since the epoch.  Shorter than count on error.
+        """
+        if channel == Channel.B and not self.twoChannel:
+            return np.array([]), np.array([])
+        m = channel.value
+        source = removeDelims(self.inst.query(f"TRIG{m}:SOUR?"))
+        self.inst.write(f"INIT{m}:CONT OFF;:TRIG{m}:SOUR IMM;")
+        values, timestamps = readChunks(count, self.MAX_TRIGGER_COUNT,
+            lambda n: self.inst.write(f"TRIG{m}:COUN {n};"),
+            lambda: self.inst.query(f"READ{m}:POW:AC?"),
+            context = "BaseE441X.burstRead")
+        restore = f"TRIG{m}:COUN 1;"
+        if source and source[0] != "IMM":
+            restore += f":TRIG{m}:SOUR {source[0]};"
+        self.inst.write(restore + f":INIT{m}:CONT ON;")
+        return values, timestamps
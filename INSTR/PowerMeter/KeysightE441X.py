@@ -3,8 +3,9 @@ from ALMAFE.basic.Units import Units
 from .schemas import Channel, Trigger, StdErrConfig, StdErrResult
 from .BaseE441X import BaseE441X
 from time import time
-from statistics import mean, stdev
-from math import sqrt
+from INSTR.Common.StreamingStats import StreamingStats
+from math import inf
+from typing import Iterator, List, Optional, Tuple
 
 class PowerMeter(BaseE441X):
     """CTS/FETMS Power meter class which adds capaibilties to the base class.
@@ -118,24 +119,62 @@ class PowerMeter(BaseE441X):
             self.setFastMode(True, channel)
         return value
         
-    def averagingRead(self, config: StdErrConfig, channel = Channel.A):
+    def averagingRead(self, config: StdErrConfig, channel = Channel.A, burstSize = 0):
         """Read multiple samples and average, as configured by StdErrConfig
 
         :param config: StdErrConfig to set up the measurement requirements.  See StdErrConfig for details.
         :param Channel channel: which channel to read, defaults to Channel.A
+        :param int burstSize: if nonzero, read up to this many samples per bus transaction with burstRead().
+            The stopping rules are still checked after every sample.
+            Bursts are cut short so as not to read past the sample count of MIN_SAMPLES or MAX_SAMPLES.
         :return StdErrResult: see StdErrResult for details.
         """
         if channel == Channel.B and not self.twoChannel:
             return False
         useCase = config.getUseCase()
+        if useCase == StdErrConfig.UseCase.MIN_SAMPLES:
+            maxSamples = config.minS
+        elif useCase == StdErrConfig.UseCase.MAX_SAMPLES:
+            maxSamples = max(config.minS, config.maxS)
+        else:
+            maxSamples = None
+        return self.__averagingRead(config, self.__samples(channel, burstSize, maxSamples), 1)[0]
+
+    def averagingReadDual(self, config: StdErrConfig) -> Tuple[StdErrResult, StdErrResult]:
+        """Read both channels together and average, as configured by StdErrConfig
+
+        Each sample of A and B is fetched with a single query.
+        The stopping rules apply to both: the stdErr target must be achieved on both channels.
+
+        :param config: StdErrConfig to set up the measurement requirements.  See StdErrConfig for details.
+        :return (StdErrResult, StdErrResult): for channels A and B, or False if the meter has only one channel.
+        """
+        if not self.twoChannel:
+            return False
+        return tuple(self.__averagingRead(config, self.__dualSamples(), 2))
+
+    def __averagingRead(self, config: StdErrConfig, samples: Iterator[Tuple[float, ...]], numChannels: int) -> List[StdErrResult]:
+        """Implement the StdErrConfig stopping rules over one or more channels read together
+
+        :param config: StdErrConfig
+        :param samples: generates a tuple of one value per channel
+        :param int numChannels: length of the tuples
+        :return List[StdErrResult]: one per channel
+        """
+        useCase = config.getUseCase()
+        window = config.maxS if useCase == StdErrConfig.UseCase.MOVING_WINDOW else 0
+        stats = [StreamingStats(window) for _ in range(numChannels)]
         done = False
         success = False
-        S = []
-        N = 0
         start = time()
         while not done:
-            S.append(self.read(channel))
-            N += 1
+            sample = next(samples, None)
+            if sample is None:
+                break
+            for channelStats, value in zip(stats, sample):
+                channelStats.add(value)
+            N = stats[0].total
+            reached = N > 1 and all(channelStats.stdErr <= config.stdErr for channelStats in stats)
             if useCase == StdErrConfig.UseCase.MIN_SAMPLES:
                 if N >= config.minS:
                     done = True
@@ -143,7 +182,7 @@ class PowerMeter(BaseE441X):
             
             elif useCase == StdErrConfig.UseCase.MAX_SAMPLES:
                 if N >= config.minS:
-                    if N > 1 and stdev(S) / sqrt(N) <= config.stdErr:
+                    if reached:
                         done = True
                         success = True
                     elif N >= config.maxS:
@@ -153,11 +192,11 @@ class PowerMeter(BaseE441X):
             elif useCase == StdErrConfig.UseCase.MIN_TO_TIMEOUT:
                 if N >= config.minS and time() - start >= config.timeout:
                     done = True
-                    success = stdev(S) / sqrt(N) <= config.stdErr
+                    success = reached
             
             elif useCase == StdErrConfig.UseCase.MOVING_WINDOW:
                 if N >= config.maxS:
-                    if stdev(S[:config.maxS]) / sqrt(config.maxS) <= config.stdErr:
+                    if reached:
                         done = True
                         success = True
                     elif time() - start >= config.timeout:
@@ -169,21 +208,48 @@ class PowerMeter(BaseE441X):
                     done = True
                     success = True
 
-        if useCase == StdErrConfig.UseCase.MOVING_WINDOW and N >= config.maxS:
-            stdErr = stdev(S[:config.maxS]) / sqrt(config.maxS)
-        elif N > 1:
-            stdErr = stdev(S) / sqrt(N)
-        else:
-            stdErr = 0
-
-        A = mean(S) if N else 0
-        return StdErrResult(
-            success = success,
-            N = N,
-            mean = A,
-            stdErr = stdErr,
-            CI95U = A + 1.96 * stdErr,
-            CI95L = A - 1.96 * stdErr,
-            useCase = useCase,
-            time = time() - start
-        )
+        elapsed = time() - start
+        results = []
+        for channelStats in stats:
+            timeToTarget = channelStats.timeToTarget(config.stdErr, elapsed) if config.stdErr else 0
+            results.append(StdErrResult(
+                success = success,
+                N = channelStats.total,
+                mean = channelStats.mean,
+                stdErr = channelStats.stdErr,
+                CI95U = channelStats.mean + 1.96 * channelStats.stdErr,
+                CI95L = channelStats.mean - 1.96 * channelStats.stdErr,
+                useCase = useCase,
+                time = elapsed,
+                timeToTarget = -1 if timeToTarget == inf else timeToTarget
+            ))
+        return results
+
+    def __samples(self, channel: Channel, burstSize: int, maxSamples: Optional[int] = None) -> Iterator[Tuple[float]]:
+        """Generate samples one at a time for averagingRead()
+
+        :param Channel channel: which channel to read
+        :param int burstSize: if nonzero, read up to this many samples per bus transaction
+        :param int maxSamples: the most samples the stopping rule can use, None if unlimited
+        """
+        count = 0
+        while maxSamples is None or count < maxSamples:
+            if not burstSize:
+                count += 1
+                yield (self.read(channel), )
+                continue
+            n = burstSize if maxSamples is None else min(burstSize, maxSamples - count)
+            values, _ = self.burstRead(n, channel)
+            count += len(values)
+            if not len(values):
+                return
+            yield from ((value, ) for value in values.tolist())
+
+    def __dualSamples(self) -> Iterator[Tuple[float, float]]:
+        """Generate samples of both channels for averagingReadDual()
+        """
+        while True:
+            sample = self.readDual()
+            if sample is None:
+                return
+            yield sample
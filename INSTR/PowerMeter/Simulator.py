@@ -1,7 +1,10 @@
-from .schemas import Channel, Trigger, Unit, StdErrConfig, StdErrResult
+from ALMAFE.basic.Units import Units
+from .schemas import Channel, Trigger, StdErrConfig, StdErrResult
 from time import time
 from statistics import mean, stdev
 from math import sqrt
+from typing import Tuple
+import numpy as np
 
 class PowerMeterSimulator():
 
@@ -17,7 +20,7 @@ class PowerMeterSimulator():
 
         :return bool: True if instrument responed to Operation Complete query
         """
-        ok = self.setUnits(Unit.DBM)
+        ok = self.setUnits(Units.DBM)
         if ok:
             ok = self.setFastMode(False)
         if ok:
@@ -31,7 +34,7 @@ class PowerMeterSimulator():
         """
         pass
 
-    def setUnits(self, units: Unit, channel = None):
+    def setUnits(self, units: Units, channel = None):
         if channel is None:
             channel = Channel.A
         self.settings[channel]['units'] = units
@@ -65,7 +68,7 @@ class PowerMeterSimulator():
         """
         return -1.0
         
-    def averagingRead(self, config: StdErrConfig, channel = Channel.A):
+    def averagingRead(self, config: StdErrConfig, channel = Channel.A, burstSize = 0):
         """Read multiple samples and average, as configured by StdErrConfig
 
         :param config: StdErrConfig to set up the measurement requirements.  See StdErrConfig for details.
@@ -90,3 +93,43 @@ class PowerMeterSimulator():
         :return float: measured power level
         """
         return -1.0
+
+    async def readAsync(self, channel = Channel.A, averaging = 1):
+        """Awaitable read()
+
+        :param Channel channel: which channel to measure, defaults to Channel.A
+        :return float: measured power level
+        """
+        return self.read(channel, averaging)
+
+    def readDual(self) -> Tuple[float, float]:
+        """Read both channels
+
+        :return (float, float): measured power levels of channels A and B
+        """
+        return self.read(Channel.A), self.read(Channel.B)
+
+    def acquireDual(self, count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Read count samples of both channels
+
+        :param int count: number of samples to read
+        :return (a, b, timestamps): numpy arrays.  timestamps are seconds since the epoch.
+        """
+        return np.full(count, self.read(Channel.A)), np.full(count, self.read(Channel.B)), time() + np.arange(count) / 200
+
+    def averagingReadDual(self, config: StdErrConfig) -> Tuple[StdErrResult, StdErrResult]:
+        """Read both channels together and average, as configured by StdErrConfig
+
+        :param config: StdErrConfig to set up the measurement requirements.  See StdErrConfig for details.
+        :return (StdErrResult, StdErrResult): for channels A and B
+        """
+        return self.averagingRead(config, Channel.A), self.averagingRead(config, Channel.B)
+
+    def burstRead(self, count: int, channel = Channel.A) -> Tuple[np.ndarray, np.ndarray]:
+        """Read count samples at 200 readings/second
+
+        :param int count: number of samples to read
+        :param Channel channel: which channel to measure, defaults to Channel.A
+        :return (values, timestamps): numpy arrays.  timestamps are seconds since the epoch.
+        """
+        return np.full(count, self.read(channel)), time() + np.arange(count) / 200
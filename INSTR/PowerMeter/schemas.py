@@ -55,6 +55,7 @@ class StdErrResult(BaseModel):
     CI95L: 95% lower confidence interval of the mean
     useCase: which StdErrConfig UseCase was selected
     time: seconds of total time taken while sampling
+    timeToTarget: predicted seconds of further sampling to achieve the target standard error.  0 if achieved, -1 if not predictable or not achievable within the window.
     """
     success: bool = False
     N: int = 0
@@ -64,6 +65,7 @@ class StdErrResult(BaseModel):
     CI95L: float = 0
     useCase: StdErrConfig.UseCase = StdErrConfig.UseCase.TIMEOUT
     time: float = 0
+    timeToTarget: float = 0
     
 class Channel(Enum):
     A = 1
@@ -1,5 +1,6 @@
 from INSTR.Common.RemoveDelims import removeDelims
 from INSTR.Common.VisaInstrument import VisaInstrument
+from INSTR.Common.ShadowState import ShadowState
 import re
 import logging
 
@@ -7,6 +8,10 @@ class PowerSupply():
     """The Agilent E363xA power supply"""
     
     DEFAULT_TIMEOUT = 15000     # milliseconds
+    # states the supply changes by itself, for the shadow state: an over-voltage or over-current trip turns the output off
+    SHADOW_ALWAYS_SEND = ("OUTP", )
+    # selecting a channel changes the meaning of the VOLT and CURR settings:
+    SHADOW_COUPLED = {"INST:NSEL": ("VOLT", "CURR")}
     
     def __init__(self, resource="GPIB0::5::INSTR", idQuery=True, reset=True):
         """Constructor
@@ -18,7 +23,7 @@ class PowerSupply():
         self.logger = logging.getLogger("ALMAFE-CTS-Control")
         self.mfr = None
         self.model = None
-        self.inst = VisaInstrument(resource, timeout = self.DEFAULT_TIMEOUT)
+        self.inst = VisaInstrument(resource, timeout = self.DEFAULT_TIMEOUT, shadow = ShadowState(alwaysSend = self.SHADOW_ALWAYS_SEND, coupled = self.SHADOW_COUPLED))
         ok = self.connected()
         if ok and idQuery:
             ok = self.idQuery()
@@ -31,14 +36,7 @@ class PowerSupply():
         self.inst.close()
     
     def connected(self) -> bool:
-        if not self.inst.connected:
-            return False
-        try:
-            result = self.inst.query("*ESR?")
-            result = removeDelims(result)
-            return len(result) > 0
-        except:
-            return False
+        return self.inst.probe("*ESR?")
 
     def idQuery(self) -> bool:
         """Perform an ID query and check compatibility
@@ -37,14 +37,7 @@ class SignalGenerator(SignalGenInterface):
             self.inst = None
 
     def connected(self) -> bool:
-        if not self.inst.connected:
-            return False
-        try:
-            result = self.inst.query("*ESR?")
-            result = removeDelims(result)
-            return len(result) > 0
-        except:
-            return False
+        return self.inst.probe("*ESR?")
 
     def idQuery(self):
         """Perform an ID query and check compatibility
@@ -2,9 +2,12 @@ import re
 import pyvisa
 import logging
 import time
+import numpy as np
 from .schemas import *
 from INSTR.Common.RemoveDelims import removeDelims
 from INSTR.Common.VisaInstrument import VisaInstrument
+from INSTR.Common.ShadowState import ShadowState
+from INSTR.Common.WaitUntil import waitUntil
 
 class BaseMXA():
     """Base class for Agilent/Keysight MXA spectrum analyzers
@@ -13,6 +16,18 @@ class BaseMXA():
     Only Swept SA mode is implemented!
     """
     DEFAULT_TIMEOUT = 10000
+    # settings which change others as a side effect, for the shadow state:
+    SHADOW_COUPLED = {
+        "INST": ("",),
+        "INST:SEL": ("",),
+        "INST:NSEL": ("",),
+        "FREQ:STAR": ("FREQ:CENT", "FREQ:SPAN"),
+        "FREQ:STOP": ("FREQ:CENT", "FREQ:SPAN"),
+        "FREQ:CENT": ("FREQ:STAR", "FREQ:STOP"),
+        "FREQ:SPAN": ("FREQ:STAR", "FREQ:STOP"),
+        "UNIT:POW": ("DISP:WIND:TRAC:Y:RLEV", ),
+        "CALC:MARK:MODE": ("CALC:MARK", )
+    }
 
     def __init__(self, resource="TCPIP0::10.1.1.10::inst0::INSTR", idQuery=True, reset=True) -> None:
         """Constructor
@@ -30,7 +45,7 @@ class BaseMXA():
         self.markerY = None
 
         try:
-            self.inst = VisaInstrument(resource, timeout = self.DEFAULT_TIMEOUT)                
+            self.inst = VisaInstrument(resource, timeout = self.DEFAULT_TIMEOUT, shadow = ShadowState(coupled = self.SHADOW_COUPLED))
             if self.inst.inst and self.inst.inst.session:
                 self.inst.inst.flush(pyvisa.constants.VI_IO_IN_BUF_DISCARD | pyvisa.constants.VI_IO_OUT_BUF_DISCARD)
                 done = True
@@ -57,14 +72,7 @@ class BaseMXA():
         }
         
     def connected(self) -> bool:
-        if not self.inst.connected:
-            return False
-        try:
-            result = self.inst.query("*ESR?")
-            result = removeDelims(result)
-            return len(result) > 0
-        except:
-            return False
+        return self.inst.probe("*ESR?")
         
     def idQuery(self):
         """Perform an ID query and check compatibility
@@ -115,17 +123,18 @@ class BaseMXA():
         return int(err[0]), " ".join(err[1:])
 
     def configInternalPreamp(self, setting: InternalPreamp) -> tuple[bool, str]:
-        # disable presel center:
-        self.inst.write(f":POW:PADJ 0;")
-        if setting == InternalPreamp.OFF:
-            self.inst.write(":POW:GAIN:STAT OFF;")
-        else:
-            self.inst.write(f":POW:GAIN:STAT ON;:POW:GAIN:{setting.value};")
-        # max mixer level -10:
-        self.inst.write(":POW:MIX:RANG -10;")
-        # standard uw path:
-        if self.model == "N9030A":
-            self.inst.write(":POW:MW:PATH STD;")
+        with self.inst.batch():
+            # disable presel center:
+            self.inst.write(f":POW:PADJ 0;")
+            if setting == InternalPreamp.OFF:
+                self.inst.write(":POW:GAIN:STAT OFF;")
+            else:
+                self.inst.write(f":POW:GAIN:STAT ON;:POW:GAIN:{setting.value};")
+            # max mixer level -10:
+            self.inst.write(":POW:MIX:RANG -10;")
+            # standard uw path:
+            if self.model == "N9030A":
+                self.inst.write(":POW:MW:PATH STD;")
         code, msg = self.errorQuery()
         return code == 0, msg 
 
@@ -133,11 +142,12 @@ class BaseMXA():
             count: int = 100,
             type: AveragingType = AveragingType.AUTO) -> tuple[bool, str]:
 
-        if type == AveragingType.AUTO:
-            self.inst.write(":AVER:TYPE:AUTO ON;")
-        else:
-            self.inst.write(f":AVER:TYPE {type.value};")
-        self.inst.write(f":AVER:COUN {count};")
+        with self.inst.batch():
+            if type == AveragingType.AUTO:
+                self.inst.write(":AVER:TYPE:AUTO ON;")
+            else:
+                self.inst.write(f":AVER:TYPE {type.value};")
+            self.inst.write(f":AVER:COUN {count};")
         code, msg = self.errorQuery()
         return code == 0, msg
 
@@ -157,12 +167,13 @@ class BaseMXA():
             units: LevelUnits = LevelUnits.DBM,
             autoAtten: bool = True,
             manualAtten: float = 10) -> tuple[bool, str]:
-        self.inst.write(f":UNIT:POW {units.value}")
-        self.inst.write(f":DISP:WIND:TRAC:Y:RLEV {refLevel};:DISP:WIND:TRAC:Y:RLEV:OFFS {refLevelOffset};")
-        if autoAtten:
-            self.inst.write(":POW:ATT:AUTO ON;")
-        else:
-            self.inst.write(f":POW:ATT:AUTO OFF;:POW:ATT {manualAtten};")
+        with self.inst.batch():
+            self.inst.write(f":UNIT:POW {units.value}")
+            self.inst.write(f":DISP:WIND:TRAC:Y:RLEV {refLevel};:DISP:WIND:TRAC:Y:RLEV:OFFS {refLevelOffset};")
+            if autoAtten:
+                self.inst.write(":POW:ATT:AUTO ON;")
+            else:
+                self.inst.write(f":POW:ATT:AUTO OFF;:POW:ATT {manualAtten};")
         code, msg = self.errorQuery()
         return code == 0, msg
     
@@ -174,16 +185,17 @@ class BaseMXA():
             logVertical: bool = True,        
             scalePerDiv: float = 10,
             sweepPoints: int = 1001) -> tuple[bool, str]:
-        if autoDetector:
-            self.inst.write(f":DET:TRAC{traceNum}:AUTO ON;")
-        else:
-            self.inst.write(f":DET:TRAC{traceNum}:AUTO OFF;:DET:TRAC{traceNum} {manualDetector.value};")
-        self.inst.write(f":SWE:POIN {sweepPoints};")
-        if logVertical:
-            self.inst.write(f":DISP:WIND:TRAC:Y:SPAC LOG;:DISP:WIND:TRAC:Y:PDIV {scalePerDiv};")
-        else:
-            self.inst.write(":DISP:WIND:TRAC:Y:SPAC LIN;")
-        self.inst.write(f":INIT:CONT {'ON' if continuous else 'OFF'};")
+        with self.inst.batch():
+            if autoDetector:
+                self.inst.write(f":DET:TRAC{traceNum}:AUTO ON;")
+            else:
+                self.inst.write(f":DET:TRAC{traceNum}:AUTO OFF;:DET:TRAC{traceNum} {manualDetector.value};")
+            self.inst.write(f":SWE:POIN {sweepPoints};")
+            if logVertical:
+                self.inst.write(f":DISP:WIND:TRAC:Y:SPAC LOG;:DISP:WIND:TRAC:Y:PDIV {scalePerDiv};")
+            else:
+                self.inst.write(":DISP:WIND:TRAC:Y:SPAC LIN;")
+            self.inst.write(f":INIT:CONT {'ON' if continuous else 'OFF'};")
         code, msg = self.errorQuery()
         return code == 0, msg
 
@@ -197,22 +209,23 @@ class BaseMXA():
             autoVBWRBWRatio: bool = False,
             VBWRBWRatio: float = 1) -> tuple[bool, str]:
         
-        if autoVBWRBWRatio:
-            self.inst.write(":BWID:VID:RAT:AUTO ON;")
-        else:
-            self.inst.write(f":BWID:VID:RAT:AUTO OFF;:BWID:VID:RAT {VBWRBWRatio};")
-        if autoSweepTime:
-            self.inst.write(":SWE:TIME:AUTO ON;")
-        else:
-            self.inst.write(f":SWE:TIME:AUTO OFF;:SWE:TIME {sweepTime};")
-        if autoResolutionBW:
-            self.inst.write(":BWID:AUTO ON;")
-        else:
-            self.inst.write(f":BWID:AUTO OFF;:BWID {resolutionBW};")
-        if autoVideoBW:
-            self.inst.write(":BWID:VID:AUTO ON;")
-        else:
-            self.inst.write(f":BWID:VID:AUTO OFF;:BWID:VID {videoBW};")
+        with self.inst.batch():
+            if autoVBWRBWRatio:
+                self.inst.write(":BWID:VID:RAT:AUTO ON;")
+            else:
+                self.inst.write(f":BWID:VID:RAT:AUTO OFF;:BWID:VID:RAT {VBWRBWRatio};")
+            if autoSweepTime:
+                self.inst.write(":SWE:TIME:AUTO ON;")
+            else:
+                self.inst.write(f":SWE:TIME:AUTO OFF;:SWE:TIME {sweepTime};")
+            if autoResolutionBW:
+                self.inst.write(":BWID:AUTO ON;")
+            else:
+                self.inst.write(f":BWID:AUTO OFF;:BWID {resolutionBW};")
+            if autoVideoBW:
+                self.inst.write(":BWID:VID:AUTO ON;")
+            else:
+                self.inst.write(f":BWID:VID:AUTO OFF;:BWID:VID {videoBW};")
         code, msg = self.errorQuery()
         return code == 0, msg
 
@@ -222,9 +235,10 @@ class BaseMXA():
             enableUpdate: bool = True,
             enableDisplay: bool = True) -> tuple[bool, str]:
 
-        self.inst.write(f":TRAC{traceNum}:TYPE {type.value};")
-        self.inst.write(f":TRAC{traceNum}:UPD {'ON' if enableUpdate else 'OFF'};")
-        self.inst.write(f":TRAC{traceNum}:DISP {'ON' if enableDisplay else 'OFF'};")
+        with self.inst.batch():
+            self.inst.write(f":TRAC{traceNum}:TYPE {type.value};")
+            self.inst.write(f":TRAC{traceNum}:UPD {'ON' if enableUpdate else 'OFF'};")
+            self.inst.write(f":TRAC{traceNum}:DISP {'ON' if enableDisplay else 'OFF'};")
         code, msg = self.errorQuery()
         return code == 0, msg
     
@@ -233,14 +247,15 @@ class BaseMXA():
             detector: DetectorMode = DetectorMode.AVERAGE,
             autoRefChannel: bool = True,
             refChannel: DetectorMode = DetectorMode.AVERAGE) -> tuple[bool, str]:
-        if autoDetector:
-            self.inst.write(":SEM:DET:OFFS:AUTO ON;")
-        else:
-            self.inst.write(f":SEM:DET:OFFS:AUTO OFF;:SEM:DET:OFFS {detector.value};")
-        if autoRefChannel:
-            self.inst.write(":SEM:DET:CARR:AUTO ON;")
-        else:
-            self.inst.write(f":SEM:DET:CARR:AUTO OFF;:SEM:DET:CARR {refChannel.value};")
+        with self.inst.batch():
+            if autoDetector:
+                self.inst.write(":SEM:DET:OFFS:AUTO ON;")
+            else:
+                self.inst.write(f":SEM:DET:OFFS:AUTO OFF;:SEM:DET:OFFS {detector.value};")
+            if autoRefChannel:
+                self.inst.write(":SEM:DET:CARR:AUTO ON;")
+            else:
+                self.inst.write(f":SEM:DET:CARR:AUTO OFF;:SEM:DET:CARR {refChannel.value};")
         code, msg = self.errorQuery()
         return code == 0, msg
 
@@ -277,18 +292,19 @@ class BaseMXA():
             gateTime: float = 0.1,
             enableFreqCounter: bool = False) -> tuple[bool, str]:
         
-        self.inst.write(f":CALC:MARK{markerNum}:MODE {type.value};")
-        if type == MarkerType.DELTA:
-            self.inst.write(f":CALC:MARK{markerNum}:REF {refMarkerNum};")
-        if readout == MarkerReadout.AUTO:
-            self.inst.write(f"CALC:MARK{markerNum}:X:READ:AUTO ON;")
-        else:
-            self.inst.write(f"CALC:MARK{markerNum}:X:READ {readout.value};")
-        self.inst.write(f":CALC:MARK{markerNum}:FCO {'ON' if enableFreqCounter else 'OFF'};")
-        if autoGateTime:
-            self.inst.write(f":CALC:MARK{markerNum}:FCO:GAT:AUTO ON;")
-        else:
-            self.inst.write(f":CALC:MARK{markerNum}:FCO:GAT:AUTO OFF;:CALC:MARK{markerNum}:FCO:GAT {gateTime};")
+        with self.inst.batch():
+            self.inst.write(f":CALC:MARK{markerNum}:MODE {type.value};")
+            if type == MarkerType.DELTA:
+                self.inst.write(f":CALC:MARK{markerNum}:REF {refMarkerNum};")
+            if readout == MarkerReadout.AUTO:
+                self.inst.write(f"CALC:MARK{markerNum}:X:READ:AUTO ON;")
+            else:
+                self.inst.write(f"CALC:MARK{markerNum}:X:READ {readout.value};")
+            self.inst.write(f":CALC:MARK{markerNum}:FCO {'ON' if enableFreqCounter else 'OFF'};")
+            if autoGateTime:
+                self.inst.write(f":CALC:MARK{markerNum}:FCO:GAT:AUTO ON;")
+            else:
+                self.inst.write(f":CALC:MARK{markerNum}:FCO:GAT:AUTO OFF;:CALC:MARK{markerNum}:FCO:GAT {gateTime};")
         code, msg = self.errorQuery()
         return code == 0, msg
 
@@ -300,15 +316,16 @@ class BaseMXA():
             bandRightHz: float = None,
             enableLine: bool = False) -> tuple[bool, str]:
 
-        self.inst.write(f":CALC:MARK{markerNum}:FUNC {function.value};")
-        if function != MarkerFunction.OFF:
-            if bandLeftHz is not None:
-                self.inst.write(f":CALC:MARK{markerNum}:FUNC:BAND:LEFT {bandLeftHz};")
-            if bandRightHz is not None:
-                self.inst.write(f":CALC:MARK{markerNum}:FUNC:BAND:RIGH {bandRightHz};")
-            if bandLeftHz is None and bandRightHz is None and bandSpanHz is not None:
-                self.inst.write(f":CALC:MARK{markerNum}:FUNC:BAND:SPAN {bandSpanHz};")
-            self.inst.write(f":CALC:MARK{markerNum}:LIN {'ON' if enableLine else 'OFF'};")
+        with self.inst.batch():
+            self.inst.write(f":CALC:MARK{markerNum}:FUNC {function.value};")
+            if function != MarkerFunction.OFF:
+                if bandLeftHz is not None:
+                    self.inst.write(f":CALC:MARK{markerNum}:FUNC:BAND:LEFT {bandLeftHz};")
+                if bandRightHz is not None:
+                    self.inst.write(f":CALC:MARK{markerNum}:FUNC:BAND:RIGH {bandRightHz};")
+                if bandLeftHz is None and bandRightHz is None and bandSpanHz is not None:
+                    self.inst.write(f":CALC:MARK{markerNum}:FUNC:BAND:SPAN {bandSpanHz};")
+                self.inst.write(f":CALC:MARK{markerNum}:LIN {'ON' if enableLine else 'OFF'};")
         code, msg = self.errorQuery()
         return code == 0, msg
     
@@ -323,25 +340,9 @@ class BaseMXA():
         return code == 0, msg
 
     def readTrace(self, traceNum:int = 1, timeout: int = 30) -> tuple[bool, str]:
-        self.inst.write(":INIT:SAN;")
-        self.inst.write("*CLS;*OPC;")
-        start = time.time()
-        done = False
-        error = False
-        while not done and not error:
-            elapsed = time.time() - start
-            if elapsed > timeout:
-                error = True
-            else:
-                ret = removeDelims(self.inst.query("*STB?"), delimsRe = r'[;,"\s\r\n]')
-                try:
-                    if int(ret[0]) & 32:
-                        done = True
-                except:
-                    error = True
-            time.sleep(0.01)
-        if error:
+        if not self.__acquire(timeout):
             return False, "Timeout or error waiting for spectrum analyzer acqisition"
+        self.inst.write(f":FORM {TraceFormat.ASCII.value};")
         ret = self.inst.query(f":FETC:SAN{traceNum}?;")
         if not ret:
             return False, "Timeout or error reading spectrum analyzer trace"
@@ -352,6 +353,75 @@ class BaseMXA():
         code, msg = self.errorQuery()
         return code == 0, msg
 
+    def readTraceBinary(self,
+            traceNum:int = 1,
+            timeout: int = 30,
+            format: TraceFormat = TraceFormat.REAL32) -> tuple[bool, str, np.ndarray | None, np.ndarray | None]:
+        """Acquire and read a trace as a binary block, without filling traceX and traceY
+
+        Only the levels are transferred.  The frequencies are computed from the start, stop and number of points,
+        because REAL,32 cannot hold a microwave frequency to better than about 1 kHz.
+
+        :param int traceNum: which trace to read
+        :param int timeout: seconds to wait for the acquisition
+        :param TraceFormat format: REAL32 or REAL64.  REAL32 halves the transfer size.
+        :return (bool, str, np.ndarray, np.ndarray): success, error message, frequencies, levels
+        """
+        if format == TraceFormat.ASCII:
+            return False, "readTraceBinary: format must be REAL32 or REAL64", None, None
+        if not self.__acquire(timeout):
+            return False, "Timeout or error waiting for spectrum analyzer acqisition", None, None
+        # little-endian byte order to match the host:
+        self.inst.write(f":FORM {format.value};:FORM:BORD SWAP;")
+        levels = self.inst.query_binary_values(
+            f":TRAC:DATA? TRACE{traceNum}",
+            datatype = 'f' if format == TraceFormat.REAL32 else 'd',
+            is_big_endian = False,
+            container = np.array
+        )
+        if levels is None or len(levels) < 2:
+            return False, "Timeout or error reading spectrum analyzer trace", None, None
+        try:
+            start, stop, points = [float(x) for x in removeDelims(self.inst.query(":FREQ:STAR?;:FREQ:STOP?;:SWE:POIN?"), delimsRe = r'[;,"\s\r\n]')[:3]]
+        except (TypeError, ValueError):
+            return False, "Error reading spectrum analyzer frequency axis", None, None
+        if int(points) != len(levels):
+            return False, f"Trace has {len(levels)} points, expected {int(points)}", None, None
+        code, msg = self.errorQuery()
+        return code == 0, msg, np.linspace(start, stop, len(levels)), levels
+
+    def __acquire(self, timeout: int = 30) -> bool:
+        """Start a single acquisition and wait for it to complete
+
+        :param int timeout: seconds
+        :return bool: True if complete, False on timeout or error
+        """
+        expected = self.__expectedAcquisitionTime()
+        self.inst.write(":INIT:SAN;")
+        self.inst.write("*CLS;*OPC;")
+
+        def complete() -> bool:
+            # *OPC sets the operation complete bit in the event status summary:
+            ret = removeDelims(self.inst.query("*STB?"), delimsRe = r'[;,"\s\r\n]')
+            return bool(int(ret[0]) & 32)
+
+        try:
+            return waitUntil(complete, timeout, expected = expected, minInterval = 0.002, maxInterval = 0.1).success
+        except (TypeError, ValueError, IndexError):
+            return False
+
+    def __expectedAcquisitionTime(self) -> float:
+        """Sweep time times the number of averages, read from the instrument so it follows any change of span, RBW or points
+
+        :return float: seconds, 0 if unknown
+        """
+        ret = removeDelims(self.inst.query(":SWE:TIME?;:AVER?;:AVER:COUN?"), delimsRe = r'[;,"\s\r\n]')
+        try:
+            sweepTime = float(ret[0])
+            return sweepTime * int(ret[2]) if int(ret[1]) else sweepTime
+        except (TypeError, ValueError, IndexError):
+            return 0
+
     def readMarker(self, markerNum: int = 1) -> tuple[bool, str]:
         ret = self.inst.query(f":CALC:MARK{markerNum}:X?;:CALC:MARK{markerNum}:Y?;")
         ret = removeDelims(ret, delimsRe = r'[;,"\s\r\n]')
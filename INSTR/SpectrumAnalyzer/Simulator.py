@@ -225,4 +225,13 @@ class SpectrumAnalyzerSimulator():
     def readTrace(self, traceNum:int = 1, timeout: int = 30) -> tuple[bool, str]:
         self.traceX = np.linspace(self.freqStart, self.freqStop, self.sweepPoints).tolist()
         self.traceY = np.random.normal(-32, 1, self.sweepPoints).tolist()
-        return True, ""
\ No newline at end of file
+        return True, ""
+
+    def readTraceBinary(self,
+            traceNum:int = 1,
+            timeout: int = 30,
+            format: TraceFormat = TraceFormat.REAL32) -> tuple[bool, str, np.ndarray | None, np.ndarray | None]:
+        dtype = np.float32 if format == TraceFormat.REAL32 else np.float64
+        traceX = np.linspace(self.freqStart, self.freqStop, self.sweepPoints)
+        traceY = np.random.normal(-32, 1, self.sweepPoints).astype(dtype)
+        return True, "", traceX, traceY
\ No newline at end of file
@@ -65,6 +65,11 @@ class TriggerSlope(Enum):
     POSITIVE = "POS"
     NEGATIVE = "NEG"
 
+class TraceFormat(Enum):
+    ASCII = "ASC"
+    REAL32 = "REAL,32"
+    REAL64 = "REAL,64"
+
     
 class SpectrumAnalyzerSettings(BaseModel):
     sweepPoints: int = 2001
@@ -1,4 +1,5 @@
-from typing import Sequence
+from typing import Optional, Sequence
+import logging
 
 from INSTR.Common.VisaInstrument import VisaInstrument
 
@@ -15,11 +16,15 @@ class AttenuatorSwitchController():
         :param bool idQuery: If true, perform an ID query and check compatibility, defaults to True
         :param bool reset: If true, reset the instrument and set default configuration, defaults to True
         """
+        self.logger = logging.getLogger("ALMAFE-CTS-Control")
         self.inst = VisaInstrument(resource, timeout = self.DEFAULT_TIMEOUT)
+        # last switch states sent, or None if unknown:
+        self.state: Optional[list[bool]] = None
         if reset:
             self.reset()
 
     def reset(self):
+        self.state = None
         self.setSwitches(self.RESET)
 
     def connected(self) -> bool:
@@ -31,24 +36,35 @@ class AttenuatorSwitchController():
         if index == 10:
             index = 0
         cmd = "A" if value else "B"
-        try:
-            self.inst.write(f"{cmd}{index}")
-        except:
-            self.logger.error("Not connected to 11713B/C switch controller")
-            self.inst.connected = False
+        if self.inst.write(f"{cmd}{index}"):
+            if self.state:
+                self.state[(index - 1) % 10] = value
+        else:
+            self.logger.error("AttenuatorSwitchController.setSwitch: write failed")
+            self.state = None
 
-    def setSwitches(self, switches: Sequence[bool]) -> None:
+    def setSwitches(self, switches: Sequence[bool]) -> bool:
+        """Set all 10 switches, sending only those which differ from the last known state
+
+        :param switches: sequence of 10 bool
+        :return bool: True if the switches are set, including when none needed to change.
+            False if the write failed, leaving the state unknown.
+        """
         if len(switches) != 10:
             raise ValueError("AttenuatorSwitchController.setSwitches: switches must be a sequence of 10 bool")
         
-        cmd = ""
-        for i in range(len(switches)):
-            cmd += "A" if switches[i] else "B"
-            cmd += str((i + 1) % 10)   # convert 0..9 to 1..0
-        try:
-            self.inst.write(cmd)
-        except:
-            self.logger.error("Not connected to 11713B/C switch controller")
-            self.inst.connected = False
+        changed = [i for i in range(10) if self.state is None or self.state[i] != switches[i]]
+        if not changed:
+            return True
+        # like "A123B45": A then the switches to close, B then the switches to open, numbered 1..0:
+        on = "".join(str((i + 1) % 10) for i in changed if switches[i])
+        off = "".join(str((i + 1) % 10) for i in changed if not switches[i])
+        cmd = (f"A{on}" if on else "") + (f"B{off}" if off else "")
+        if not self.inst.write(cmd):
+            self.logger.error("AttenuatorSwitchController.setSwitches: write failed")
+            self.state = None
+            return False
+        self.state = list(switches)
+        return True
 
         
\ No newline at end of file
@@ -1,7 +1,10 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, Iterator, List, Tuple
 from enum import Enum
+from contextlib import contextmanager
+from threading import Lock, RLock
 import logging
+import time
 from INSTR.Common.VisaInstrument import VisaInstrument
 
 class DigitalPort(Enum):
@@ -18,33 +21,157 @@ class SwitchConfig(BaseModel):
     port: DigitalPort = DigitalPort.LOW_ORDER_8BIT
     method: DigitalMethod = DigitalMethod.BINARY
 
-class SwitchController():
-    """The HP3488a switch controller"""
-    
+class HP3488aController():
+    """One HP3488a mainframe, shared by every SwitchController using the same resource
+
+    Keeps the last value written to each slot and port so that writes which change nothing are skipped.
+    Writes made inside batch() are sent as one GPIB message.
+    """
     DEFAULT_TIMEOUT = 15000     # milliseconds
-    
-    def __init__(self, resource: bool = "GPIB0::9::INSTR", reset: bool = True, 
+    RELEASED = 255              # static write which releases every relay: the outputs are active low
+    controllers = {}
+    controllersLock = Lock()
+
+    def __init__(self, resource: str):
+        """Constructor.  Use get() to share the controller for a resource.
+
+        :param str resource: VISA resource string
+        """
+        self.logger = logging.getLogger("ALMAFE-CTS-Control")
+        self.resource = resource
+        self.inst = VisaInstrument(resource, timeout = self.DEFAULT_TIMEOUT)
+        self.lock = RLock()
+        # (slot, port): last value written
+        self.state: Dict[Tuple[int, int], int] = {}
+
+    @classmethod
+    def get(cls, resource: str, reset: bool = True) -> "HP3488aController":
+        """Get the controller for a resource, creating it if needed
+
+        :param str resource: VISA resource string
+        :param bool reset: if True, reset the cards when the controller is created
+        :return HP3488aController
+        """
+        with cls.controllersLock:
+            controller = cls.controllers.get(resource)
+            if controller:
+                return controller
+            controller = cls(resource)
+            cls.controllers[resource] = controller
+        if reset:
+            controller.reset()
+        return controller
+
+    def reset(self) -> None:
+        with self.lock:
+            self.inst.write("CRESET 1, 2, 3")
+            self.state = {}
+
+    def connected(self) -> bool:
+        return self.inst.connected
+
+    @contextmanager
+    def batch(self) -> Iterator["HP3488aController"]:
+        """Collect the writes made inside the block, to several slots if needed, and send them as one message
+
+        If the message is not sent the cached state is forgotten.
+        """
+        with self.lock, self.inst.batch(scpi = False):
+            yield self
+            # sent here rather than when inst.batch() exits, so we know whether it arrived:
+            if self.inst.batch_depth == 1 and not self.inst.flush_batch():
+                self.state = {}
+
+    def staticWrite(self, slot: int, data: int, breakTime: float = 0) -> bool:
+        """Write the static output port of a slot, unless it already has this value
+
+        :param int slot: card slot
+        :param int data: active-low relay control byte
+        :param float breakTime: if nonzero, release the changing relays and wait this many seconds
+            before closing new ones.  Only when relays open and others close in the same change.
+        :return bool: True if written, False if unchanged or the write failed
+        """
+        key = (slot, 0)
+        with self.lock:
+            previous = self.state.get(key)
+            if previous == data:
+                return False
+            if breakTime:
+                if previous is None:
+                    intermediate = self.RELEASED
+                else:
+                    # active low: a bit going 1 to 0 closes a relay and 0 to 1 opens one
+                    closing = previous & ~data
+                    opening = data & ~previous
+                    intermediate = previous | data if closing and opening else None
+                if intermediate is not None and intermediate != previous:
+                    if not self.inst.write(f"SWRITE {slot}00, {intermediate}") or not self.inst.flush_batch():
+                        self.state.pop(key, None)
+                        return False
+                    time.sleep(breakTime)
+            if not self.inst.write(f"SWRITE {slot}00, {data}"):
+                self.state.pop(key, None)
+                return False
+            self.state[key] = data
+            return True
+
+    def digitalWrite(self, config: SwitchConfig, data: List[int]) -> bool:
+        """Write a sequence of words to a digital port, unless the port already holds the only value in it
+
+        :param SwitchConfig config: slot, port and method
+        :param data: words to write in order
+        :return bool: True if written, False if unchanged or the write failed
+        """
+        key = (config.slot, config.port.value)
+        with self.lock:
+            if data and len(set(data)) == 1 and self.state.get(key) == data[0]:
+                return False
+            cmd = "DBW" if config.method == DigitalMethod.BINARY else "DWRITE"
+            if not self.inst.write(f"{cmd} {config.slot}0{config.port.value},{','.join(map(str, data))}"):
+                self.state.pop(key, None)
+                return False
+            if data:
+                self.state[key] = data[-1]
+            return True
+
+    def invalidate(self) -> None:
+        """Forget the cached state, for when the outputs may have changed behind our back
+        """
+        with self.lock:
+            self.state = {}
+
+class SwitchController():
+    """The HP3488a switch controller, as seen by one device wired to one slot"""
+
+    DEFAULT_TIMEOUT = HP3488aController.DEFAULT_TIMEOUT
+
+    def __init__(self, resource: bool = "GPIB0::9::INSTR", reset: bool = True,
                  readConfig: SwitchConfig = None, writeConfig: SwitchConfig = None):
         """Constructor
 
         :param str resource: VISA resource string, defaults to "GPIB0::13::INSTR"
         :param bool reset: If true, reset the instrument and set default configuration, defaults to True
+            Only done by the first SwitchController for a resource, so as not to disturb the other slots.
         """
         self.logger = logging.getLogger("ALMAFE-CTS-Control")
-        self.inst = VisaInstrument(resource, timeout = self.DEFAULT_TIMEOUT)        
+        self.controller = HP3488aController.get(resource, reset)
+        self.inst = self.controller.inst
         if readConfig:
             self.readConfig = readConfig
         if writeConfig:
             self.writeConfig = writeConfig
-        if reset:
-            self.reset()
 
     def reset(self) -> None:
-        self.inst.write("CRESET 1, 2, 3")
+        self.controller.reset()
 
     def connected(self) -> bool:
         return self.inst.connected
 
+    def batch(self):
+        """Send the writes made inside the block, to this and other slots on the same HP3488a, as one message
+        """
+        return self.controller.batch()
+
     def staticRead(self) -> int:
         try:
             result = self.inst.query(f"SREAD {self.readConfig.slot}04")
@@ -52,13 +179,20 @@ class SwitchController():
         except:
             self.logger.error("Not connected to HP3488a switch controller")
             self.inst.connected = False
-    
-    def staticWrite(self, data:int) -> None:
+
+    def staticWrite(self, data:int, breakTime: float = 0) -> bool:
+        """Write the static output port, skipped if it already has this value
+
+        :param int data: active-low relay control byte
+        :param float breakTime: seconds to wait with the changing relays released, if relays both open and close.
+        :return bool: True if written
+        """
         try:
-            self.inst.write(f"SWRITE {self.writeConfig.slot}00, {data}")
+            return self.controller.staticWrite(self.writeConfig.slot, data, breakTime)
         except:
             self.logger.error("Not connected to HP3488a switch controller")
-            self.inst.connected = False            
+            self.inst.connected = False
+            return False
 
     def digitalRead(self, numReadings: int = 1) -> List[int]:
         try:
@@ -69,12 +203,11 @@ class SwitchController():
         except:
             self.logger.error("Not connected to HP3488a switch controller")
             self.inst.connected = False
-    
-    def digitalWrite(self, data: List[int]) -> None:
+
+    def digitalWrite(self, data: List[int]) -> bool:
         try:
-            cmd = "DBW" if self.writeConfig.method == DigitalMethod.BINARY else "DWRITE"
-            cmd = f"{cmd} {self.writeConfig.slot}0{self.writeConfig.port.value},{','.join(list(map(str, data)))}"
-            self.inst.write(cmd)
+            return self.controller.digitalWrite(self.writeConfig, data)
         except:
             self.logger.error("Not connected to HP3488a switch controller")
-            self.inst.connected = False            
+            self.inst.connected = False
+            return False
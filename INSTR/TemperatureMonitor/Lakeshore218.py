@@ -1,12 +1,15 @@
 from INSTR.Common.RemoveDelims import removeDelims
 from INSTR.Common.VisaInstrument import VisaInstrument
+from INSTR.Common.AsyncVisaInstrument import AsyncVisaInstrument
 import re
 import logging
 import time
 from threading import Lock
+from typing import Iterable
 
 class TemperatureMonitor():
     DEFAULT_TIMEOUT = 10000
+    STATUS_TTL = 10     # seconds to trust a cached RDGST? sensor status
 
     def __init__(self, resource="GPIB0::12::INSTR", idQuery=True, reset=True):
         """Constructor
@@ -17,7 +20,9 @@ class TemperatureMonitor():
         """
         self.logger = logging.getLogger("ALMAFE-CTS-Control")
         self.lock = Lock()        
+        self.statusCache = {}   # input: (status, time read)
         self.inst = VisaInstrument(resource, timeout = self.DEFAULT_TIMEOUT, read_termination = '\n', write_termination = '\n')
+        self.ainst = AsyncVisaInstrument(self.inst)
         ok = self.connected()
         if ok and idQuery:
             ok = self.idQuery()
@@ -32,14 +37,7 @@ class TemperatureMonitor():
             self.inst = None
 
     def connected(self) -> bool:
-        if not self.inst.connected:
-            return False
-        try:
-            result = self.inst.query("QESR?\r")
-            result = removeDelims(result)
-            return len(result) > 0
-        except:
-            return False
+        return self.inst.probe("QESR?\r")
 
     def idQuery(self):
         """Perform an ID query and check compatibility
@@ -72,43 +70,70 @@ class TemperatureMonitor():
             return False
         return True
 
-    def readSingle(self, input: int) -> tuple[int, int]:
+    def readSingle(self, input: int) -> tuple[float, int]:
         if not 1 <= input <= 8:
             return -1.0, 1
-        with self.lock:
-            temp = self.inst.query(f"KRDG? {input}\r")
-        time.sleep(0.25)
-        with self.lock:
-            err = self.inst.query(f"RDGST? {input}\r")
-        try:
-            temp = float(removeDelims(temp)[0])
-        except:
-            temp = -1.0
-        try:
-            err = int(removeDelims(err)[0])
-        except:
-            err = 0
-        if err != 0:
-            temp = -1
-        return temp, err
+        temps, errors = self.readInputs([input])
+        return temps[0], errors[0]
 
     def readAll(self):
+        return self.readInputs(range(1, 9))
+
+    def readInputs(self, inputs: Iterable[int]) -> tuple[list[float], list[int]]:
+        """Read temperatures and sensor status for several inputs in one compound query
+
+        Sensor status is cached for STATUS_TTL seconds and only re-read when stale,
+        or when a reading disagrees with it: zero with a good status, or valid with a bad status.
+
+        :param inputs: input numbers in 1..8
+        :return tuple of list[float] temperatures, list[int] errors.  Temperature is -1.0 where there is an error.
+        """
+        inputs = list(inputs)
+        if not inputs or not all(1 <= input <= 8 for input in inputs):
+            return [-1.0] * len(inputs), [1] * len(inputs)
+        now = time.time()
+        stale = [input for input in inputs if now - self.statusCache.get(input, (0, 0))[1] > self.STATUS_TTL]
+        # one input, or all of them at once:
+        kelvin = f"KRDG? {inputs[0]}" if len(inputs) == 1 else "KRDG? 0"
         with self.lock:
-            temps = self.inst.query("KRDG?\r")
-        time.sleep(0.25)
-        with self.lock:
-            errors = self.inst.query("RDGST?\r")
-        try:
-            temps = removeDelims(temps)            
-            temps = [float(temps[i]) for i in range(8)]
-        except:
-            return [-1.0, -1.0, -1.0, -1.0, -1.0, -1.0, -1.0, -1.0], [1, 1, 1, 1, 1, 1, 1, 1]
-        try:
-            errors = removeDelims(errors)
-            errors = [int(errors[i]) for i in range(8)]
-        except:
-            errors = [0, 0, 0, 0, 0, 0, 0, 0]
-        for i in range(len(errors)):
-            if errors[i] != 0:
-                temps[i] = -1.0
+            response = self.inst.query(";".join([kelvin] + [f"RDGST? {input}" for input in stale]) + "\r")
+            try:
+                parts = response.split(';')
+                temps = [float(t) for t in removeDelims(parts[0])]
+                if len(inputs) > 1:
+                    temps = [temps[input - 1] for input in inputs]
+                self.__cacheStatus(stale, parts[1:], now)
+            except (AttributeError, ValueError, IndexError):
+                self.logger.error(f"TemperatureMonitor.readInputs: bad response '{response}'")
+                for input in stale:
+                    self.statusCache.pop(input, None)
+                return [-1.0] * len(inputs), [1] * len(inputs)
+            # the instrument reports zero for a faulty sensor.  Check status now if the cached one says otherwise,
+            # either OK with a zero reading or bad with a valid reading from a sensor which has recovered:
+            suspect = [input for input, temp in zip(inputs, temps)
+                       if input not in stale and (temp <= 0) == (self.statusCache[input][0] == 0)]
+            if suspect:
+                response = self.inst.query(";".join(f"RDGST? {input}" for input in suspect) + "\r")
+                try:
+                    self.__cacheStatus(suspect, response.split(';'), now)
+                except (AttributeError, ValueError, IndexError):
+                    for input in suspect:
+                        self.statusCache.pop(input, None)
+        errors = [self.statusCache.get(input, (1, 0))[0] for input in inputs]
+        temps = [-1.0 if err != 0 else temp for temp, err in zip(temps, errors)]
         return temps, errors
+
+    def __cacheStatus(self, inputs: list[int], responses: list[str], now: float) -> None:
+        """Store RDGST? responses in the status cache
+
+        :raises ValueError, IndexError if the responses are malformed
+        """
+        for input, response in zip(inputs, responses, strict = True):
+            self.statusCache[input] = (int(removeDelims(response)[0]), now)
+
+    async def readAllAsync(self):
+        """Awaitable readAll(), running on this instrument's I/O thread
+
+        :return tuple of list[float] temperatures, list[int] errors
+        """
+        return await self.ainst.run(self.readAll)
@@ -1,4 +1,5 @@
 import logging
+from typing import Iterable
 
 class TemperatureMonitorSimulator():
 
@@ -20,4 +21,13 @@ class TemperatureMonitorSimulator():
         return self.SIM_DATA[input - 1], self.SIM_ERRS[input - 1]
 
     def readAll(self):
-        return self.SIM_DATA, self.SIM_ERRS
\ No newline at end of file
+        return self.SIM_DATA, self.SIM_ERRS
+
+    def readInputs(self, inputs: Iterable[int]) -> tuple[list[float], list[int]]:
+        inputs = list(inputs)
+        if not all(1 <= input <= 8 for input in inputs):
+            return [-1.0] * len(inputs), [1] * len(inputs)
+        return [self.SIM_DATA[input - 1] for input in inputs], [self.SIM_ERRS[input - 1] for input in inputs]
+
+    async def readAllAsync(self):
+        return self.readAll()
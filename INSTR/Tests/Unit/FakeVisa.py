@@ -0,0 +1,133 @@
+'''
+Fake pyvisa resources for unit tests.
+
+useFakeVisa() makes the VisaResourcePool open FakeResources, so drivers can be built through their
+real constructors and VisaInstrument, with only the bus replaced.
+Subclass FakeResource and override respond() to simulate an instrument.
+'''
+import unittest
+import pyvisa
+from types import SimpleNamespace
+from typing import List, Optional
+from INSTR.Common.VisaResourcePool import VisaResourcePool
+from INSTR.Common.HealthMonitor import HealthMonitor
+
+class FakeResource():
+    """A pyvisa resource which records every message and answers queries through respond()"""
+    interface_type = pyvisa.constants.InterfaceType.gpib
+
+    def __init__(self, resource: str):
+        self.resource_name = resource
+        self.messages: List[str] = []
+        self.responses = {}     # message: fixed response, checked before respond()
+        self.fail = False       # raise on every operation, like a bus timeout
+
+    def respond(self, message: str) -> str:
+        """The response to a query.  Override to simulate an instrument.
+        """
+        return "0"
+
+    def respondBinary(self, message: str) -> Optional[list]:
+        """The values for a binary block query, None to fail.  Override to simulate an instrument.
+        """
+        return []
+
+    def write(self, message, termination = None, encoding = None) -> int:
+        self.check()
+        self.messages.append(message)
+        return len(message)
+
+    def query(self, message, delay = None) -> str:
+        self.check()
+        self.messages.append(message)
+        if message in self.responses:
+            return self.responses[message]
+        return self.respond(message)
+
+    def read(self, termination = None, encoding = None) -> str:
+        self.check()
+        return self.respond("")
+
+    def query_binary_values(self, message, datatype = 'f', is_big_endian = False, container = list):
+        self.check()
+        self.messages.append(message)
+        values = self.respondBinary(message)
+        if values is None:
+            raise IOError("no data")
+        return container(values)
+
+    def check(self) -> None:
+        if self.fail:
+            raise IOError("timeout")
+
+    def close(self):
+        pass
+
+class FakeGpibResource(FakeResource):
+    """Adds the service request events of a GPIB resource.  Set requests to raise them."""
+    def __init__(self, resource: str):
+        super().__init__(resource)
+        self.queueEnabled = False
+        self.requests = 0
+        self.waits = 0
+        self.statusReads = 0
+        self.waitFail = False
+
+    def enable_event(self, eventType, mechanism):
+        self.queueEnabled = True
+
+    def disable_event(self, eventType, mechanism):
+        self.queueEnabled = False
+
+    def discard_events(self, eventType, mechanism):
+        self.requests = 0
+
+    def wait_on_event(self, eventType, timeout, capture_timeout = False):
+        self.waits += 1
+        if self.waitFail or not self.queueEnabled:
+            raise IOError("event queue not enabled")
+        if not self.requests:
+            return SimpleNamespace(timed_out = True)
+        self.requests -= 1
+        return SimpleNamespace(timed_out = False)
+
+    def wait_for_srq(self, timeout = 25000):
+        pass
+
+    def read_stb(self):
+        self.statusReads += 1
+        return 64
+
+class FakeResourceManager():
+    """Opens the fakes added for particular resources, and a plain FakeResource for any other"""
+    def __init__(self):
+        self.resources = {}
+
+    def add(self, fake: FakeResource) -> FakeResource:
+        self.resources[fake.resource_name] = fake
+        return fake
+
+    def open_resource(self, resource, **kwargs) -> FakeResource:
+        return self.resources.setdefault(resource, FakeResource(resource))
+
+def useFakeVisa(test: unittest.TestCase) -> FakeResourceManager:
+    """Open fake resources until the end of the test
+
+    Close the VisaInstruments made during the test, or their sessions are dropped from the pool at cleanup.
+    :param TestCase test: cleanup is registered with it
+    :return FakeResourceManager: add() fakes to it before constructing the drivers
+    """
+    pool = VisaResourcePool()
+    saved = pool.rm
+    rm = FakeResourceManager()
+    pool.rm = rm
+
+    def restore():
+        pool.rm = saved
+        with pool.lock:
+            for resource in [r for r, session in pool.sessions.items() if isinstance(session.inst, FakeResource)]:
+                del pool.sessions[resource]
+        HealthMonitor().invalidate()
+
+    test.addCleanup(restore)
+    return rm
@@ -25,6 +25,26 @@ from INSTR.Tests.Unit.test_WarmIFPlate import test_WarmIFPlate
 from INSTR.Tests.Unit.test_CartAssembly import test_CartAssembly
 from INSTR.Tests.Unit.test_GalilDMCSocket import test_GalilDMCSocket
 from INSTR.Tests.Unit.test_Lakeshore218 import test_Lakeshore218
+from INSTR.Tests.Unit.test_ShadowState import test_ShadowState
+from INSTR.Tests.Unit.test_RasterScanner import test_RasterScanner
+from INSTR.Tests.Unit.test_ScanPlanner import test_ScanPlanner
+from INSTR.Tests.Unit.test_StreamingStats import test_StreamingStats
+from INSTR.Tests.Unit.test_TelemetryPoller import test_TelemetryPoller
+from INSTR.Tests.Unit.test_ColumnarRecorder import test_ColumnarRecorder
+from INSTR.Tests.Unit.test_HealthMonitor import test_HealthMonitor
+from INSTR.Tests.Unit.test_WaitUntil import test_WaitUntil
+from INSTR.Tests.Unit.test_HP34401 import test_HP34401
+from INSTR.Tests.Unit.test_BaseMXA import test_BaseMXA
+from INSTR.Tests.Unit.test_BaseE441X import test_BaseE441X
+from INSTR.Tests.Unit.test_PowerMeterSimulator import test_PowerMeterSimulator
+from INSTR.Tests.Unit.test_Lakeshore218Status import test_Lakeshore218Status
+from INSTR.Tests.Unit.test_GalilReply import test_GalilReply
+from INSTR.Tests.Unit.test_AsyncVisaInstrument import test_AsyncVisaInstrument
+from INSTR.Tests.Unit.test_VisaInstrument import test_VisaInstrument
+from INSTR.Tests.Unit.test_AgilentPNATrace import test_AgilentPNATrace
+from INSTR.Tests.Unit.test_Attenuator import test_Attenuator
+from INSTR.Tests.Unit.test_HP3488aController import test_HP3488aController
+from INSTR.Tests.Unit.test_AgilentE363xA import test_AgilentE363xA
 
 if __name__ == "__main__":
     logger = logging.getLogger("ALMAFE-CTS-Control")
@@ -0,0 +1,25 @@
+import unittest
+from INSTR.PowerSupply.AgilentE363xA import PowerSupply
+from INSTR.Tests.Unit.FakeVisa import useFakeVisa
+
+class test_AgilentE363xA(unittest.TestCase):
+
+    def setUp(self):
+        useFakeVisa(self)
+        self.supply = PowerSupply("GPIB0::5::INSTR", idQuery = False, reset = False)
+        self.addCleanup(self.supply.inst.close)
+        self.fake = self.supply.inst.inst
+
+    def test_outputAlwaysSent(self):
+        # a protection trip may have turned the output off since:
+        self.supply.setOutputEnable(True)
+        self.supply.setOutputEnable(True)
+        self.assertEqual(self.fake.messages.count(":OUTP 1;"), 2)
+
+    def test_settingsShadowed(self):
+        self.supply.setVoltage(5, 1)
+        self.supply.setVoltage(5, 1)
+        self.assertEqual(self.fake.messages.count(":VOLT 5;"), 1)
+        # another channel:
+        self.supply.setVoltage(5, 2)
+        self.assertEqual(self.fake.messages.count(":VOLT 5;"), 2)
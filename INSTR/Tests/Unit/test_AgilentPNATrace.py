@@ -0,0 +1,130 @@
+import unittest
+import warnings
+import numpy as np
+from math import atan2, degrees, log10
+from INSTR.PNA.AgilentPNA import AgilentPNA
+from INSTR.PNA.schemas import MeasConfig, TriggerSource, Format
+from INSTR.Tests.Unit.FakeVisa import FakeResource, FakeGpibResource, useFakeVisa
+
+class FakePNA(FakeResource):
+    """A network analyzer whose sweep completes after a number of status reads, then returns a trace"""
+    def __init__(self, resource: str, trace: list, completeAfter: int = 1):
+        super().__init__(resource)
+        self.trace = trace
+        self.completeAfter = completeAfter
+        self.sweepStatusReads = 0
+
+    def respond(self, message: str) -> str:
+        if message == ":STAT:OPER:DEV?;:STAT:OPER?":
+            self.sweepStatusReads += 1
+            return "+16;+1024" if self.sweepStatusReads >= self.completeAfter else "+0;+0"
+        return "1"
+
+    def respondBinary(self, message: str) -> list:
+        return self.trace
+
+class FakeGpibPNA(FakePNA, FakeGpibResource):
+    """The same on GPIB, raising a service request whenever waited on"""
+    def __init__(self, resource: str, trace: list, completeAfter: int = 1):
+        super().__init__(resource, trace, completeAfter)
+        self.requests = 1000000
+
+class test_AgilentPNATrace(unittest.TestCase):
+
+    def setUp(self):
+        self.visa = useFakeVisa(self)
+        self.address = 16
+
+    def makePNA(self, trace: list, completeAfter: int = 1, srq: bool = False) -> AgilentPNA:
+        # a different resource each time so every PNA has its own fake:
+        resource = f"GPIB0::{self.address}::INSTR"
+        self.address += 1
+        self.visa.add((FakeGpibPNA if srq else FakePNA)(resource, trace, completeAfter))
+        pna = AgilentPNA(resource, idQuery = False, reset = False)
+        self.addCleanup(pna.inst.close)
+        # as setMeasConfig() would, without its one second wait:
+        pna.measConfig = MeasConfig(triggerSource = TriggerSource.IMMEDIATE, format = Format.SDATA,
+                                    sweepPoints = len(trace) // 2 if trace else 0, timeout_sec = 1)
+        pna.inst.inst.messages = []
+        return pna
+
+    def test_getTrace(self):
+        # interleaved real, imag:
+        trace = [1.0, 0.0, 0.0, 0.5, -0.25, -0.25, 3.0, 4.0]
+        pna = self.makePNA(trace)
+        amp, phase = pna.getTrace()
+        self.assertIsInstance(amp, list)
+        for i, (real, imag) in enumerate(zip(trace[::2], trace[1::2])):
+            self.assertAlmostEqual(amp[i], 10 * log10(real ** 2 + imag ** 2), places = 5)
+            self.assertAlmostEqual(phase[i], degrees(atan2(imag, real)), places = 4)
+        self.assertIn(':CALC1:PAR:SEL "MY_MEAS";', pna.inst.inst.messages)
+        self.assertIn("CALC1:DATA? SDATA;", pna.inst.inst.messages)
+
+    def test_asArray(self):
+        pna = self.makePNA([0.0, 1.0, 1.0, 0.0])
+        amp, phase = pna.getTrace(asArray = True)
+        self.assertIsInstance(amp, np.ndarray)
+        self.assertTrue(np.allclose(amp, [0, 0]))
+        self.assertTrue(np.allclose(phase, [90, 0]))
+
+    def test_getTraceComplex(self):
+        pna = self.makePNA([1.0, 2.0, 3.0, 4.0])
+        trace = pna.getTraceComplex()
+        self.assertEqual(trace.dtype, np.complex64)
+        self.assertTrue(np.array_equal(trace, [1 + 2j, 3 + 4j]))
+
+    def test_zero(self):
+        # log of zero power is -inf, without a warning:
+        pna = self.makePNA([0.0, 0.0, 1.0, 0.0])
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            amp, _ = pna.getTrace(asArray = True)
+        self.assertEqual(amp[0], -np.inf)
+
+    def test_noData(self):
+        pna = self.makePNA(None)
+        pna.measConfig.sweepPoints = 2
+        self.assertEqual(pna.getTrace(), (None, None))
+        pna = self.makePNA([1.0])
+        self.assertIsNone(pna.getTraceComplex())
+
+    def test_sweepCompleteSRQ(self):
+        pna = self.makePNA([1.0, 0.0], completeAfter = 3, srq = True)
+        self.assertTrue(pna.checkSweepComplete(timeoutSec = 1))
+        # the state is checked before each wait, so a request raised before the first wait is not missed:
+        self.assertEqual(pna.inst.inst.sweepStatusReads, 3)
+        self.assertEqual(pna.inst.inst.waits, 2)
+
+    def test_sweepCompleteSRQError(self):
+        pna = self.makePNA([1.0, 0.0], completeAfter = 3, srq = True)
+        pna.inst.inst.waitFail = True
+        # falls back to polling:
+        self.assertTrue(pna.checkSweepComplete(timeoutSec = 1))
+        self.assertEqual(pna.inst.inst.waits, 1)
+        self.assertEqual(pna.inst.inst.sweepStatusReads, 3)
+
+    def test_sweepCompletePoll(self):
+        pna = self.makePNA([1.0, 0.0], completeAfter = 4)
+        self.assertTrue(pna.checkSweepComplete(timeoutSec = 1))
+        self.assertFalse(pna.inst.supports_srq)
+        self.assertEqual(pna.inst.inst.sweepStatusReads, 4)
+
+    def test_sweepCompleteTimeout(self):
+        for srq in (False, True):
+            pna = self.makePNA([1.0, 0.0], completeAfter = 1000000, srq = srq)
+            self.assertFalse(pna.checkSweepComplete(timeoutSec = 0.05))
+        pna.measConfig.timeout_sec = 0.05
+        self.assertIsNone(pna.getTraceComplex())
+
+    def test_sweepCompleteNoWait(self):
+        pna = self.makePNA([1.0, 0.0], completeAfter = 2)
+        self.assertFalse(pna.checkSweepComplete(waitForComplete = False))
+        self.assertTrue(pna.checkSweepComplete(waitForComplete = False))
+        self.assertEqual(pna.inst.inst.sweepStatusReads, 2)
+
+    def test_resetSRQ(self):
+        for srq in (False, True):
+            pna = self.makePNA([1.0, 0.0], srq = srq)
+            pna.measConfig = None
+            self.assertTrue(pna.reset())
+            self.assertEqual(any("*SRE 128" in message for message in pna.inst.inst.messages), srq)
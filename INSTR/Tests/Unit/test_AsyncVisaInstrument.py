@@ -0,0 +1,59 @@
+import unittest
+import asyncio
+import threading
+from INSTR.Common.AsyncVisaInstrument import AsyncVisaInstrument
+from INSTR.Common.VisaResourcePool import VisaResourcePool, VisaSession
+
+class FakeInstrument():
+    def __init__(self, resource):
+        self.resource = resource
+        self.threads = []
+
+    def query(self, message, delay = None, return_on_error = None):
+        self.threads.append(threading.current_thread().name)
+        return message.upper()
+
+    def close(self):
+        pass
+
+class test_AsyncVisaInstrument(unittest.TestCase):
+
+    def setUp(self):
+        self.a = FakeInstrument("GPIB0::31::INSTR")
+        self.b = FakeInstrument("GPIB0::32::INSTR")
+
+    def tearDown(self):
+        AsyncVisaInstrument.shutdown(self.a.resource)
+        AsyncVisaInstrument.shutdown(self.b.resource)
+
+    def test_run(self):
+        ainst = AsyncVisaInstrument(self.a)
+        self.assertEqual(asyncio.run(ainst.run(self.a.query, "*idn?")), "*IDN?")
+        self.assertEqual(asyncio.run(ainst.query("meas?")), "MEAS?")
+        self.assertEqual(len(self.a.threads), 2)
+        self.assertNotEqual(self.a.threads[0], threading.current_thread().name)
+
+    def test_worker_per_resource(self):
+        async def both():
+            return await asyncio.gather(
+                AsyncVisaInstrument(self.a).query("a1"),
+                AsyncVisaInstrument(self.b).query("b1"),
+                AsyncVisaInstrument(self.a).query("a2")
+            )
+        self.assertEqual(asyncio.run(both()), ["A1", "B1", "A2"])
+        self.assertEqual(len(set(self.a.threads)), 1)
+        self.assertNotEqual(self.a.threads[0], self.b.threads[0])
+
+    def test_shutdown_on_release(self):
+        ainst = AsyncVisaInstrument(self.a)
+        asyncio.run(ainst.query("*idn?"))
+        self.assertIn(self.a.resource, AsyncVisaInstrument.executors)
+        session = VisaSession(self.a.resource, self.a)
+        session.refCount = 2
+        pool = VisaResourcePool()
+        pool.release(session)
+        self.assertIn(self.a.resource, AsyncVisaInstrument.executors)
+        pool.release(session)
+        self.assertNotIn(self.a.resource, AsyncVisaInstrument.executors)
+        # a later run() starts a new worker:
+        self.assertEqual(asyncio.run(ainst.query("*idn?")), "*IDN?")
@@ -0,0 +1,72 @@
+import unittest
+import time
+from INSTR.WarmIFPlate.Attenuator import Attenuator
+from INSTR.Tests.Unit.FakeVisa import useFakeVisa
+
+class test_Attenuator(unittest.TestCase):
+    RESOURCE = "GPIB0::28::INSTR"
+
+    def setUp(self):
+        self.visa = useFakeVisa(self)
+        self.attenuator = Attenuator(self.RESOURCE)
+        self.addCleanup(self.attenuator.switchController.inst.close)
+        self.fake = self.attenuator.switchController.inst.inst
+
+    def test_patterns(self):
+        for atten, pattern in enumerate(Attenuator.PATTERNS):
+            # first switch is the smallest section:
+            self.assertEqual(sum(div for div, closed in zip(reversed(Attenuator.DIVISORS), pattern) if closed), atten)
+            self.assertEqual(pattern[8:], (False, False))
+        self.assertEqual(Attenuator.PATTERNS[Attenuator.MAX_ATTENUATION], Attenuator.RESET_SWITCHES)
+
+    def test_reset(self):
+        # the first write sends every switch:
+        self.assertEqual(self.fake.messages, ["A12345678B90"])
+        self.assertEqual(self.attenuator.getValue(), Attenuator.MAX_ATTENUATION)
+
+    def test_noReset(self):
+        attenuator = Attenuator("GPIB0::27::INSTR", reset = False)
+        self.addCleanup(attenuator.switchController.inst.close)
+        self.assertIsNone(attenuator.getValue())
+        self.assertEqual(attenuator.switchController.inst.inst.messages, [])
+
+    def test_diffOnly(self):
+        self.fake.messages = []
+        # 121 = 40 + 40 + 20 + 10 + 4 + 4 + 2 + 1, 120 drops the 1 dB section:
+        self.assertTrue(self.attenuator.setValue(120))
+        self.assertEqual(self.fake.messages, ["B1"])
+        # nothing to change is still success:
+        self.assertTrue(self.attenuator.setValue(120))
+        self.assertEqual(len(self.fake.messages), 1)
+        # 119 = 40 + 40 + 20 + 10 + 4 + 4 + 1: close the 1 dB section and open the 2 dB:
+        self.assertTrue(self.attenuator.setValue(119))
+        self.assertEqual(self.fake.messages[-1], "A1B2")
+        self.assertEqual(self.attenuator.getValue(), 119)
+
+    def test_sweep(self):
+        self.fake.messages = []
+        values = list(self.attenuator.sweep([120, 120, 119], settleTime = 0))
+        self.assertEqual(values, [120, 120, 119])
+        self.assertEqual(self.fake.messages, ["B1", "A1B2"])
+
+    def test_sweepSettle(self):
+        # waits only for the steps which switch:
+        start = time.time()
+        list(self.attenuator.sweep([121, 121, 121], settleTime = 0.2))
+        self.assertLess(time.time() - start, 0.2)
+        list(self.attenuator.sweep([120], settleTime = 0.2))
+        self.assertGreaterEqual(time.time() - start, 0.2)
+
+    def test_writeFailed(self):
+        self.fake.fail = True
+        self.assertFalse(self.attenuator.setValue(0))
+        self.assertIsNone(self.attenuator.getValue())
+        # the switches are unknown, so all are sent next time:
+        self.fake.fail = False
+        self.assertTrue(self.attenuator.setValue(0))
+        self.assertEqual(self.fake.messages[-1], "B1234567890")
+
+    def test_simulate(self):
+        attenuator = Attenuator(simulate = True)
+        self.assertTrue(attenuator.setValue(10))
+        self.assertEqual(attenuator.getValue(), 10)
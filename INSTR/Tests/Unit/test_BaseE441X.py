@@ -0,0 +1,103 @@
+import unittest
+import re
+import random
+from INSTR.PowerMeter.KeysightE441X import PowerMeter
+from INSTR.PowerMeter.schemas import Channel, StdErrConfig
+from INSTR.Tests.Unit.FakeVisa import FakeResource, useFakeVisa
+
+class FakePowerMeter(FakeResource):
+    """A two channel meter with both sensors connected, returning TRIG:COUN readings for each READ?"""
+    def __init__(self, resource: str):
+        super().__init__(resource)
+        self.source = "BUS"
+        self.reads = []
+        self.triggerCount = 1
+        self.dualQueries = 0
+
+    def write(self, message, termination = None, encoding = None) -> int:
+        match = re.search(r"TRIG\d:COUN (\d+)", message)
+        if match:
+            self.triggerCount = int(match.group(1))
+        return super().write(message, termination, encoding)
+
+    def respond(self, message: str) -> str:
+        if message == "*IDN?":
+            return "Agilent Technologies,E4419B,MY12345678,A2.10.01\n"
+        if message == "STAT:DEV:COND?":
+            return "+6\n"
+        if message == "*ESR?" or message.endswith("*OPC?"):
+            return "+1\n"
+        if re.match(r"TRIG\d:SOUR\?", message):
+            return self.source + "\n"
+        if message == "FETC1:POW:AC?;:FETC2:POW:AC?":
+            self.dualQueries += 1
+            return f"{random.gauss(-10, 0.01):+.5E};{random.gauss(-20, 0.01):+.5E}\n"
+        if message.startswith("READ"):
+            self.reads.append(self.triggerCount)
+            return ",".join(["-10.0"] * self.triggerCount)
+        return "-10.0"
+
+class test_BaseE441X(unittest.TestCase):
+    RESOURCE = "GPIB0::13::INSTR"
+
+    def setUp(self):
+        self.fake = useFakeVisa(self).add(FakePowerMeter(self.RESOURCE))
+        self.pm = PowerMeter(self.RESOURCE, idQuery = True, reset = False)
+        self.addCleanup(self.pm.inst.close)
+        self.fake.messages = []
+
+    def test_constructor(self):
+        self.assertIs(self.pm.inst.inst, self.fake)
+        # the ID query found the second sensor:
+        self.assertTrue(self.pm.twoChannel)
+        self.assertIsNotNone(self.pm.settings[Channel.B].get('units'))
+
+    def test_burstRead(self):
+        values, timestamps = self.pm.burstRead(120, Channel.B)
+        self.assertEqual(len(values), 120)
+        self.assertEqual(len(timestamps), 120)
+        self.assertEqual(self.fake.reads, [50, 50, 20])
+        # the trigger source is put back:
+        self.assertEqual(self.fake.messages[-1], "TRIG2:COUN 1;:TRIG2:SOUR BUS;:INIT2:CONT ON;")
+
+    def test_burstRead_immediate(self):
+        self.fake.source = "IMM"
+        self.pm.burstRead(10)
+        self.assertEqual(self.fake.messages[-1], "TRIG1:COUN 1;:INIT1:CONT ON;")
+
+    def test_readDual(self):
+        a, b = self.pm.readDual()
+        self.assertAlmostEqual(a, -10, delta = 0.1)
+        self.assertAlmostEqual(b, -20, delta = 0.1)
+        self.pm.twoChannel = False
+        self.assertIsNone(self.pm.readDual())
+
+    def test_readDual_failed(self):
+        self.fake.fail = True
+        self.assertIsNone(self.pm.readDual())
+
+    def test_acquireDual(self):
+        a, b, t = self.pm.acquireDual(20)
+        self.assertEqual((len(a), len(b), len(t)), (20, 20, 20))
+        self.assertEqual(self.fake.dualQueries, 20)
+
+    def test_averagingReadDual(self):
+        random.seed(1)
+        config = StdErrConfig(minS = 5, maxS = 100, stdErr = 0.005, timeout = 0)
+        resultA, resultB = self.pm.averagingReadDual(config)
+        self.assertTrue(resultA.success and resultB.success)
+        self.assertAlmostEqual(resultA.mean, -10, delta = 0.01)
+        self.assertAlmostEqual(resultB.mean, -20, delta = 0.01)
+        # one query per pair, stopping when both channels reach the target:
+        self.assertEqual(resultA.N, resultB.N)
+        self.assertEqual(self.fake.dualQueries, resultA.N)
+        self.assertLessEqual(resultA.stdErr, 0.005)
+        self.assertLessEqual(resultB.stdErr, 0.005)
+
+    def test_averagingRead_burst(self):
+        config = StdErrConfig(minS = 25, maxS = 0, stdErr = 0, timeout = 0)
+        result = self.pm.averagingRead(config, burstSize = 10)
+        self.assertTrue(result.success)
+        self.assertEqual(result.N, 25)
+        # the last burst is only as long as needed:
+        self.assertEqual(self.fake.reads, [10, 10, 5])
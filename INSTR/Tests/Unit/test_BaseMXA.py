@@ -0,0 +1,87 @@
+import unittest
+import time
+import numpy as np
+from INSTR.SpectrumAnalyzer.BaseMXA import BaseMXA
+from INSTR.SpectrumAnalyzer.schemas import TraceFormat
+from INSTR.Tests.Unit.FakeVisa import FakeResource, useFakeVisa
+
+class FakeMXA(FakeResource):
+    """A spectrum analyzer with a narrow span at 10 GHz"""
+    START = 10e9
+    STOP = 10e9 + 1e5
+    POINTS = 101
+
+    def __init__(self, resource: str):
+        super().__init__(resource)
+        self.points = self.POINTS
+        self.datatype = None
+        self.sweepTime = 0.001
+        self.averaging = 0
+        self.averages = 100
+
+    def respond(self, message: str) -> str:
+        if message == "*STB?":
+            return "32"
+        if message == ":SWE:TIME?;:AVER?;:AVER:COUN?":
+            return f"{self.sweepTime:+.8E};{self.averaging};{self.averages:+d}"
+        if message == ":FREQ:STAR?;:FREQ:STOP?;:SWE:POIN?":
+            return f"{self.START:+.11E};{self.STOP:+.11E};{self.points:+d}"
+        if message == ":SYST:ERR?":
+            return '+0,"No error"'
+        return super().respond(message)
+
+    def query_binary_values(self, message, datatype = 'f', is_big_endian = False, container = list):
+        self.datatype = datatype
+        return super().query_binary_values(message, datatype, is_big_endian, container)
+
+    def respondBinary(self, message: str) -> list:
+        return np.full(self.POINTS, -32.0, dtype = np.float32 if self.datatype == 'f' else np.float64)
+
+class test_BaseMXA(unittest.TestCase):
+    RESOURCE = "TCPIP0::10.1.1.10::inst0::INSTR"
+
+    def setUp(self):
+        self.fake = useFakeVisa(self).add(FakeMXA(self.RESOURCE))
+        self.mxa = BaseMXA(self.RESOURCE, idQuery = False, reset = False)
+        self.addCleanup(self.mxa.inst.close)
+        self.fake.messages = []
+
+    def test_connected(self):
+        self.assertTrue(self.mxa.inst.connected)
+        self.assertIs(self.mxa.inst.inst, self.fake)
+
+    def test_readTraceBinary(self):
+        success, msg, x, y = self.mxa.readTraceBinary(traceNum = 1, format = TraceFormat.REAL32)
+        self.assertTrue(success, msg)
+        self.assertIn(":TRAC:DATA? TRACE1", self.fake.messages)
+        self.assertEqual(self.fake.datatype, 'f')
+        self.assertEqual(len(x), FakeMXA.POINTS)
+        self.assertEqual(len(y), FakeMXA.POINTS)
+        # 1 kHz steps at 10 GHz, which REAL,32 could not resolve:
+        self.assertEqual(x.dtype, np.float64)
+        self.assertTrue(np.allclose(np.diff(x), 1e3))
+        self.assertEqual(x[0], FakeMXA.START)
+        self.assertEqual(x[-1], FakeMXA.STOP)
+
+    def test_expected(self):
+        # each sweep takes 20 ms and there are 5 averages:
+        self.fake.sweepTime = 0.02
+        self.fake.averaging = 1
+        self.fake.averages = 5
+        start = time.time()
+        success, msg, _, _ = self.mxa.readTraceBinary()
+        self.assertTrue(success, msg)
+        self.assertGreaterEqual(time.time() - start, 0.1)
+        # the first poll was after the expected time:
+        self.assertEqual(self.fake.messages.count("*STB?"), 1)
+
+    def test_readTraceBinary_points_mismatch(self):
+        self.fake.points = 201
+        success, _, x, y = self.mxa.readTraceBinary(format = TraceFormat.REAL64)
+        self.assertFalse(success)
+        self.assertIsNone(x)
+
+    def test_readTraceBinary_ascii(self):
+        success, _, _, _ = self.mxa.readTraceBinary(format = TraceFormat.ASCII)
+        self.assertFalse(success)
+        self.assertEqual(self.fake.messages, [])
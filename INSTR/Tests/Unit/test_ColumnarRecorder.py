@@ -0,0 +1,87 @@
+import unittest
+import tempfile
+import shutil
+import numpy as np
+from INSTR.Common.ColumnarRecorder import ColumnarRecorder, ColumnarDataset
+from INSTR.PNA.PNASimulator import PNASimulator
+from INSTR.PNA.schemas import MeasConfig
+
+class test_ColumnarRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.pna = PNASimulator()
+        self.config = MeasConfig(sweepPoints = 51)
+        self.pna.setMeasConfig(self.config)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def record(self, rows, ys):
+        with ColumnarRecorder(self.path, segmentRows = 4) as recorder:
+            for y in ys:
+                amp, phase = self.pna.getTrace(y = y, asArray = True)
+                recorder.append({"y": y, "amp": amp, "phase": phase}, config = self.config)
+                rows.append(amp)
+
+    def test_roundTrip(self):
+        rows = []
+        self.record(rows, range(100, 110))
+        dataset = ColumnarDataset(self.path)
+        self.assertEqual(len(dataset), 10)
+        self.assertEqual(sorted(dataset.columns), ["amp", "phase", "y"])
+        self.assertEqual(dataset.read("amp").shape, (10, 51))
+        np.testing.assert_array_equal(dataset.read("amp"), np.array(rows))
+        np.testing.assert_array_equal(dataset.read("y", 3, 6), [103, 104, 105])
+        records = dataset.records()
+        self.assertEqual(len(records), 10)
+        self.assertEqual(records[0]['config']['sweepPoints'], 51)
+
+    def test_zeroCopy(self):
+        self.record([], range(100, 110))
+        dataset = ColumnarDataset(self.path)
+        # within one segment:
+        self.assertIsInstance(dataset.read("amp", 4, 8), np.memmap)
+        # spanning segments is a copy:
+        self.assertNotIsInstance(dataset.read("amp", 2, 6), np.memmap)
+
+    def test_reopen(self):
+        rows = []
+        self.record(rows, range(100, 106))
+        self.record(rows, range(106, 109))
+        dataset = ColumnarDataset(self.path)
+        self.assertEqual(len(dataset), 9)
+        np.testing.assert_array_equal(dataset.read("y"), range(100, 109))
+        np.testing.assert_array_equal(dataset.read("amp"), np.array(rows))
+
+    def test_shapeMismatch(self):
+        with ColumnarRecorder(self.path) as recorder:
+            recorder.append({"y": 1, "amp": np.zeros(5)})
+            with self.assertRaises(ValueError):
+                recorder.append({"y": 1, "amp": np.zeros(6)})
+            with self.assertRaises(ValueError):
+                recorder.append({"amp": np.zeros(5)})
+
+    def test_dtypeMismatch(self):
+        with ColumnarRecorder(self.path) as recorder:
+            recorder.append({"y": 1, "amp": np.zeros(5, dtype = np.float32)})
+            # would be truncated:
+            with self.assertRaises(ValueError):
+                recorder.append({"y": 1.5, "amp": np.zeros(5, dtype = np.float32)})
+            with self.assertRaises(ValueError):
+                recorder.append({"y": 1, "amp": np.zeros(5)})
+
+    def test_dtypes(self):
+        with ColumnarRecorder(self.path, dtypes = {"y": float}) as recorder:
+            recorder.append({"y": 1, "amp": np.zeros(5)})
+            recorder.append({"y": 1.5, "amp": np.zeros(5)})
+        np.testing.assert_array_equal(ColumnarDataset(self.path).read("y"), [1.0, 1.5])
+
+    def test_closeTwice(self):
+        recorder = ColumnarRecorder(self.path)
+        recorder.append({"y": 1})
+        recorder.close()
+        recorder.close()
+        with self.assertRaises(ValueError):
+            recorder.append({"y": 2})
+        self.assertEqual(len(ColumnarDataset(self.path)), 1)
@@ -0,0 +1,74 @@
+import unittest
+import socket
+from INSTR.MotorControl.GalilDMCSocket import MotorController
+from INSTR.MotorControl.schemas import Position
+
+GOOD = b': : 1, 1, 1\r\n: 0.0000\r\n: -50000\r\n: -100000\r\n: 2250\r\n:'
+
+class FakeSocket():
+    """A connected controller socket which answers each request with the next reply, delivered in pieces"""
+    def __init__(self, replies: list, piece: int = 5):
+        self.replies = list(replies)
+        self.piece = piece
+        self.requests = []
+        self.pending = b''
+        self.blocking = True
+
+    def sendall(self, request: bytes) -> None:
+        self.requests.append(request)
+        self.pending += self.replies.pop(0) if self.replies else b''
+
+    def recv_into(self, buffer: bytearray) -> int:
+        if not self.pending:
+            if self.blocking:
+                raise socket.timeout()
+            raise BlockingIOError()
+        data, self.pending = self.pending[:self.piece], self.pending[self.piece:]
+        buffer[:len(data)] = data
+        return len(data)
+
+    def settimeout(self, timeout):
+        self.blocking = True
+
+    def setblocking(self, flag: bool):
+        self.blocking = flag
+
+    def close(self):
+        pass
+
+class test_GalilReply(unittest.TestCase):
+
+    def setUp(self):
+        self.mc = MotorController(reset = False)
+        self.mc.SOCKET_TIMEOUT = 0.1
+
+    def connect(self, replies: list, piece: int = 5) -> FakeSocket:
+        self.mc.socket = FakeSocket(replies, piece)
+        return self.mc.socket
+
+    def test_recv_counts_error_handshakes(self):
+        # the first command fails, and the rest of the reply is still read:
+        self.connect([b'?: 45, 45, 45\r\n:'], 3)
+        self.assertEqual(self.mc.query(b'XX; TS; TS;', handshakes = 3), b'?: 45, 45, 45\r\n:')
+
+    def test_getStatus(self):
+        sock = self.connect([GOOD])
+        status, pos = self.mc.getStatus()
+        self.assertEqual(len(sock.requests), 1)
+        self.assertEqual(pos, Position(x = 10, y = 20, pol = 10))
+        self.assertTrue(status.xPower)
+        self.assertFalse(status.xMotion)
+
+    def test_getStatus_partial_failure(self):
+        # RPY fails: the motor status is still used and the request is retried:
+        sock = self.connect([GOOD.replace(b' -100000\r\n:', b'?'), GOOD])
+        status, pos = self.mc.getStatus()
+        self.assertEqual(len(sock.requests), 2)
+        self.assertEqual(sock.replies, [])
+        self.assertEqual(pos, Position(x = 10, y = 20, pol = 10))
+
+    def test_getStatus_retries_exhausted(self):
+        sock = self.connect([b'', b''])
+        status, pos = self.mc.getStatus()
+        self.assertEqual(len(sock.requests), 2)
+        self.assertEqual(pos, Position(x = 0, y = 0, pol = 0))
@@ -0,0 +1,116 @@
+import unittest
+import re
+import numpy as np
+from INSTR.DMM.HP34401 import HP34401
+from INSTR.Tests.Unit.FakeVisa import FakeResource, useFakeVisa
+
+class FakeDMM(FakeResource):
+    """A meter which takes the configured number of readings on INIT or READ?"""
+    def __init__(self, resource: str, model: str, chunk: int = 1000):
+        super().__init__(resource)
+        self.model = model
+        self.chunk = chunk
+        self.pending = 0
+        self.taken = 0
+        self.failBinary = False
+
+    def counts(self) -> int:
+        configured = [m for m in self.messages if ":SAMP:COUN" in m]
+        if not configured:
+            return 1
+        triggers, samples = re.search(r"TRIG:COUN (\d+); :SAMP:COUN (\d+)", configured[-1]).groups()
+        return int(triggers) * int(samples)
+
+    def write(self, message, termination = None, encoding = None) -> int:
+        if message == "INIT;":
+            self.pending = self.counts()
+        return super().write(message, termination, encoding)
+
+    def respond(self, message: str) -> str:
+        if message == "*IDN?":
+            return f"Agilent Technologies,{self.model}A,MY00000000,2.35-2.35-0.09-46-09"
+        if message == "*ESR?":
+            return "+0"
+        if message == "":
+            return "1.5"
+        return ",".join(["1.5"] * self.counts())
+
+    def respondBinary(self, message: str) -> np.ndarray:
+        if self.failBinary:
+            return None
+        n = min(self.chunk, self.pending)
+        self.pending -= n
+        self.taken += n
+        return np.arange(self.taken - n, self.taken, dtype = float)
+
+class test_HP34401(unittest.TestCase):
+
+    def setUp(self):
+        self.visa = useFakeVisa(self)
+        self.address = 22
+
+    def makeDMM(self, model: str, **kwargs) -> HP34401:
+        resource = f"GPIB0::{self.address}::INSTR"
+        self.address += 1
+        fake = self.visa.add(FakeDMM(resource, model, **kwargs))
+        dmm = HP34401(resource)
+        self.addCleanup(dmm.inst.close)
+        self.assertEqual(dmm.model, model)
+        self.assertEqual(fake.messages[-1], "*RST")
+        return dmm
+
+    def test_acquire(self):
+        dmm = self.makeDMM("34410", chunk = 50)
+        values, timestamps = dmm.acquire(120, 0.001)
+        self.assertTrue(np.array_equal(values, np.arange(120)))
+        self.assertTrue(np.allclose(np.diff(timestamps), 0.001, atol = 1e-6))
+        self.assertIn(":TRIG:COUN 1; :SAMP:COUN 120;:SAMP:TIM 0.001;:SAMP:SOUR TIM;", dmm.inst.inst.messages)
+        self.assertIn(":FORM:DATA REAL,64;:FORM:BORD SWAP;", dmm.inst.inst.messages)
+        self.assertEqual(dmm.inst.inst.messages[-1], ":FORM:DATA ASCII;")
+        self.assertNotIn("ABOR;", dmm.inst.inst.messages)
+
+    def test_acquire_drain(self):
+        # more readings than memory are read out while measuring:
+        dmm = self.makeDMM("34410", chunk = 30)
+        dmm.READING_MEMORY = {"34410": 40}
+        values, _ = dmm.acquire(120, 0.001)
+        self.assertTrue(np.array_equal(values, np.arange(120)))
+        self.assertEqual(dmm.inst.inst.messages.count("R?"), 4)
+
+    def test_acquire_split(self):
+        dmm = self.makeDMM("34410")
+        dmm.MAX_SAMPLE_COUNT = {"34410": 50}
+        values, _ = dmm.acquire(110, 0.001)
+        self.assertEqual(len(values), 110)
+        # 3 triggers of 37 readings:
+        self.assertIn(":TRIG:COUN 3; :SAMP:COUN 37;:SAMP:TIM 0.001;:SAMP:SOUR TIM;", dmm.inst.inst.messages)
+        self.assertIn("ABOR;", dmm.inst.inst.messages)
+        values, _ = dmm.acquire(50 * 50 + 1, 0.001)
+        self.assertEqual(len(values), 0)
+
+    def test_acquire_error(self):
+        dmm = self.makeDMM("34411")
+        dmm.inst.inst.failBinary = True
+        values, timestamps = dmm.acquire(10, 0.001, timeout = 0.1)
+        self.assertEqual(len(values), 0)
+        self.assertEqual(len(timestamps), 0)
+        self.assertIn("ABOR;", dmm.inst.inst.messages)
+
+    def test_acquire_34401(self):
+        dmm = self.makeDMM("34401")
+        values, timestamps = dmm.acquire(700, 0.001)
+        self.assertEqual(len(values), 700)
+        self.assertEqual(len(timestamps), 700)
+        self.assertEqual(dmm.inst.inst.messages.count("READ?"), 2)
+        self.assertIn(":TRIG:COUN 1; :SAMP:COUN 512;", dmm.inst.inst.messages)
+        self.assertIn(":TRIG:COUN 1; :SAMP:COUN 188;", dmm.inst.inst.messages)
+
+    def test_readSinglePoint_after_acquire(self):
+        for model in ("34401", "34410"):
+            dmm = self.makeDMM(model)
+            dmm.acquire(10, 0.001)
+            dmm.inst.inst.messages = []
+            self.assertEqual(dmm.readSinglePoint(), 1.5)
+            self.assertTrue(dmm.inst.inst.messages[0].startswith(":TRIG:SOUR IMM;:TRIG:DEL:AUTO ON;"))
+            self.assertTrue(dmm.inst.inst.messages[1].startswith(":TRIG:COUN 1; :SAMP:COUN 1;"))
+            self.assertEqual(dmm.inst.inst.messages[2], "READ?")
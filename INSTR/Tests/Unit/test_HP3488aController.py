@@ -0,0 +1,78 @@
+import unittest
+from INSTR.SwitchController.HP3488a import HP3488aController, SwitchConfig, DigitalPort, DigitalMethod
+from INSTR.Tests.Unit.FakeVisa import useFakeVisa
+
+class test_HP3488aController(unittest.TestCase):
+
+    def setUp(self):
+        useFakeVisa(self)
+        self.controller = HP3488aController("GPIB0::51::INSTR")
+        self.fake = self.controller.inst.inst
+
+    def tearDown(self):
+        self.controller.inst.close()
+
+    def test_skipUnchanged(self):
+        self.assertTrue(self.controller.staticWrite(1, 0xF0))
+        self.assertFalse(self.controller.staticWrite(1, 0xF0))
+        self.assertTrue(self.controller.staticWrite(2, 0xF0))
+        self.assertEqual(self.fake.messages, ["SWRITE 100, 240", "SWRITE 200, 240"])
+
+    def test_breakBeforeMake(self):
+        # unknown previous state: release everything first:
+        self.controller.staticWrite(1, 0xF0, breakTime = 0.001)
+        self.assertEqual(self.fake.messages, ["SWRITE 100, 255", "SWRITE 100, 240"])
+        # 0xF0 to 0x0F opens four relays and closes four: open them all, then close the new ones:
+        self.fake.messages = []
+        self.controller.staticWrite(1, 0x0F, breakTime = 0.001)
+        self.assertEqual(self.fake.messages, ["SWRITE 100, 255", "SWRITE 100, 15"])
+        # only closing relays, no break needed:
+        self.fake.messages = []
+        self.controller.staticWrite(1, 0x03, breakTime = 0.001)
+        self.assertEqual(self.fake.messages, ["SWRITE 100, 3"])
+
+    def test_breakBeforeMakeInBatch(self):
+        self.controller.staticWrite(1, 0xF0)
+        self.fake.messages = []
+        with self.controller.batch():
+            self.controller.staticWrite(2, 0x01)
+            self.controller.staticWrite(1, 0x0F, breakTime = 0.001)
+            self.controller.staticWrite(3, 0x02)
+        # the break is sent on its own, with what came before it, then the rest together:
+        self.assertEqual(self.fake.messages, ["SWRITE 200, 1;SWRITE 100, 255", "SWRITE 100, 15;SWRITE 300, 2"])
+
+    def test_writeFailed(self):
+        self.controller.staticWrite(1, 0xF0)
+        self.fake.fail = True
+        self.assertFalse(self.controller.staticWrite(1, 0x0F))
+        self.assertNotIn((1, 0), self.controller.state)
+        self.fake.fail = False
+        # not recorded, so sent again:
+        self.assertTrue(self.controller.staticWrite(1, 0xF0))
+        self.assertEqual(self.fake.messages[-1], "SWRITE 100, 240")
+
+    def test_breakFailed(self):
+        self.controller.staticWrite(1, 0xF0)
+        self.fake.fail = True
+        self.assertFalse(self.controller.staticWrite(1, 0x0F, breakTime = 0.001))
+        self.assertNotIn((1, 0), self.controller.state)
+
+    def test_batchFailed(self):
+        with self.controller.batch():
+            self.controller.staticWrite(1, 0xF0)
+            self.controller.staticWrite(2, 0xF0)
+            self.fake.fail = True
+        self.assertEqual(self.controller.state, {})
+        self.fake.fail = False
+        self.assertTrue(self.controller.staticWrite(1, 0xF0))
+
+    def test_digitalWrite(self):
+        config = SwitchConfig(slot = 3, port = DigitalPort.WORD_16BIT, method = DigitalMethod.ASCII)
+        self.assertTrue(self.controller.digitalWrite(config, [100, 4196, 100]))
+        self.assertEqual(self.fake.messages, ["DWRITE 302,100,4196,100"])
+        # a single repeated value is skipped:
+        self.assertFalse(self.controller.digitalWrite(config, [100]))
+        self.fake.fail = True
+        self.assertFalse(self.controller.digitalWrite(config, [200]))
+        self.fake.fail = False
+        self.assertTrue(self.controller.digitalWrite(config, [100]))
@@ -0,0 +1,64 @@
+import unittest
+import time
+from threading import Thread
+from INSTR.Common.HealthMonitor import HealthMonitor
+
+class test_HealthMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.monitor = HealthMonitor()
+        self.monitor.invalidate()
+        self.count = 0
+
+    def probe(self):
+        self.count += 1
+        time.sleep(0.05)
+        return True
+
+    def failingProbe(self):
+        raise RuntimeError("timeout")
+
+    def test_cached(self):
+        for _ in range(5):
+            self.assertTrue(self.monitor.check("GPIB0::1::INSTR", self.probe, ttl = 10))
+        self.assertEqual(self.count, 1)
+
+    def test_expired(self):
+        self.monitor.check("GPIB0::1::INSTR", self.probe, ttl = 0.1)
+        time.sleep(0.15)
+        self.monitor.check("GPIB0::1::INSTR", self.probe, ttl = 0.1)
+        self.assertEqual(self.count, 2)
+
+    def test_invalidate(self):
+        self.monitor.check("GPIB0::1::INSTR", self.probe)
+        self.monitor.invalidate("GPIB0::1::INSTR")
+        self.monitor.check("GPIB0::1::INSTR", self.probe)
+        self.assertEqual(self.count, 2)
+
+    def test_concurrent_callers(self):
+        threads = [Thread(target = self.monitor.check, args = ("GPIB0::1::INSTR", self.probe)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.count, 1)
+
+    def test_failing(self):
+        self.assertFalse(self.monitor.check("GPIB0::2::INSTR", self.failingProbe))
+
+    def test_checkAll(self):
+        resources = [f"GPIB0::{i}::INSTR" for i in range(1, 9)]
+        start = time.time()
+        result = self.monitor.checkAll({resource: self.probe for resource in resources})
+        # eight 50 ms probes run at the same time:
+        self.assertLess(time.time() - start, 0.2)
+        self.assertEqual(list(result.keys()), resources)
+        self.assertTrue(all(result.values()))
+        self.assertEqual(self.count, 8)
+
+    def test_nested(self):
+        # a device's connected() checking the same resource through VisaInstrument.probe():
+        outer = lambda: self.monitor.check("GPIB0::3::INSTR", self.probe)
+        result = self.monitor.checkAll({"GPIB0::3::INSTR": outer})
+        self.assertTrue(result["GPIB0::3::INSTR"])
+        self.assertEqual(self.count, 1)
@@ -0,0 +1,91 @@
+import unittest
+import re
+from INSTR.TemperatureMonitor.Lakeshore218 import TemperatureMonitor
+from INSTR.Tests.Unit.FakeVisa import FakeResource, useFakeVisa
+
+class FakeLakeshore(FakeResource):
+    """A Model 218 answering compound KRDG? and RDGST? queries"""
+    def __init__(self, resource: str):
+        super().__init__(resource)
+        self.temps = [4.0 + i for i in range(8)]
+        self.status = [0] * 8
+
+    def respond(self, message: str) -> str:
+        if message == "QESR?\r":
+            return "000"
+        if message == "*IDN?\r":
+            return "LSCI,MODEL218S,218A1234,061407"
+        replies = []
+        for command in message.strip().split(';'):
+            match = re.match(r"KRDG\? (\d)", command)
+            if match:
+                input = int(match.group(1))
+                temps = self.temps if input == 0 else [self.temps[input - 1]]
+                replies.append(",".join(f"{t:+.4f}" for t in temps))
+            match = re.match(r"RDGST\? (\d)", command)
+            if match:
+                replies.append(f"{self.status[int(match.group(1)) - 1]:03d}")
+        return ";".join(replies)
+
+    def statusQueries(self) -> int:
+        return sum(query.count("RDGST?") for query in self.messages)
+
+class test_Lakeshore218Status(unittest.TestCase):
+    RESOURCE = "GPIB0::12::INSTR"
+
+    def setUp(self):
+        self.fake = useFakeVisa(self).add(FakeLakeshore(self.RESOURCE))
+        self.tm = TemperatureMonitor(self.RESOURCE, idQuery = True, reset = False)
+        self.addCleanup(self.tm.inst.close)
+        self.fake.messages = []
+
+    def test_constructor(self):
+        self.assertIs(self.tm.inst.inst, self.fake)
+        self.assertEqual(self.tm.statusCache, {})
+
+    def test_cached(self):
+        temps, errors = self.tm.readAll()
+        self.assertEqual(temps, self.fake.temps)
+        self.assertEqual(errors, [0] * 8)
+        self.assertEqual(self.fake.statusQueries(), 8)
+        self.tm.readAll()
+        self.assertEqual(self.fake.statusQueries(), 8)
+        self.assertEqual(len(self.fake.messages), 2)
+
+    def test_stale(self):
+        self.tm.STATUS_TTL = 0
+        self.tm.readAll()
+        self.tm.readAll()
+        self.assertEqual(self.fake.statusQueries(), 16)
+
+    def test_faulty(self):
+        self.tm.readAll()
+        # sensor 3 fails between polls:
+        self.fake.temps[2] = 0
+        self.fake.status[2] = 16
+        temps, errors = self.tm.readAll()
+        self.assertEqual(temps[2], -1.0)
+        self.assertEqual(errors[2], 16)
+        self.assertEqual(self.fake.messages[-1], "RDGST? 3\r")
+
+    def test_recovered(self):
+        self.fake.temps[4] = 0
+        self.fake.status[4] = 16
+        temps, errors = self.tm.readAll()
+        self.assertEqual(errors[4], 16)
+        # sensor 5 recovers, well inside STATUS_TTL:
+        self.fake.temps[4] = 8.0
+        self.fake.status[4] = 0
+        temps, errors = self.tm.readAll()
+        self.assertEqual(temps[4], 8.0)
+        self.assertEqual(errors[4], 0)
+        self.assertEqual(self.fake.messages[-1], "RDGST? 5\r")
+        # and is trusted again after that:
+        count = len(self.fake.messages)
+        self.tm.readAll()
+        self.assertEqual(len(self.fake.messages), count + 1)
+
+    def test_readSingle(self):
+        self.assertEqual(self.tm.readSingle(2), (5.0, 0))
+        self.assertEqual(self.fake.messages[-1], "KRDG? 2;RDGST? 2\r")
+        self.assertEqual(self.tm.readSingle(9), (-1.0, 1))
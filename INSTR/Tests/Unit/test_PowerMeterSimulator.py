@@ -0,0 +1,26 @@
+import unittest
+from INSTR.PowerMeter.Simulator import PowerMeterSimulator
+from INSTR.PowerMeter.schemas import Channel, StdErrConfig
+
+class test_PowerMeterSimulator(unittest.TestCase):
+
+    def setUp(self):
+        self.pm = PowerMeterSimulator()
+
+    def test_readDual(self):
+        a, b = self.pm.readDual()
+        self.assertEqual((a, b), (self.pm.read(Channel.A), self.pm.read(Channel.B)))
+
+    def test_acquireDual(self):
+        a, b, t = self.pm.acquireDual(10)
+        self.assertEqual((len(a), len(b), len(t)), (10, 10, 10))
+
+    def test_averagingReadDual(self):
+        resultA, resultB = self.pm.averagingReadDual(StdErrConfig())
+        self.assertTrue(resultA.success)
+        self.assertTrue(resultB.success)
+
+    def test_burstRead(self):
+        values, timestamps = self.pm.burstRead(25, Channel.B)
+        self.assertEqual(len(values), 25)
+        self.assertEqual(len(timestamps), 25)
@@ -0,0 +1,72 @@
+import unittest
+from pydantic import ValidationError
+from INSTR.MotorControl.RasterScan import RasterScanner
+from INSTR.MotorControl.schemas import RasterScanConfig
+from INSTR.PNA.schemas import MeasConfig, TriggerSource
+
+class test_RasterScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.scanner = RasterScanner(simulate = True)
+        # start where the simulator is, so the test only makes three moves:
+        self.config = RasterScanConfig(
+            xStart = 145, xStop = 155,
+            yStart = 145, yStop = 150, yStep = 5,
+            pol = -100,
+            triggerInterval = 1,
+            serpentine = True,
+            moveTimeout = 10
+        )
+
+    def tearDown(self):
+        self.scanner.close()
+        del self.scanner
+        self.scanner = None
+
+    def test_triggerInterval(self):
+        with self.assertRaises(ValidationError):
+            RasterScanConfig(triggerInterval = 0)
+        with self.assertRaises(ValidationError):
+            RasterScanConfig(triggerInterval = -1)
+
+    def test_close(self):
+        self.scanner.close()
+        with self.assertRaises(RuntimeError):
+            self.scanner.executor.submit(print)
+        # closing again is harmless:
+        self.scanner.close()
+
+    def test_planRows(self):
+        rows = self.scanner.planRows(self.config)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual((rows[0].xStart, rows[0].xStop, rows[0].y), (145, 155, 145))
+        self.assertEqual((rows[1].xStart, rows[1].xStop, rows[1].y), (155, 145, 150))
+        self.assertFalse(rows[0].isReversed())
+        self.assertTrue(rows[1].isReversed())
+        self.config.serpentine = False
+        rows = self.scanner.planRows(self.config)
+        self.assertFalse(rows[1].isReversed())
+
+    def test_armPNA(self):
+        measConfig = self.scanner.armPNA(self.config, MeasConfig())
+        self.assertEqual(measConfig.sweepPoints, 11)
+        self.assertEqual(measConfig.triggerSource, TriggerSource.EXTERNAL)
+
+    def test_outOfBounds(self):
+        self.config.xStop = 10000
+        result = self.scanner.scan(self.config, MeasConfig())
+        self.assertFalse(result.success)
+        self.assertEqual(len(result.rows), 0)
+
+    def test_scan(self):
+        result = self.scanner.scan(self.config, MeasConfig())
+        self.assertTrue(result.success, result.message)
+        self.assertEqual(len(result.rows), 2)
+        for rowData in result.rows:
+            self.assertEqual(len(rowData.x), 11)
+            self.assertEqual(len(rowData.amp), 11)
+            self.assertEqual(rowData.x, sorted(rowData.x))
+        # the reversed row is returned in order of increasing X:
+        amp, phase = self.scanner.pna.getTrace(y = 150)
+        self.assertEqual(result.rows[1].amp, amp)
+        self.assertEqual(result.rows[1].phase, phase)
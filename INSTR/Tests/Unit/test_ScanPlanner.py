@@ -0,0 +1,53 @@
+import unittest
+from INSTR.MotorControl.MCSimulator import MCSimulator
+from INSTR.MotorControl.ScanPlanner import ScanPlanner
+from INSTR.MotorControl.schemas import Position
+
+class test_ScanPlanner(unittest.TestCase):
+
+    def setUp(self):
+        self.planner = ScanPlanner(MCSimulator())
+        self.xs = [100 + 10 * i for i in range(11)]
+        self.ys = [100 + 10 * i for i in range(6)]
+        self.startPos = Position(x = 100, y = 100, pol = 0)
+
+    def tearDown(self):
+        del self.planner
+        self.planner = None
+
+    def test_moveTime(self):
+        here = Position(x = 100, y = 100, pol = 0)
+        self.assertEqual(self.planner.moveTime(here, here), 0)
+        short = self.planner.moveTime(here, Position(x = 101, y = 100, pol = 0))
+        long = self.planner.moveTime(here, Position(x = 200, y = 100, pol = 0))
+        self.assertLess(short, long)
+        # axes move together so a diagonal takes no longer than the longest axis:
+        diagonal = self.planner.moveTime(here, Position(x = 200, y = 200, pol = 0))
+        self.assertAlmostEqual(diagonal, long)
+
+    def test_serpentine(self):
+        plan = self.planner.planGrid(self.xs, self.ys, [0], self.startPos)
+        raster = self.planner.planGrid(self.xs, self.ys, [0], self.startPos, serpentine = False)
+        self.assertEqual(len(plan.points), len(self.xs) * len(self.ys))
+        self.assertLess(plan.totalTime, raster.totalTime)
+        self.assertAlmostEqual(plan.totalTime, sum(plan.moveTimes))
+        # consecutive points are always neighbors:
+        for a, b in zip(plan.points, plan.points[1:]):
+            self.assertLessEqual(abs(a.x - b.x) + abs(a.y - b.y), 10)
+
+    def test_groupByPol(self):
+        plan = self.planner.planGrid(self.xs, self.ys, [-90, 0, 90], self.startPos)
+        pols = [p.pol for p in plan.points]
+        # each pol angle visited once, starting nearest the current angle:
+        changes = [a for a, b in zip(pols, pols[1:]) if a != b]
+        self.assertEqual(len(changes), 2)
+        self.assertIn(pols[0], (-90, 0))
+
+    def test_startCorner(self):
+        start = Position(x = 200, y = 150, pol = 0)
+        plan = self.planner.planGrid(self.xs, self.ys, [0], start)
+        self.assertEqual(plan.points[0], start)
+
+    def test_outOfBounds(self):
+        with self.assertRaises(ValueError):
+            self.planner.planGrid([0, MCSimulator.X_MAX + 1], [0], [0], self.startPos)
@@ -0,0 +1,53 @@
+import unittest
+from INSTR.Common.ShadowState import ShadowState
+
+class test_ShadowState(unittest.TestCase):
+
+    def setUp(self):
+        self.shadow = ShadowState(
+            alwaysSend = ("CALC:PAR:DEF", ),
+            coupled = {
+                "FREQ:CENT": ("FREQ:STAR", "FREQ:STOP"),
+                "FREQ:STAR": ("FREQ:CENT", "FREQ:SPAN")
+            }
+        )
+
+    def tearDown(self):
+        del self.shadow
+        self.shadow = None
+
+    def test_normalize(self):
+        self.assertEqual(ShadowState.normalize(":SENSe1:FREQuency:CENTer"), "SENS:FREQ:CENT")
+        self.assertEqual(ShadowState.normalize("CALC2:PAR:SEL"), "CALC2:PAR:SEL")
+        self.assertEqual(ShadowState.normalize("*RST"), "*RST")
+
+    def test_dropRepeated(self):
+        self.assertEqual(self.shadow.filter(":FREQ:CENT 1e9;SPAN 2e6;"), ":FREQ:CENT 1e9;SPAN 2e6;")
+        self.assertEqual(self.shadow.filter(":FREQuency:CENTER 1e9;:FREQ:SPAN 2e6"), "")
+        # relative header is resolved when the first command is dropped:
+        self.assertEqual(self.shadow.filter(":FREQ:CENT 1e9;SPAN 3e6"), ":FREQ:SPAN 3e6")
+
+    def test_coupled(self):
+        self.shadow.filter(":FREQ:CENT 1e9;:FREQ:START 5e8")
+        self.assertEqual(self.shadow.filter(":FREQ:CENT 1e9"), ":FREQ:CENT 1e9")
+
+    def test_auto(self):
+        self.shadow.filter(":BWID:AUTO OFF;:BWID 3e6")
+        self.assertEqual(self.shadow.filter(":BWID:AUTO OFF;:BWID 3e6"), "")
+        self.shadow.filter(":BWID:AUTO ON")
+        self.assertEqual(self.shadow.filter(":BWID:AUTO OFF;:BWID 3e6"), ":BWID:AUTO OFF;:BWID 3e6")
+
+    def test_alwaysSend(self):
+        message = ':CALC2:PAR:DEF "CH2_S21", S21'
+        self.assertEqual(self.shadow.filter(message), message)
+        self.assertEqual(self.shadow.filter(message), message)
+        self.assertEqual(self.shadow.filter("*CLS;:INIT"), "*CLS;:INIT")
+
+    def test_reset(self):
+        self.shadow.filter(":FREQ:CENT 1e9")
+        self.shadow.observe("*RST;*OPC?")
+        self.assertEqual(self.shadow.filter(":FREQ:CENT 1e9"), ":FREQ:CENT 1e9")
+        self.shadow.checkResponse(":SYST:ERR?", '-113,"Undefined header"')
+        self.assertEqual(self.shadow.filter(":FREQ:CENT 1e9"), ":FREQ:CENT 1e9")
+        self.shadow.checkResponse(":SYST:ERR?", '+0,"No error"')
+        self.assertEqual(self.shadow.filter(":FREQ:CENT 1e9"), "")
@@ -0,0 +1,48 @@
+import unittest
+from random import gauss, seed
+from statistics import mean, stdev
+from math import sqrt, inf
+from INSTR.Common.StreamingStats import StreamingStats
+
+class test_StreamingStats(unittest.TestCase):
+
+    def setUp(self):
+        seed(1)
+        self.samples = [gauss(-10, 0.5) for _ in range(500)]
+
+    def test_allSamples(self):
+        stats = StreamingStats()
+        self.assertEqual(stats.stdErr, 0)
+        for x in self.samples:
+            stats.add(x)
+        self.assertEqual(stats.total, 500)
+        self.assertEqual(stats.count, 500)
+        self.assertAlmostEqual(stats.mean, mean(self.samples))
+        self.assertAlmostEqual(stats.stdev, stdev(self.samples))
+        self.assertAlmostEqual(stats.stdErr, stdev(self.samples) / sqrt(500))
+
+    def test_window(self):
+        stats = StreamingStats(window = 50)
+        for i, x in enumerate(self.samples):
+            stats.add(x)
+            if i >= 1:
+                window = self.samples[max(0, i - 49):i + 1]
+                self.assertAlmostEqual(stats.mean, mean(window))
+                self.assertAlmostEqual(stats.stdev, stdev(window))
+        self.assertEqual(stats.total, 500)
+        self.assertEqual(stats.count, 50)
+
+    def test_timeToTarget(self):
+        stats = StreamingStats()
+        self.assertEqual(stats.timeToTarget(0.1, 0), inf)
+        for x in self.samples[:10]:
+            stats.add(x)
+        self.assertEqual(stats.timeToTarget(1, 1.0), 0)
+        # 0.1 second per sample so far:
+        needed = (stats.stdev / 0.01) ** 2 - 10
+        self.assertAlmostEqual(stats.timeToTarget(0.01, 1.0), needed * 0.1)
+        # can't get there within a window of 20:
+        stats = StreamingStats(window = 20)
+        for x in self.samples[:10]:
+            stats.add(x)
+        self.assertEqual(stats.timeToTarget(0.01, 1.0), inf)
@@ -0,0 +1,54 @@
+import unittest
+import time
+from INSTR.Common.TelemetryPoller import TelemetryPoller
+from INSTR.TemperatureMonitor.Simulator import TemperatureMonitorSimulator
+
+class test_TelemetryPoller(unittest.TestCase):
+
+    def setUp(self):
+        self.poller = TelemetryPoller()
+        self.count = 0
+
+    def tearDown(self):
+        self.poller.removeAll()
+
+    def counter(self):
+        self.count += 1
+        return self.count
+
+    def test_latest(self):
+        self.assertIsNone(self.poller.latest("counter"))
+        self.poller.add("counter", self.counter, interval = 0.01)
+        time.sleep(0.2)
+        timestamp, value = self.poller.latest("counter")
+        self.assertAlmostEqual(timestamp, time.time(), delta = 0.1)
+        self.assertGreater(value, 1)
+
+    def test_history(self):
+        self.poller.add("counter", self.counter, interval = 0.01, size = 5)
+        time.sleep(0.2)
+        self.poller.remove("counter")
+        countBefore = self.count
+        timestamps, values = self.poller.history("counter")
+        self.assertEqual(len(timestamps), 0)
+        channel = self.poller.add("counter", self.counter, interval = 0.01, size = 5)
+        time.sleep(0.2)
+        timestamps, values = channel.history()
+        # only the last 5 kept, oldest first:
+        self.assertEqual(len(timestamps), 5)
+        self.assertEqual(list(values[:, 0]), sorted(values[:, 0]))
+        self.assertGreater(values[0, 0], countBefore)
+
+    def test_sequence(self):
+        tm = TemperatureMonitorSimulator()
+        self.poller.add("temperatures", lambda: tm.readAll()[0], interval = 0.05)
+        time.sleep(0.1)
+        timestamps, values = self.poller.history("temperatures", seconds = 10)
+        self.assertEqual(values.shape[1], len(tm.readAll()[0]))
+
+    def test_errors(self):
+        def fail():
+            raise ValueError("simulated failure")
+        self.poller.add("fail", fail, interval = 0.01)
+        time.sleep(0.05)
+        self.assertIsNone(self.poller.latest("fail"))
@@ -0,0 +1,206 @@
+import unittest
+import time
+from threading import Thread
+from INSTR.Common.VisaInstrument import VisaInstrument
+from INSTR.Common.VisaResourcePool import VisaResourcePool
+from INSTR.Common.ShadowState import ShadowState
+from INSTR.Tests.Unit.FakeVisa import FakeGpibResource, useFakeVisa
+
+class test_VisaInstrument(unittest.TestCase):
+    RESOURCE = "GPIB0::41::INSTR"
+
+    def setUp(self):
+        self.visa = useFakeVisa(self)
+        self.pool = VisaResourcePool()
+        self.inst = VisaInstrument(self.RESOURCE)
+        self.fake = self.inst.inst
+
+    def tearDown(self):
+        self.inst.close()
+
+    def makeShadowed(self) -> VisaInstrument:
+        inst = VisaInstrument("GPIB0::42::INSTR", shadow = ShadowState(alwaysSend = ("INIT", )))
+        self.addCleanup(inst.close)
+        return inst
+
+    def test_batch(self):
+        with self.inst.batch():
+            self.inst.write("SENS:FREQ:CENT 1e9;")
+            self.inst.write(" :SENS:FREQ:SPAN 2e6")
+            self.inst.write("*CLS")
+            self.assertEqual(self.fake.messages, [])
+        self.assertEqual(self.fake.messages, [":SENS:FREQ:CENT 1e9;:SENS:FREQ:SPAN 2e6;*CLS"])
+
+    def test_writeResult(self):
+        self.assertEqual(self.inst.write("*CLS"), 4)
+        with self.inst.batch():
+            # queued:
+            self.assertEqual(self.inst.write("FREQ 1e9"), len(":FREQ 1e9"))
+        self.fake.fail = True
+        self.assertEqual(self.inst.write("*CLS"), 0)
+        self.fake.fail = False
+        with self.inst.batch():
+            self.inst.write("FREQ 1e9")
+            self.assertTrue(self.inst.flush_batch())
+            self.fake.fail = True
+            self.inst.write("POW -10")
+            self.assertFalse(self.inst.flush_batch())
+            self.fake.fail = False
+        self.assertTrue(self.inst.flush_batch())
+
+    def test_batchNotScpi(self):
+        with self.inst.batch(scpi = False):
+            self.inst.write("SWRITE 100, 255")
+            self.inst.write("SWRITE 200, 0")
+        self.assertEqual(self.fake.messages, ["SWRITE 100, 255;SWRITE 200, 0"])
+
+    def test_queryFlushes(self):
+        with self.inst.batch():
+            self.inst.write("FREQ 1e9")
+            self.inst.query("FREQ?")
+            self.inst.write("POW -10")
+        self.assertEqual(self.fake.messages, [":FREQ 1e9", "FREQ?", ":POW -10"])
+
+    def test_nested(self):
+        with self.inst.batch():
+            self.inst.write("FREQ 1e9")
+            with self.inst.batch():
+                self.inst.write("POW -10")
+            self.assertEqual(self.fake.messages, [])
+        self.assertEqual(self.fake.messages, [":FREQ 1e9;:POW -10"])
+
+    def test_otherThread(self):
+        other = Thread(target = self.inst.write, args = ("*CLS", ))
+        with self.inst.batch():
+            self.inst.write("FREQ 1e9")
+            # waits for the batch instead of joining it:
+            other.start()
+            time.sleep(0.05)
+            self.inst.write("POW -10")
+            self.assertEqual(self.fake.messages, [])
+        other.join()
+        self.assertEqual(self.fake.messages, [":FREQ 1e9;:POW -10", "*CLS"])
+
+    def test_maxMessageLength(self):
+        self.inst.max_message_length = 20
+        with self.inst.batch():
+            for i in range(4):
+                self.inst.write(f"SOUR{i}:POW -10")
+        self.assertEqual(self.fake.messages, [":SOUR0:POW -10", ":SOUR1:POW -10", ":SOUR2:POW -10", ":SOUR3:POW -10"])
+        self.inst.max_message_length = 40
+        self.fake.messages = []
+        with self.inst.batch():
+            for i in range(4):
+                self.inst.write(f"SOUR{i}:POW -10")
+        self.assertEqual(self.fake.messages, [":SOUR0:POW -10;:SOUR1:POW -10", ":SOUR2:POW -10;:SOUR3:POW -10"])
+        self.assertTrue(all(len(message) <= 40 for message in self.fake.messages))
+
+    def test_sharedSession(self):
+        other = VisaInstrument(self.RESOURCE)
+        try:
+            self.assertIs(other.inst, self.fake)
+            self.assertIs(other.lock, self.inst.lock)
+        finally:
+            other.close()
+        # still open for the first user:
+        self.assertIn(self.RESOURCE, self.pool.sessions)
+
+    def test_serviceRequests(self):
+        self.visa.add(FakeGpibResource("GPIB0::43::INSTR"))
+        inst = VisaInstrument("GPIB0::43::INSTR")
+        self.addCleanup(inst.close)
+        self.assertTrue(inst.supports_srq)
+        with inst.service_requests() as srq:
+            self.assertTrue(srq)
+            self.assertTrue(inst.inst.queueEnabled)
+            # a request raised before the wait is queued, not lost:
+            inst.inst.requests = 1
+            self.assertTrue(inst.wait_for_srq(100))
+            self.assertEqual(inst.inst.statusReads, 1)
+            self.assertFalse(inst.wait_for_srq(100))
+        self.assertFalse(inst.inst.queueEnabled)
+        # outside the block the queue is off, an error:
+        self.assertFalse(inst.wait_for_srq(100))
+
+    def test_noServiceRequests(self):
+        self.assertFalse(self.inst.supports_srq)
+        with self.inst.service_requests() as srq:
+            self.assertFalse(srq)
+        self.assertFalse(self.inst.wait_for_srq(100))
+
+    def test_shadow(self):
+        inst = self.makeShadowed()
+        self.assertEqual(inst.write(":FREQ 1e9;:POW -10"), len(":FREQ 1e9;:POW -10"))
+        inst.write(":FREQ 1e9;:POW -20")
+        self.assertEqual(inst.write(":FREQ 1e9"), VisaInstrument.DROPPED)
+        inst.write(":INIT:IMM")
+        inst.write(":INIT:IMM")
+        self.assertEqual(inst.inst.messages, [":FREQ 1e9;:POW -10", ":POW -20", ":INIT:IMM", ":INIT:IMM"])
+
+    def test_shadowBatch(self):
+        inst = self.makeShadowed()
+        inst.write(":FREQ 1e9")
+        with inst.batch():
+            inst.write(":FREQ 1e9")
+            inst.write(":POW -10")
+            inst.write(":FREQ 1e9")
+        self.assertEqual(inst.inst.messages, [":FREQ 1e9", ":POW -10"])
+        # nothing left to send:
+        with inst.batch():
+            inst.write(":POW -10")
+        self.assertEqual(len(inst.inst.messages), 2)
+
+    def test_shadowQuery(self):
+        inst = self.makeShadowed()
+        # a setting sent along with a query is recorded:
+        inst.query(":FREQ 2e9;:FREQ?")
+        inst.write(":FREQ 2e9")
+        self.assertEqual(inst.inst.messages, [":FREQ 2e9;:FREQ?"])
+        # an error reported by the instrument means its state is unknown:
+        inst.inst.responses[":SYST:ERR?"] = '-222,"Data out of range"'
+        inst.query(":SYST:ERR?")
+        inst.write(":FREQ 2e9")
+        self.assertEqual(inst.inst.messages[-1], ":FREQ 2e9")
+
+    def test_shadowWriteError(self):
+        inst = self.makeShadowed()
+        inst.write(":FREQ 1e9")
+        inst.inst.fail = True
+        inst.write(":POW -10")
+        inst.inst.fail = False
+        inst.write(":FREQ 1e9")
+        self.assertEqual(inst.inst.messages, [":FREQ 1e9", ":FREQ 1e9"])
+
+    def test_shadowShared(self):
+        inst = self.makeShadowed()
+        other = VisaInstrument("GPIB0::42::INSTR")
+        self.addCleanup(other.close)
+        self.assertIs(other.shadow, inst.shadow)
+        inst.write(":FREQ 1e9")
+        other.write(":FREQ 1e9")
+        self.assertEqual(inst.inst.messages, [":FREQ 1e9"])
+        other.invalidate_shadow()
+        inst.write(":FREQ 1e9")
+        self.assertEqual(inst.inst.messages, [":FREQ 1e9", ":FREQ 1e9"])
+
+    def test_shadowAttachedLater(self):
+        # created before any instance provided a shadow:
+        early = VisaInstrument("GPIB0::42::INSTR")
+        self.addCleanup(early.close)
+        self.assertIsNone(early.shadow)
+        inst = self.makeShadowed()
+        self.assertIs(early.shadow, inst.shadow)
+        inst.write(":FREQ 1e9")
+        # the early instance's write updates the shared shadow:
+        early.write(":FREQ 2e9")
+        inst.write(":FREQ 1e9")
+        self.assertEqual(inst.inst.messages, [":FREQ 1e9", ":FREQ 2e9", ":FREQ 1e9"])
+
+    def test_droppedInBatch(self):
+        inst = self.makeShadowed()
+        inst.write(":FREQ 1e9")
+        with inst.batch():
+            self.assertEqual(inst.write(":FREQ 1e9"), VisaInstrument.DROPPED)
+            self.assertEqual(inst.write(":POW -10"), len(":POW -10"))
+        inst.inst.fail = True
+        self.assertEqual(inst.write(":POW -20"), 0)
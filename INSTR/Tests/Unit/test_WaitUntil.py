@@ -0,0 +1,56 @@
+import unittest
+import time
+from threading import Event, Timer
+from INSTR.Common.WaitUntil import waitUntil
+
+class test_WaitUntil(unittest.TestCase):
+
+    def setUp(self):
+        self.doneAt = time.time() + 0.2
+
+    def done(self):
+        return time.time() >= self.doneAt
+
+    def test_success(self):
+        result = waitUntil(self.done, timeout = 2, minInterval = 0.001, maxInterval = 0.05)
+        self.assertTrue(result.success)
+        self.assertFalse(result.timedOut)
+        # seen within one maximum interval of completing:
+        self.assertLess(result.elapsed, 0.2 + 0.06)
+        # backoff keeps the number of polls far below elapsed / minInterval:
+        self.assertLess(result.polls, 20)
+
+    def test_expected(self):
+        result = waitUntil(self.done, timeout = 2, expected = 0.19, minInterval = 0.005, maxInterval = 0.05)
+        self.assertTrue(result.success)
+        self.assertLessEqual(result.polls, 4)
+
+    def test_value(self):
+        result = waitUntil(lambda: [1.5], timeout = 1)
+        self.assertEqual(result.value, [1.5])
+        self.assertEqual(result.polls, 1)
+
+    def test_timeout(self):
+        start = time.time()
+        result = waitUntil(lambda: False, timeout = 0.1, maxInterval = 0.02)
+        self.assertFalse(result.success)
+        self.assertTrue(result.timedOut)
+        self.assertAlmostEqual(time.time() - start, 0.1, delta = 0.05)
+
+    def test_zero_timeout(self):
+        result = waitUntil(lambda: False, timeout = 0)
+        self.assertTrue(result.timedOut)
+        self.assertEqual(result.polls, 1)
+
+    def test_cancel(self):
+        cancel = Event()
+        Timer(0.1, cancel.set).start()
+        result = waitUntil(lambda: False, timeout = 5, expected = 2, maxInterval = 0.02, cancel = cancel.is_set)
+        self.assertTrue(result.cancelled)
+        self.assertFalse(result.success)
+        self.assertLess(result.elapsed, 0.2)
+
+    def test_maxPolls(self):
+        result = waitUntil(lambda: False, minInterval = 0.001, maxInterval = 0.001, maxPolls = 5)
+        self.assertTrue(result.timedOut)
+        self.assertEqual(result.polls, 5)
@@ -0,0 +1,170 @@
+import unittest
+import time
+from types import SimpleNamespace
+from INSTR.Common.HealthMonitor import HealthMonitor
+from INSTR.WarmIFPlate.WarmIFPlate import WarmIFPlate
+from INSTR.WarmIFPlate.schemas import WarmIFConfig
+from INSTR.WarmIFPlate.Attenuator import Attenuator
+from INSTR.WarmIFPlate.NoiseSource import NoiseSource
+from INSTR.WarmIFPlate.OutputSwitch import OutputSwitch, OutputSelect, LoadSelect, PadSelect
+from INSTR.WarmIFPlate.YIGFilter import YIGFilter
+from INSTR.InputSwitch.InputSwitch import InputSwitch
+from INSTR.InputSwitch.Interface import InputSelect
+
+class test_WarmIFPlate(unittest.TestCase):
+
+    def setUp(self):
+        self.warmIFPlate = WarmIFPlate(
+            attenuator = Attenuator(simulate = True),
+            inputSwitch = InputSwitch(simulate = True),
+            noiseSource = NoiseSource(simulate = True),
+            outputSwitch = OutputSwitch(simulate = True),
+            yigFilter = YIGFilter(simulate = True)
+        )
+
+    def tearDown(self):
+        self.warmIFPlate.close()
+        del self.warmIFPlate
+        self.warmIFPlate = None
+
+    def test_connected(self):
+        self.assertTrue(self.warmIFPlate.connected())
+        self.assertTrue(self.warmIFPlate.device_info['connected'])
+
+    def test_apply(self):
+        config = WarmIFConfig(
+            inputSelect = InputSelect.POL1_LSB,
+            outputSelect = OutputSelect.SQUARE_LAW,
+            attenuation = 20,
+            noiseSourceEnable = True,
+            yigFreqGHz = 6.0
+        )
+        state = self.warmIFPlate.apply(config)
+        self.assertEqual(self.warmIFPlate.inputSwitch.selected, InputSelect.POL1_LSB)
+        self.assertEqual(self.warmIFPlate.attenuator.getValue(), 20)
+        self.assertEqual(self.warmIFPlate.yigFilter.getFrequency(), 6.0)
+        self.assertEqual(state.outputSelect, OutputSelect.SQUARE_LAW)
+        # the other output switch settings are read back from the switch:
+        self.assertEqual(state.loadSelect, LoadSelect.THROUGH)
+        self.assertEqual(state.padSelect, PadSelect.PAD_OUT)
+
+    def test_outputReadBack(self):
+        # set behind the plate's back, then one setting changed:
+        self.warmIFPlate.outputSwitch.setValue(OutputSelect.SQUARE_LAW, LoadSelect.LOAD, PadSelect.PAD_OUT)
+        state = self.warmIFPlate.apply(WarmIFConfig(padSelect = PadSelect.PAD_IN))
+        self.assertEqual(state.outputSelect, OutputSelect.SQUARE_LAW)
+        self.assertEqual(state.loadSelect, LoadSelect.LOAD)
+        self.assertEqual(self.warmIFPlate.outputSwitch.pad, PadSelect.PAD_IN)
+
+    def test_outputUnknown(self):
+        self.warmIFPlate.outputSwitch = OutputSwitch(reset = False, simulate = True)
+        with self.assertRaises(ValueError):
+            self.warmIFPlate.apply(WarmIFConfig(outputSelect = OutputSelect.SQUARE_LAW, attenuation = 10))
+        # nothing was set:
+        self.assertIsNone(self.warmIFPlate.outputSwitch.output)
+        self.assertIsNone(self.warmIFPlate.state.attenuation)
+        state = self.warmIFPlate.apply(WarmIFConfig(
+            outputSelect = OutputSelect.SQUARE_LAW, loadSelect = LoadSelect.THROUGH, padSelect = PadSelect.PAD_OUT))
+        self.assertEqual(state.outputSelect, OutputSelect.SQUARE_LAW)
+
+    def test_cached(self):
+        config = WarmIFConfig(attenuation = 10, yigFreqGHz = 8.0)
+        self.warmIFPlate.apply(config)
+        # behind the cache's back:
+        self.warmIFPlate.attenuator.setValue(30)
+        start = time.time()
+        self.warmIFPlate.apply(config)
+        self.assertLess(time.time() - start, 0.005)
+        self.assertEqual(self.warmIFPlate.attenuator.getValue(), 30)
+        self.warmIFPlate.invalidate()
+        self.warmIFPlate.apply(config)
+        self.assertEqual(self.warmIFPlate.attenuator.getValue(), 10)
+
+    def test_partial(self):
+        self.warmIFPlate.apply(WarmIFConfig(attenuation = 10))
+        state = self.warmIFPlate.apply(WarmIFConfig(yigFreqGHz = 4.0))
+        self.assertEqual(state.attenuation, 10)
+        self.assertEqual(state.yigFreqGHz, 4.0)
+        self.assertIsNone(state.inputSelect)
+
+    def test_stateCopy(self):
+        state = self.warmIFPlate.apply(WarmIFConfig(attenuation = 10))
+        state.attenuation = 30
+        self.assertEqual(self.warmIFPlate.state.attenuation, 10)
+        # also when nothing changed:
+        state = self.warmIFPlate.apply(WarmIFConfig(attenuation = 10))
+        state.attenuation = 30
+        self.assertEqual(self.warmIFPlate.apply(WarmIFConfig(attenuation = 10)).attenuation, 10)
+
+    def test_settleTimes(self):
+        self.warmIFPlate.close()
+        self.warmIFPlate = WarmIFPlate(
+            attenuator = Attenuator(simulate = True),
+            inputSwitch = InputSwitch(simulate = True),
+            noiseSource = NoiseSource(simulate = True, settleTime = 0.3),
+            outputSwitch = OutputSwitch(simulate = True),
+            yigFilter = YIGFilter(simulate = True)
+        )
+        start = time.time()
+        self.warmIFPlate.apply(WarmIFConfig(noiseSourceEnable = True))
+        self.assertGreaterEqual(time.time() - start, 0.3)
+        # only the devices which changed are waited for:
+        start = time.time()
+        self.warmIFPlate.apply(WarmIFConfig(noiseSourceEnable = True, attenuation = 10))
+        self.assertLess(time.time() - start, 0.3)
+
+    def test_close(self):
+        self.warmIFPlate.close()
+        with self.assertRaises(RuntimeError):
+            self.warmIFPlate.apply(WarmIFConfig(attenuation = 10))
+
+    def test_yigSettleTime(self):
+        yig = YIGFilter(simulate = True, settleMin = 0.01, settlePerGHz = 0.02)
+        start = time.time()
+        yig.setFrequency(6.0)
+        self.assertAlmostEqual(yig.settleUntil - start, 0.01 + 0.02 * 5.0, delta = 0.005)
+        yig = YIGFilter(simulate = True, settleMin = 0, settlePerGHz = 0)
+        yig.setFrequency(12.0)
+        self.assertLessEqual(yig.settleUntil, time.time())
+
+class FakeController():
+    def __init__(self, resource: str):
+        self.inst = SimpleNamespace(resource = resource)
+
+class FakeDevice():
+    def __init__(self, controller: FakeController, attribute: str = 'switchController'):
+        setattr(self, attribute, controller)
+        self.calls = 0
+
+    def connected(self) -> bool:
+        self.calls += 1
+        return True
+
+class test_WarmIFPlateHealth(unittest.TestCase):
+
+    def setUp(self):
+        HealthMonitor().invalidate()
+        hp3488a = FakeController("GPIB0::9::INSTR")
+        self.devices = {
+            'attenuator': FakeDevice(FakeController("GPIB0::28::INSTR")),
+            'inputSwitch': FakeDevice(hp3488a),
+            'noiseSource': FakeDevice(FakeController("GPIB0::5::INSTR"), 'powerSupply'),
+            'outputSwitch': FakeDevice(hp3488a),
+            'yigFilter': FakeDevice(hp3488a)
+        }
+        self.warmIFPlate = WarmIFPlate(**self.devices)
+
+    def tearDown(self):
+        self.warmIFPlate.close()
+        HealthMonitor().invalidate()
+
+    def test_probed_once_per_resource(self):
+        info = self.warmIFPlate.device_info
+        self.assertTrue(info['connected'])
+        self.assertEqual(info['reason'].count("OK"), 5)
+        # the three devices on the HP3488a share one probe:
+        probes = sum(device.calls for device in self.devices.values())
+        self.assertEqual(probes, 3)
+        # and the results are cached:
+        self.assertTrue(self.warmIFPlate.connected())
+        self.assertEqual(sum(device.calls for device in self.devices.values()), probes)
@@ -1,18 +1,44 @@
 from INSTR.SwitchController.Agilent11713 import AttenuatorSwitchController
-import copy
+from typing import Iterable, Iterator, Optional, Tuple
+import time
+
+def switchPatterns(maxAtten: int, divisors: Tuple[int, ...]) -> Tuple[Tuple[bool, ...], ...]:
+    """Switch states for every attenuation 0..maxAtten
+
+    In each pattern the first switch is the smallest section. Switches 9 and 10 are unused.
+    """
+    patterns = []
+    for atten in range(maxAtten + 1):
+        remaining = atten
+        switches = []
+        for div in divisors:
+            if remaining < div:
+                switches.insert(0, False)
+            else:
+                remaining -= div
+                switches.insert(0, True)
+        patterns.append(tuple(switches) + (False, False))
+    return tuple(patterns)
 
 class Attenuator():
     MAX_ATTENUATION = 121
     DIVISORS = (40, 40, 20, 10, 4, 4, 2, 1)
     RESET_SWITCHES = (True, True, True, True, True, True, True, True, False, False)
+    # switch states for every attenuation 0..MAX_ATTENUATION:
+    PATTERNS = switchPatterns(MAX_ATTENUATION, DIVISORS)
+    SETTLE_TIME = 0.02      # seconds for the relays to settle after switching
 
-    def __init__(self, resource = "GPIB0::28::INSTR", reset = True, simulate = False):
+    def __init__(self, resource = "GPIB0::28::INSTR", reset = True, simulate = False, settleTime: float = SETTLE_TIME):
         """Constructor
 
         :param str resource: VISA resource string, defaults to "GPIB0::9::INSTR"
+        :param float settleTime: seconds for the relays to settle after switching
         """
         # don't reset here because that would set attenuation to 0:
         self.simulate = simulate
+        self.settleTime = settleTime
+        # the attenuation set, None if unknown:
+        self.value = None
         if simulate:
             self.switchController = None
         else:
@@ -23,9 +49,8 @@ class Attenuator():
 
     def reset(self):
         # set attenuation to max:
-        if not self.simulate:
-            self.switchController.setSwitches(self.RESET_SWITCHES)
-        self.value = self.MAX_ATTENUATION
+        ok = self.simulate or self.switchController.setSwitches(self.RESET_SWITCHES)
+        self.value = self.MAX_ATTENUATION if ok else None
 
     def connected(self) -> bool:
         if self.simulate:
@@ -33,26 +58,40 @@ class Attenuator():
         else:
             return self.switchController.connected()
     
-    def setValue(self, atten: int = MAX_ATTENUATION):
+    def setValue(self, atten: int = MAX_ATTENUATION) -> bool:
+        """Set the attenuation, switching only the sections which change
+
+        :param int atten: dB in 0..MAX_ATTENUATION.  Out of range sets MAX_ATTENUATION.
+        :return bool: True if set.  False if the write failed, leaving the attenuation unknown.
+        """
         if atten < 0 or atten > self.MAX_ATTENUATION:
             atten = self.MAX_ATTENUATION
         
         self.value = atten
+        if self.simulate:
+            return True
+        if not self.switchController.setSwitches(self.PATTERNS[int(atten)]):
+            self.value = None
+            return False
+        return True
 
-        remaining = copy.copy(atten)
-        switches = []
+    def sweep(self, values: Iterable[int], settleTime: Optional[float] = None) -> Iterator[int]:
+        """Step through a list of attenuations, yielding after each has settled
 
-        for div in self.DIVISORS:
-            if remaining < div:
-                switches.insert(0, False)
-            else:
-                remaining -= div
-                switches.insert(0, True)
+        for atten in attenuator.sweep(range(0, 60, 2)):
+            power = powerMeter.read()
 
-        switches.append(False)
-        switches.append(False)
-        if not self.simulate:     
-            self.switchController.setSwitches(switches)
+        :param values: dB in 0..MAX_ATTENUATION
+        :param float settleTime: seconds to wait after switching, None for the constructor's settleTime.  No wait if the switches didn't change.
+        :yields int: each attenuation once set
+        """
+        if settleTime is None:
+            settleTime = self.settleTime
+        for atten in values:
+            previous = self.value
+            if self.setValue(atten) and self.value != previous and settleTime:
+                time.sleep(settleTime)
+            yield self.value
 
     def getValue(self):
         return self.value
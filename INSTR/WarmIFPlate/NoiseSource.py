@@ -2,8 +2,16 @@ from INSTR.PowerSupply.AgilentE363xA import PowerSupply
 
 class NoiseSource():
     """Noise diode implemented in terms of a Agilent E363xA power supply"""
-    def __init__(self, resource = "GPIB0::5::INSTR", simulate = False):
+    SETTLE_TIME = 0.1       # seconds for the noise diode output to stabilize after the supply is switched
+
+    def __init__(self, resource = "GPIB0::5::INSTR", simulate = False, settleTime: float = SETTLE_TIME):
+        """Constructor
+
+        :param str resource: VISA resource string for the power supply, defaults to "GPIB0::5::INSTR"
+        :param float settleTime: seconds for the noise diode output to stabilize after the supply is switched
+        """
         self.simulate = simulate
+        self.settleTime = settleTime
         if simulate:
             self.powerSupply = None
         else:
@@ -17,12 +25,12 @@ class NoiseSource():
             self.powerSupply.setVoltage(28)
 
     def connected(self) -> bool:
-        if simulate:
+        if self.simulate:
             return True
         else:
             return self.powerSupply.connected()
 
     def setEnable(self, enable: bool = False) -> None:
-        if not simulate:
+        if not self.simulate:
             self.powerSupply.setOutputEnable(enable)
 
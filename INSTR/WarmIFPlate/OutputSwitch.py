@@ -1,6 +1,5 @@
 from INSTR.SwitchController.HP3488a import SwitchController, SwitchConfig, DigitalPort, DigitalMethod
 from enum import Enum
-import time
 
 class PadSelect(Enum):
     PAD_OUT = 0
@@ -15,12 +14,21 @@ class OutputSelect(Enum):
     SQUARE_LAW = 16      # this is also the bit of the control word to send
     
 class OutputSwitch():
-    def __init__(self, resource="GPIB0::9::INSTR", reset: bool = True, simulate: bool = False):
+    BREAK_TIME = 0.2    # seconds with the changing relays released before closing new ones
+    SETTLE_TIME = 0.02  # seconds for the relays to settle after switching
+
+    def __init__(self, resource="GPIB0::9::INSTR", reset: bool = True, simulate: bool = False, settleTime: float = SETTLE_TIME):
         """Constructor
 
         :param str resource: VISA resource string, defaults to "GPIB0::9::INSTR"
+        :param float settleTime: seconds for the relays to settle after switching
         """
         self.simulate = simulate
+        self.settleTime = settleTime
+        # the last settings sent, None where not known:
+        self.output = None
+        self.load = None
+        self.pad = None
         if simulate:
             self.switchController = None
         else:
@@ -44,7 +52,7 @@ class OutputSwitch():
                        load: LoadSelect = LoadSelect.THROUGH,
                        pad: PadSelect = PadSelect.PAD_OUT) -> None:
         if not self.simulate:
-            # send the compliment of the byte having the selected bits:
-            self.switchController.staticWrite(255)
-            time.sleep(0.2)
-            self.switchController.staticWrite(255 - (output.value + load.value + pad.value))
+            # send the compliment of the byte having the selected bits.
+            # break-before-make and the write itself are skipped if they aren't needed:
+            self.switchController.staticWrite(255 - (output.value + load.value + pad.value), self.BREAK_TIME)
+        self.output, self.load, self.pad = output, load, pad
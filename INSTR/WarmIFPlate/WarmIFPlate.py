@@ -1,28 +1,168 @@
+from .schemas import WarmIFConfig
+from INSTR.Common.HealthMonitor import HealthMonitor
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Tuple
+import logging
+import time
+
 class WarmIFPlate():
+
     def __init__(self, attenuator, inputSwitch, noiseSource, outputSwitch, yigFilter):
+        """Constructor
+
+        Settling times are taken from each device: settleTime, and settleUntil for the YIG filter.
+        """
+        self.logger = logging.getLogger("ALMAFE-CTS-Control")
         self.attenuator = attenuator
         self.inputSwitch = inputSwitch
         self.noiseSource = noiseSource
         self.outputSwitch = outputSwitch
         self.yigFilter = yigFilter
+        # the state set by apply(), None where not known:
+        self.state = WarmIFConfig()
+        self.executor = ThreadPoolExecutor(max_workers = 3, thread_name_prefix = "WarmIFPlate")
+
+    def __del__(self):
+        self.close()
+
+    def close(self) -> None:
+        """Stop the threads used by apply().  Call when done with the plate.
+        """
+        self.executor.shutdown(wait = False)
 
     @property
-    def device_info(self) -> dict:        
-        reason = f"Attenuator:{'OK' if self.attenuator.connected() else 'ERROR'}\n"
-        reason += f"Input switch:{'OK' if self.inputSwitch.connected() else 'ERROR'}\n"
-        reason += f"Noise source:{'OK' if self.noiseSource.connected() else 'ERROR'}\n"
-        reason += f"Output switch:{'OK' if self.noiseSource.connected() else 'ERROR'}\n"
-        reason += f"YIG filter:{'OK' if self.yigFilter.connected() else 'ERROR'}"
+    def resource(self) -> str:
+        return getattr(self.inputSwitch, 'resource', "")
+
+    @property
+    def device_info(self) -> dict:
+        # each device is asked once and the overall result derived from the same answers:
+        status = self.deviceStatus()
         return {
             "name": "Warm IF Plate",
             "resource": self.resource,
-            "connected": self.connected(),
-            "reason": reason
-        }             
-        
+            "connected": all(status.values()),
+            "reason": "\n".join(f"{name}:{'OK' if ok else 'ERROR'}" for name, ok in status.items())
+        }
+
+    def deviceStatus(self) -> Dict[str, bool]:
+        """Check every physical resource once, concurrently, through the HealthMonitor
+
+        Devices sharing a bus controller, such as the switches on the HP3488a, share one check.
+        :return dict of device name: True if connected
+        """
+        devices = {
+            "Attenuator": (self.attenuator, 'switchController'),
+            "Input switch": (self.inputSwitch, 'switchController'),
+            "Noise source": (self.noiseSource, 'powerSupply'),
+            "Output switch": (self.outputSwitch, 'switchController'),
+            "YIG filter": (self.yigFilter, 'switchController')
+        }
+        keys = {name: self.__resourceKey(device, attribute) for name, (device, attribute) in devices.items()}
+        probes = {}
+        for name, (device, _) in devices.items():
+            probes.setdefault(keys[name], device.connected)
+        results = HealthMonitor().checkAll(probes)
+        return {name: results[keys[name]] for name in devices}
+
     def connected(self) -> bool:
-        return self.attenuator.connected() and \
-            self.inputSwitch.connected() and \
-            self.noiseSource.connected() and \
-            self.outputSwitch.connected() and \
-            self.yigFilter.connected()
+        return all(self.deviceStatus().values())
+
+    def invalidate(self) -> None:
+        """Forget the cached state, for when the devices have been set other than by apply()
+        """
+        self.state = WarmIFConfig()
+
+    def apply(self, config: WarmIFConfig) -> WarmIFConfig:
+        """Set the IF path as a single transaction
+
+        Only the settings which differ from the cached state are sent.
+        Devices on different controllers are set at the same time and those sharing an HP3488a are sent as one message.
+        Then wait once, for the longest settling time of the devices which changed.
+
+        :param WarmIFConfig config: desired state.  Fields which are None are left as they are.
+        :return WarmIFConfig: a copy of the resulting state
+        """
+        changes = {name: value for name, value in config.__dict__.items()
+                   if value is not None and getattr(self.state, name) != value}
+        if not changes:
+            return WarmIFConfig(**self.state.__dict__)
+
+        # (controller, set function, settling time) for each device to change:
+        actions: List[Tuple[object, Callable[[], None], float]] = []
+        if 'inputSelect' in changes:
+            actions.append((self.__controller(self.inputSwitch),
+                lambda: setattr(self.inputSwitch, 'selected', changes['inputSelect']), self.inputSwitch.settleTime))
+        if changes.keys() & {'outputSelect', 'loadSelect', 'padSelect'}:
+            # the output switch is set as a whole.  Settings not given are read back from it:
+            output, load, pad = (self.__outputSetting(config, name, attribute) for name, attribute in
+                (('outputSelect', 'output'), ('loadSelect', 'load'), ('padSelect', 'pad')))
+            changes.update(outputSelect = output, loadSelect = load, padSelect = pad)
+            actions.append((self.__controller(self.outputSwitch),
+                lambda: self.outputSwitch.setValue(output, load, pad), self.outputSwitch.settleTime))
+        if 'yigFreqGHz' in changes:
+            # YIGFilter records its own settling time for the size of the step:
+            actions.append((self.__controller(self.yigFilter),
+                lambda: self.yigFilter.setFrequency(changes['yigFreqGHz']), 0))
+        if 'attenuation' in changes:
+            actions.append((self.__controller(self.attenuator),
+                lambda: self.attenuator.setValue(changes['attenuation']), self.attenuator.settleTime))
+        if 'noiseSourceEnable' in changes:
+            actions.append((self.__controller(self.noiseSource, 'powerSupply'),
+                lambda: self.noiseSource.setEnable(changes['noiseSourceEnable']), self.noiseSource.settleTime))
+
+        groups: Dict[int, List[Tuple[object, Callable[[], None], float]]] = {}
+        for action in actions:
+            groups.setdefault(id(action[0]), []).append(action)
+        futures = [self.executor.submit(self.__applyGroup, group) for group in groups.values()]
+        try:
+            for future in futures:
+                future.result()
+        except Exception as e:
+            # some devices may have changed:
+            self.invalidate()
+            self.logger.error(f"WarmIFPlate.apply: {e}")
+            raise
+
+        self.state = WarmIFConfig(**{**self.state.__dict__, **changes})
+        settle = max(action[2] for action in actions)
+        if 'yigFreqGHz' in changes:
+            settle = max(settle, self.yigFilter.settleUntil - time.time())
+        if settle > 0:
+            time.sleep(settle)
+        return WarmIFConfig(**self.state.__dict__)
+
+    def __outputSetting(self, config: WarmIFConfig, name: str, attribute: str):
+        """One output switch setting for apply(): from config, else the cached state, else the switch itself
+
+        :raises ValueError: if the setting is not known
+        """
+        for value in (getattr(config, name), getattr(self.state, name), getattr(self.outputSwitch, attribute, None)):
+            if value is not None:
+                return value
+        raise ValueError(f"WarmIFPlate.apply: {name} is not known.  Give outputSelect, loadSelect and padSelect together.")
+
+    def __controller(self, device: object, attribute: str = 'switchController') -> object:
+        """The bus controller for a device, for grouping writes.  The device itself if simulated.
+        """
+        controller = getattr(device, attribute, None)
+        if controller is None:
+            return device
+        # SwitchControllers on the same HP3488a share one HP3488aController:
+        return getattr(controller, 'controller', controller)
+
+    def __resourceKey(self, device: object, attribute: str) -> str:
+        """The VISA resource of a device's bus controller, or a key unique to the device if simulated
+        """
+        controller = self.__controller(device, attribute)
+        resource = getattr(getattr(controller, 'inst', None), 'resource', None)
+        return resource if resource else f"{type(device).__name__}@{id(device)}"
+
+    def __applyGroup(self, group: List[Tuple[object, Callable[[], None], float]]) -> None:
+        """Set the devices on one controller, batched into one message if the controller supports it
+        """
+        controller = group[0][0]
+        with controller.batch() if hasattr(controller, 'batch') else nullcontext():
+            for _, action, _ in group:
+                action()
@@ -1,4 +1,7 @@
 from INSTR.SwitchController.HP3488a import SwitchController, SwitchConfig, DigitalPort, DigitalMethod
+from typing import Iterable, Iterator
+import numpy as np
+import time
 
 class YIGFilter():
     """The YIG filter in the IF processor"""
@@ -7,13 +10,22 @@ class YIGFilter():
     MAX_TUNING_MHZ = 12400      # upper limit in MHz
     STEP_RESOLUTION = 2.7839    # resolution in MHz/step
     LATCH_BIT = 4096            # latch the new tuning
+    # defaults for the settling time after a tuning step.  Pass values measured on the installed filter to the constructor:
+    SETTLE_MIN = 0.005          # seconds to settle after any change of tuning
+    SETTLE_PER_GHZ = 0.002      # additional seconds to settle per GHz of change
 
-    def __init__(self, resource="GPIB0::9::INSTR", simulate = False):
+    def __init__(self, resource="GPIB0::9::INSTR", simulate = False,
+            settleMin: float = SETTLE_MIN,
+            settlePerGHz: float = SETTLE_PER_GHZ):
         """Constructor
 
         :param str resource: VISA resource string, defaults to "GPIB0::13::INSTR"
+        :param float settleMin: seconds to settle after any change of tuning
+        :param float settlePerGHz: additional seconds to settle per GHz of change
         """
         self.simulate = simulate
+        self.settleMin = settleMin
+        self.settlePerGHz = settlePerGHz
         if simulate:
             self.SwitchController = None
         else:
@@ -24,9 +36,13 @@ class YIGFilter():
             ))
         self.minGHz = self.MIN_TUNING_MHZ / 1000
         self.maxGHz = self.MAX_TUNING_MHZ / 1000
+        self.tuningWord = None
+        self.settleUntil = 0
         self.reset()
 
     def reset(self):
+        # always send the tuning word:
+        self.tuningWord = None
         self.setFrequency(self.minGHz)
         self.freqGhz = self.minGHz
 
@@ -36,23 +52,58 @@ class YIGFilter():
         else:
             return self.switchController.connected()
 
-    def setFrequency(self, freqGHz: float) -> None:
-        if freqGHz < self.minGHz:
-            freqGHz = self.minGHz
-        elif freqGHz > self.maxGHz:
-            freqGHz = self.maxGHz
+    def tuningWords(self, freqsGHz: Iterable[float]) -> np.ndarray:
+        """Compute the tuning words for a list of frequencies
 
-        self.freqGhz = freqGHz
+        :param freqsGHz: frequencies, limited to minGHz..maxGHz
+        :return np.ndarray of int
+        """
+        MHz = 1000 * np.clip(np.asarray(freqsGHz, dtype = float), self.minGHz, self.maxGHz)
         # tuning word is the complement of the input value, scaled to 0..4095
-        MHz = 1000 * freqGHz
-        tuning = self.MAX_TUNING_MHZ - MHz
-        tuning = tuning / self.STEP_RESOLUTION
-        tuningWord = int(round(tuning))
+        return np.rint((self.MAX_TUNING_MHZ - MHz) / self.STEP_RESOLUTION).astype(int)
+
+    def setFrequency(self, freqGHz: float) -> None:
+        freqGHz = min(max(freqGHz, self.minGHz), self.maxGHz)
+        self.__setTuning(freqGHz, int(self.tuningWords([freqGHz])[0]))
+
+    def sweep(self, freqsGHz: Iterable[float]) -> Iterator[float]:
+        """Step through a list of frequencies, yielding after each has settled
+
+        All tuning words are computed up front.  The wait after each step is only what remains of the
+        settling time for the size of the step, so time spent by the caller between steps counts towards it.
 
+        for freq in yig.sweep(freqs):
+            power = powerMeter.read()
+
+        :param freqsGHz: frequencies, limited to minGHz..maxGHz
+        :yields float: each frequency, once the filter has settled there
+        """
+        freqsGHz = np.clip(np.asarray(freqsGHz, dtype = float), self.minGHz, self.maxGHz)
+        for freqGHz, tuningWord in zip(freqsGHz.tolist(), self.tuningWords(freqsGHz).tolist()):
+            self.__setTuning(freqGHz, tuningWord)
+            self.waitSettled()
+            yield freqGHz
+
+    def waitSettled(self) -> None:
+        """Wait for the remainder of the settling time after the last change of tuning
+        """
+        remaining = self.settleUntil - time.time()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def __setTuning(self, freqGHz: float, tuningWord: int) -> None:
+        """Send a tuning word unless it is already set
+        """
+        previousGHz = self.freqGhz if self.tuningWord is not None else self.minGHz
+        self.freqGhz = freqGHz
+        if tuningWord == self.tuningWord:
+            return
         # we send the tuning word three times, the second time having the latch bit set:
         data = [tuningWord, tuningWord + self.LATCH_BIT, tuningWord]
         if not self.simulate:
             self.switchController.digitalWrite(data)
+        self.tuningWord = tuningWord
+        self.settleUntil = time.time() + self.settleMin + self.settlePerGHz * abs(freqGHz - previousGHz)
 
     def getFrequency(self) -> float:
         return self.freqGhz        
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Optional
+from INSTR.InputSwitch.Interface import InputSelect
+from .OutputSwitch import OutputSelect, LoadSelect, PadSelect
+
+class WarmIFConfig(BaseModel):
+    """Desired state of the warm IF plate for WarmIFPlate.apply()
+
+    Fields left as None are not changed.
+    """
+    inputSelect: Optional[InputSelect] = None
+    outputSelect: Optional[OutputSelect] = None
+    loadSelect: Optional[LoadSelect] = None
+    padSelect: Optional[PadSelect] = None
+    attenuation: Optional[int] = None           # dB
+    noiseSourceEnable: Optional[bool] = None
+    yigFreqGHz: Optional[float] = None
+
+    def getText(self) -> str:
+        return ", ".join(f"{name}={value.name if hasattr(value, 'name') else value}" 
+                         for name, value in self.__dict__.items() if value is not None)